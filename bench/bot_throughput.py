@@ -0,0 +1,315 @@
+# Offline command throughput benchmark
+# Boots the real bot from main.py with every cog against bench/fake_discord.py and bench/replay_server.py,
+# replays a synthetic workload and reports throughput, latency percentiles, REST/API calls and memory.
+# Run from the repository root with: python -m bench.bot_throughput --workload mixed --messages 1000
+import argparse
+import asyncio
+import collections
+import importlib
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CITIES = ["graz", "stuttgart", "gavle", "london", "new york", "nashville", "chicago", "denver", "vancouver"]
+RACES = ["dwarf", "elf", "halfling", "human", "tiefling"]
+CLASSES = ["fighter", "wizard", "rogue", "cleric", "bard"]
+
+# Workload -> [(weight, message factory)]
+WORKLOADS = {
+    "weather": [(3, lambda rng: f"!weather {rng.choice(CITIES)}"), (1, lambda rng: f"!forecast {rng.choice(CITIES)}")],
+    "dice": [(1, lambda rng: f"!dice {rng.randint(1, 4)}d{rng.choice([4, 6, 8, 12, 20])}")],
+    "server": [(3, lambda rng: "!server"), (1, lambda rng: "!players_history palworld")],
+    "dnd": [
+        (2, lambda rng: f"!dnd_race {rng.choice(RACES)}"),
+        (2, lambda rng: f"!dnd_class {rng.choice(CLASSES)}"),
+        (1, lambda rng: "!dnd_create"),
+    ],
+    "fun": [(1, lambda rng: rng.choice(["!water", "!goat", "!coin", "!workout", "!ilyft"]))],
+}
+WORKLOADS["mixed"] = [entry for name in ("weather", "dice", "server", "dnd", "fun") for entry in WORKLOADS[name]]
+
+# --compare only judges commands with this many samples in both runs, and ignores slowdowns under MIN_DELTA_MS
+MIN_SAMPLES = 30
+MIN_DELTA_MS = 5
+
+
+def percentile(values, q):
+    """Nearest-rank percentile of a sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Benchmark:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        self.tmp = tempfile.mkdtemp(prefix="biobot-bench-")
+        # Message ID -> (command text, start time, future resolved when the command finishes)
+        self.pending = {}
+        self.latencies = collections.defaultdict(list)
+        self.errors = collections.Counter()
+        self.results = {}
+
+    async def boot(self):
+        """Start the API stand-ins, import main.py and bring the bot up against the fake gateway"""
+        from bench.replay_server import ReplayServer
+        from bench.fake_discord import FakeDiscord
+
+        self.replay = ReplayServer(latency=self.args.api_latency, jitter=self.args.api_latency / 2, seed=self.args.seed)
+        await self.replay.start()
+
+        # Everything main.py and the cogs read from the environment at import time
+        os.environ.update({
+            "TOKEN": "bench", "WEATHER_KEY": "bench", "WEATHER_KEY2": "bench",
+            "OPENWEATHER_BASE_URL": self.replay.url("openweathermap"), "DND_API_BASE": self.replay.url("dnd5eapi"),
+            "METRICS_PORT": "0", "COG_HOT_RELOAD": "0", "LOG_DIR": os.path.join(self.tmp, "logs"),
+            "LOG_LEVEL": self.args.log_level, "WEATHER_SUBSCRIPTIONS_FILE": os.path.join(self.tmp, "subscriptions.json"),
+            "PLAYER_HISTORY_FILE": os.path.join(self.tmp, "player_history.sqlite3"),
+        })
+        os.chdir(ROOT)
+        sys.path.insert(0, ROOT)
+
+        if not self.args.keep_limits:
+            # Measure the handlers themselves rather than the governor turning requests away
+            from utils import governor
+            for config in governor.limits.values():
+                config["cooldowns"] = []
+                config.pop("concurrency", None)
+
+        if self.args.tracemalloc:
+            tracemalloc.start()
+        started = time.perf_counter()
+        self.main = importlib.import_module("main")
+        self.main.COMMAND_TREE_HASH_FILE = os.path.join(self.tmp, "command_tree_hash")
+        self.client = self.main.build_bot()
+
+        self.fake = FakeDiscord(self.client, rest_latency=self.args.rest_latency)
+        self.build_world()
+        self.fake.install()
+        await self.client._async_setup_hook()
+        await self.client.setup_hook()
+        await self.client.cog_loader
+        await self.fake.connect()
+        self.results["boot_seconds"] = time.perf_counter() - started
+        self.results["cogs"] = len(self.client.cogs)
+
+        self.client.add_listener(self.command_finished, "on_command_completion")
+        self.client.add_listener(self.command_failed, "on_command_error")
+        # Background loops started by the cogs; anything newer belongs to the workload
+        self.baseline_tasks = asyncio.all_tasks()
+
+    def build_world(self):
+        from cogs.voice import Voice
+        self.hub_name = Voice(None).founders_channel_name
+        self.members = []
+        for g in range(self.args.guilds):
+            guild = self.fake.add_guild(f"Bench guild {g}", text_channels=self.args.channels, hub_channel=self.hub_name)
+            for u in range(self.args.users):
+                member = self.fake.add_member(guild["id"], admin=(u == 0))
+                self.members.append((guild["id"], member["user"]["id"]))
+
+    async def command_finished(self, ctx):
+        self.finish(ctx, None)
+
+    async def command_failed(self, ctx, error):
+        self.finish(ctx, error)
+
+    def finish(self, ctx, error):
+        entry = self.pending.pop(ctx.message.id, None)
+        if entry is None:
+            return
+        content, start, future = entry
+        name = ctx.command.qualified_name if ctx.command else content.split()[0]
+        self.latencies[name].append(time.perf_counter() - start)
+        if error is not None:
+            self.errors[name, type(getattr(error, "original", error)).__name__] += 1
+        if not future.done():
+            future.set_result(None)
+
+    async def send_command(self, content, semaphore):
+        async with semaphore:
+            guild_id, user_id = self.rng.choice(self.members)
+            channel_id = self.rng.choice(self.fake.text_channels(guild_id))["id"]
+            future = asyncio.get_running_loop().create_future()
+            message_id = self.fake.message_create(guild_id, channel_id, user_id, content)
+            # on_message runs as a task, so registering right after the dispatch is still in time
+            self.pending[message_id] = (content, time.perf_counter(), future)
+            try:
+                await asyncio.wait_for(future, self.args.timeout)
+            except asyncio.TimeoutError:
+                self.pending.pop(message_id, None)
+                self.errors[content.split()[0], "Timeout"] += 1
+
+    async def run_messages(self, workload):
+        weights, factories = zip(*WORKLOADS[workload])
+        messages = [self.rng.choices(factories, weights)[0](self.rng) for _ in range(self.args.messages)]
+        semaphore = asyncio.Semaphore(self.args.concurrency)
+        started = time.perf_counter()
+        await asyncio.gather(*(self.send_command(content, semaphore) for content in messages))
+        elapsed = time.perf_counter() - started
+        self.results["commands"] = len(messages)
+        self.results["seconds"] = elapsed
+        self.results["throughput"] = len(messages) / elapsed
+
+    async def settle(self):
+        """Wait for every task the workload spawned (including echoed gateway events) to finish"""
+        while True:
+            await asyncio.sleep(0)
+            tasks = asyncio.all_tasks() - self.baseline_tasks - {asyncio.current_task()}
+            if not tasks:
+                return
+            await asyncio.wait(tasks, timeout=self.args.timeout)
+
+    async def run_voice(self):
+        """Join storm into the hub channel followed by everyone leaving again"""
+        voice = self.client.get_cog("Voice")
+        hubs = {guild_id: self.fake.voice_channel(guild_id, self.hub_name)["id"] for guild_id in self.fake.guilds}
+        started = time.perf_counter()
+        for guild_id, user_id in self.members:
+            self.fake.voice_state_update(guild_id, user_id, hubs[guild_id])
+        await self.settle()
+        joined = time.perf_counter()
+        peak_channels = len(voice.temp_channels)
+        for guild_id, user_id in self.members:
+            self.fake.voice_state_update(guild_id, user_id, None)
+        await self.settle()
+        left = time.perf_counter()
+
+        events = 2 * len(self.members)
+        self.results["voice"] = {
+            "members": len(self.members), "join_seconds": joined - started, "leave_seconds": left - joined,
+            "events_per_second": events / (left - started), "peak_temp_channels": peak_channels,
+            "temp_channels_left": len(voice.temp_channels),
+        }
+
+    def collect(self):
+        from utils import metrics
+        self.results["latency_ms"] = {}
+        for name, values in sorted(self.latencies.items()):
+            values.sort()
+            self.results["latency_ms"][name] = {
+                "count": len(values),
+                "errors": sum(count for (command, _), count in self.errors.items() if command == name),
+                "p50": percentile(values, 0.50) * 1000, "p95": percentile(values, 0.95) * 1000,
+                "p99": percentile(values, 0.99) * 1000,
+            }
+        self.results["errors"] = {f"{command}: {error}": count for (command, error), count in self.errors.items()}
+        self.results["rest_calls"] = dict(self.fake.rest_calls.most_common())
+        self.results["api_requests"] = {f"{service} {status}": count
+                                        for (service, status), count in self.replay.requests.items()}
+        self.results["event_loop_stalls"] = sum(count for (name, _), count in metrics.counters.items()
+                                                if name == "biobot_event_loop_stalls_total")
+        if resource:
+            # ru_maxrss is KiB on Linux, bytes on macOS
+            scale = 1 if sys.platform == "darwin" else 1024
+            self.results["peak_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2**20
+        if tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            self.results["python_heap_mb"] = {"current": current / 2**20, "peak": peak / 2**20}
+
+    def report(self):
+        r = self.results
+        print(f"\nBooted {r['cogs']} cogs in {r['boot_seconds']:.2f}s")
+        if "commands" in r:
+            print(f"{self.args.workload}: {r['commands']} commands in {r['seconds']:.2f}s "
+                  f"= {r['throughput']:.1f} commands/s (concurrency {self.args.concurrency})")
+            print(f"\n{'command':<16}{'count':>7}{'errors':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+            for name, row in r["latency_ms"].items():
+                print(f"{name:<16}{row['count']:>7}{row['errors']:>8}{row['p50']:>10.1f}{row['p95']:>10.1f}{row['p99']:>10.1f}")
+        if "voice" in r:
+            v = r["voice"]
+            print(f"voice: {v['members']} members joined in {v['join_seconds']:.2f}s and left in {v['leave_seconds']:.2f}s "
+                  f"= {v['events_per_second']:.0f} events/s, peak {v['peak_temp_channels']} temp channels, "
+                  f"{v['temp_channels_left']} left over")
+        for error, count in r["errors"].items():
+            print(f"  error {error} x{count}")
+        total_rest = sum(r["rest_calls"].values())
+        print(f"\nDiscord REST calls: {total_rest}")
+        for route, count in r["rest_calls"].items():
+            print(f"  {count:>6}  {route}")
+        print(f"API requests: {r['api_requests'] or 'none'}")
+        print(f"Event loop stalls: {r['event_loop_stalls']}")
+        if "peak_rss_mb" in r:
+            print(f"Peak RSS: {r['peak_rss_mb']:.1f} MB")
+        if "python_heap_mb" in r:
+            print(f"Python heap: {r['python_heap_mb']['current']:.1f} MB now, {r['python_heap_mb']['peak']:.1f} MB peak")
+
+    def compare(self, baseline_path, tolerance):
+        """Return regressions against a saved baseline run"""
+        with open(baseline_path) as file:
+            baseline = json.load(file)
+        regressions = []
+        if "throughput" in baseline and self.results.get("throughput", 0) < baseline["throughput"] * (1 - tolerance):
+            regressions.append(f"throughput {self.results['throughput']:.1f}/s vs {baseline['throughput']:.1f}/s")
+        for name, row in self.results.get("latency_ms", {}).items():
+            before = baseline.get("latency_ms", {}).get(name)
+            # A p95 over a handful of samples is mostly noise, as are a few ms on very fast commands
+            if not before or min(row["count"], before["count"]) < MIN_SAMPLES:
+                continue
+            if row["p95"] > before["p95"] * (1 + tolerance) + MIN_DELTA_MS:
+                regressions.append(f"{name} p95 {row['p95']:.1f}ms vs {before['p95']:.1f}ms")
+        return regressions
+
+    async def run(self):
+        await self.boot()
+        try:
+            if self.args.workload == "voice":
+                await self.run_voice()
+            else:
+                await self.run_messages(self.args.workload)
+            await self.settle()
+            self.collect()
+        finally:
+            await self.client.close()
+            await self.replay.stop()
+            self.main.log_listener.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Bio-bot command throughput offline")
+    parser.add_argument("--workload", choices=sorted([*WORKLOADS, "voice"]), default="mixed")
+    parser.add_argument("--messages", type=int, default=500, help="Commands to send")
+    parser.add_argument("--concurrency", type=int, default=50, help="Commands in flight at once")
+    parser.add_argument("--guilds", type=int, default=4)
+    parser.add_argument("--channels", type=int, default=3, help="Text channels per guild")
+    parser.add_argument("--users", type=int, default=25, help="Members per guild")
+    parser.add_argument("--api-latency", type=float, default=0.05, help="Seconds per weather/D&D API response")
+    parser.add_argument("--rest-latency", type=float, default=0.0, help="Seconds per Discord REST call")
+    parser.add_argument("--timeout", type=float, default=30, help="Seconds before a command counts as timed out")
+    parser.add_argument("--keep-limits", action="store_true", help="Keep command cooldowns and concurrency limits")
+    parser.add_argument("--tracemalloc", action="store_true", help="Track Python heap usage (slower)")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write the results to this file")
+    parser.add_argument("--compare", help="Baseline results file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown against the baseline")
+    args = parser.parse_args()
+
+    benchmark = Benchmark(args)
+    asyncio.run(benchmark.run())
+    benchmark.report()
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(benchmark.results, file, indent=2)
+    if args.compare:
+        regressions = benchmark.compare(args.compare, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}")
+        sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,259 @@
+# In-process stand-in for the Discord gateway and REST API, for benchmarks
+# Gateway events go through discord.py's real parsers, so cogs see exactly what they would in production;
+# REST calls are answered locally and echoed back as the gateway events Discord would send
+import asyncio
+import collections
+import datetime
+import itertools
+import json
+import re
+import time
+
+
+# @everyone gets view/send/connect/speak style permissions, admins get administrator
+EVERYONE_PERMISSIONS = "3263552"
+ADMINISTRATOR = "8"
+
+ROUTE_PARAM = re.compile(r"{(\w+)}")
+
+
+def timestamp():
+    return datetime.datetime.now(datetime.timezone.utc).isoformat()
+
+
+class FakeDiscord:
+    """Drive a discord.py client without a network connection
+
+    Build guilds with add_guild()/add_member(), connect() them through READY/GUILD_CREATE,
+    then inject message_create()/voice_state_update() events. REST calls made by the bot are
+    counted per route in rest_calls and can be slowed down with rest_latency.
+    """
+
+    def __init__(self, client, rest_latency=0.0):
+        self.client = client
+        self.state = client._connection
+        self.rest_latency = rest_latency
+        self.rest_calls = collections.Counter()
+        self.ids = itertools.count(int(time.time() * 1000 - 1420070400000) << 22)
+        self.bot_user = self.user_payload("Bio-bot", bot=True)
+        self.application_id = self.next_id()
+        # Snowflake -> payload for everything the fake server knows about
+        self.guilds = {}
+        self.channels = {}
+        self.users = {self.bot_user["id"]: self.bot_user}
+        self.members = {}  # (guild_id, user_id) -> member payload
+        self.voice_channel_of = {}  # (guild_id, user_id) -> channel_id
+
+        self.routes = {
+            ("POST", "/channels/{channel_id}/messages"): self.send_message,
+            ("PATCH", "/channels/{channel_id}/messages/{message_id}"): self.edit_message,
+            ("POST", "/channels/{channel_id}/typing"): self.no_content,
+            ("DELETE", "/channels/{channel_id}/messages/{message_id}"): self.no_content,
+            ("PUT", "/channels/{channel_id}/pins/{message_id}"): self.no_content,
+            ("POST", "/users/@me/channels"): self.create_dm,
+            ("GET", "/users/{user_id}"): self.get_user,
+            ("POST", "/guilds/{guild_id}/channels"): self.create_channel,
+            ("PATCH", "/channels/{channel_id}"): self.edit_channel,
+            ("DELETE", "/channels/{channel_id}"): self.delete_channel,
+            ("PUT", "/channels/{channel_id}/permissions/{overwrite_id}"): self.no_content,
+            ("PATCH", "/guilds/{guild_id}/members/{user_id}"): self.edit_member,
+            ("PUT", "/applications/{application_id}/commands"): self.bulk_upsert_commands,
+        }
+
+    def next_id(self):
+        return str(next(self.ids))
+
+    # Payload builders
+
+    def user_payload(self, name, bot=False):
+        return {"id": self.next_id(), "username": name, "global_name": name, "discriminator": "0",
+                "avatar": None, "bot": bot}
+
+    def role_payload(self, role_id, name, permissions):
+        return {"id": role_id, "name": name, "permissions": permissions, "position": 0, "color": 0,
+                "hoist": False, "managed": False, "mentionable": False, "flags": 0}
+
+    def channel_payload(self, guild_id, name, type, **fields):
+        return {"id": self.next_id(), "guild_id": guild_id, "name": name, "type": type, "position": 0,
+                "permission_overwrites": [], "parent_id": None, "nsfw": False,
+                **({"bitrate": 64000, "user_limit": 0, "rtc_region": None} if type == 2 else {}), **fields}
+
+    def voice_state_payload(self, guild_id, user_id, channel_id):
+        return {"guild_id": guild_id, "channel_id": channel_id, "user_id": user_id,
+                "member": self.members[guild_id, user_id], "session_id": "bench", "deaf": False, "mute": False,
+                "self_deaf": False, "self_mute": False, "self_video": False, "suppress": False,
+                "request_to_speak_timestamp": None}
+
+    # Building the world
+
+    def add_guild(self, name, text_channels=1, hub_channel=None):
+        """Create a guild with text channels and, optionally, a voice hub channel in a category"""
+        guild_id = self.next_id()
+        guild = {
+            "id": guild_id, "name": name, "owner_id": self.bot_user["id"], "unavailable": False,
+            "roles": [self.role_payload(guild_id, "@everyone", EVERYONE_PERMISSIONS)],
+            "channels": [], "members": [], "voice_states": [], "member_count": 0,
+            "features": [], "emojis": [], "stickers": [], "threads": [], "stage_instances": [],
+            "guild_scheduled_events": [], "soundboard_sounds": [], "premium_tier": 0,
+            "joined_at": timestamp(), "large": False,
+        }
+        self.guilds[guild_id] = guild
+        for i in range(text_channels):
+            self.add_channel(guild_id, f"general-{i}", 0)
+        if hub_channel:
+            category = self.add_channel(guild_id, "Voice", 4)
+            self.add_channel(guild_id, hub_channel, 2, parent_id=category["id"])
+        self.add_member(guild_id, self.bot_user)
+        return guild
+
+    def add_channel(self, guild_id, name, type, **fields):
+        channel = self.channel_payload(guild_id, name, type, **fields)
+        self.channels[channel["id"]] = channel
+        self.guilds[guild_id]["channels"].append(channel)
+        return channel
+
+    def add_member(self, guild_id, user=None, admin=False):
+        """Add a member to a guild before connect(), creating a user if none is given"""
+        user = user or self.user_payload(f"user{len(self.users)}")
+        self.users[user["id"]] = user
+        member = {"user": user, "roles": [], "joined_at": timestamp(), "deaf": False, "mute": False,
+                  "nick": None, "flags": 0}
+        if admin:
+            role = self.role_payload(self.next_id(), "Admin", ADMINISTRATOR)
+            self.guilds[guild_id]["roles"].append(role)
+            member["roles"].append(role["id"])
+        self.members[guild_id, user["id"]] = member
+        self.guilds[guild_id]["members"].append(member)
+        self.guilds[guild_id]["member_count"] += 1
+        return member
+
+    def text_channels(self, guild_id):
+        return [channel for channel in self.guilds[guild_id]["channels"] if channel["type"] == 0]
+
+    def voice_channel(self, guild_id, name):
+        return next(channel for channel in self.channels.values()
+                    if channel["guild_id"] == guild_id and channel["type"] == 2 and channel["name"] == name)
+
+    # Gateway
+
+    def install(self):
+        """Route the client's REST calls to this fake and give it the identity login would"""
+        self.client.http.request = self.request
+        self.state.application_id = int(self.application_id)
+        # Don't wait seconds for more guilds to stream in before READY
+        self.state.guild_ready_timeout = 0.01
+
+    async def connect(self):
+        """Send READY and a GUILD_CREATE per guild, then wait for the client's ready event"""
+        self.state.parse_ready({
+            "v": 10, "user": self.bot_user, "session_id": "bench", "resume_gateway_url": "ws://bench",
+            "guilds": [{"id": guild_id, "unavailable": True} for guild_id in self.guilds],
+            "application": {"id": self.application_id, "flags": 0},
+        })
+        for guild in self.guilds.values():
+            self.state.parse_guild_create(guild)
+        await self.client.wait_until_ready()
+
+    def message_create(self, guild_id, channel_id, user_id, content):
+        """Inject a MESSAGE_CREATE from a member and return its message ID"""
+        message = {
+            "id": self.next_id(), "channel_id": channel_id, "guild_id": guild_id,
+            "author": self.users[user_id], "member": self.members[guild_id, user_id],
+            "content": content, "timestamp": timestamp(), "edited_timestamp": None, "tts": False,
+            "mention_everyone": False, "mentions": [], "mention_roles": [], "attachments": [], "embeds": [],
+            "pinned": False, "type": 0, "flags": 0,
+        }
+        self.state.parse_message_create(message)
+        return int(message["id"])
+
+    def voice_state_update(self, guild_id, user_id, channel_id):
+        """Inject a VOICE_STATE_UPDATE moving a member into a channel, or out of voice with None"""
+        if channel_id is None:
+            self.voice_channel_of.pop((guild_id, user_id), None)
+        else:
+            self.voice_channel_of[guild_id, user_id] = channel_id
+        self.state.parse_voice_state_update(self.voice_state_payload(guild_id, user_id, channel_id))
+
+    # REST
+
+    async def request(self, route, *, files=None, form=None, **kwargs):
+        key = (route.method, route.path)
+        self.rest_calls[f"{route.method} {route.path}"] += 1
+        if self.rest_latency:
+            await asyncio.sleep(self.rest_latency)
+        handler = self.routes.get(key)
+        if handler is None:
+            return {}
+        # Pull {placeholders} back out of the formatted URL
+        params = re.search(ROUTE_PARAM.sub(r"(?P<\1>[^/]+)", route.path) + "$", route.url).groupdict()
+        payload = kwargs.get("json")
+        if payload is None and form:
+            payload = next((part["value"] for part in form if part["name"] == "payload_json"), None)
+            payload = json.loads(payload) if payload else {}
+        return handler(params, payload or {})
+
+    def no_content(self, params, payload):
+        return None
+
+    def send_message(self, params, payload):
+        channel = self.channels.get(params["channel_id"], {})
+        return {
+            "id": self.next_id(), "channel_id": params["channel_id"], "guild_id": channel.get("guild_id"),
+            "author": self.bot_user, "content": payload.get("content") or "", "timestamp": timestamp(),
+            "edited_timestamp": None, "tts": False, "mention_everyone": False, "mentions": [],
+            "mention_roles": [], "attachments": [], "embeds": payload.get("embeds") or [],
+            "components": payload.get("components") or [], "pinned": False, "type": 0, "flags": 0,
+        }
+
+    def edit_message(self, params, payload):
+        message = self.send_message(params, payload)
+        message["id"] = params["message_id"]
+        message["edited_timestamp"] = timestamp()
+        return message
+
+    def create_dm(self, params, payload):
+        channel = {"id": self.next_id(), "type": 1, "recipients": [self.users[str(payload["recipient_id"])]]}
+        self.channels[channel["id"]] = channel
+        return channel
+
+    def get_user(self, params, payload):
+        return self.users[params["user_id"]]
+
+    def create_channel(self, params, payload):
+        channel = self.channel_payload(params["guild_id"], payload["name"], payload.get("type", 0),
+                                       **{key: value for key, value in payload.items() if key not in ("name", "type")})
+        self.channels[channel["id"]] = channel
+        # Discord announces the channel on the gateway as well
+        self.state.parse_channel_create(channel)
+        return channel
+
+    def edit_channel(self, params, payload):
+        channel = self.channels[params["channel_id"]]
+        channel.update(payload)
+        self.state.parse_channel_update(channel)
+        return channel
+
+    def delete_channel(self, params, payload):
+        channel = self.channels.pop(params["channel_id"])
+        self.state.parse_channel_delete(channel)
+        return channel
+
+    def edit_member(self, params, payload):
+        guild_id, user_id = params["guild_id"], params["user_id"]
+        if "channel_id" in payload:
+            channel_id = payload["channel_id"] and str(payload["channel_id"])
+            asyncio.create_task(self.echo_voice_state(guild_id, user_id, channel_id))
+        member = self.members[guild_id, user_id]
+        if "nick" in payload:
+            member["nick"] = payload["nick"]
+        return member
+
+    async def echo_voice_state(self, guild_id, user_id, channel_id):
+        # Moving a member shows up as a voice state update shortly after the REST call returns;
+        # as a task it is visible to anything waiting for the bot to go idle
+        await asyncio.sleep(0)
+        self.voice_state_update(guild_id, user_id, channel_id)
+
+    def bulk_upsert_commands(self, params, payload):
+        return [{**command, "id": self.next_id(), "application_id": self.application_id, "version": "1"}
+                for command in payload]
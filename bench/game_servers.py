@@ -0,0 +1,281 @@
+# Local stand-ins for the game server query protocols used by cogs/servers.py
+# A2S (Steam UDP query, with challenges and split packets), Source RCON over TCP as Palworld speaks it,
+# and the Palworld REST API, each with injectable latency and packet loss
+# Run with: python -m bench.game_servers --players 12 --loss 0.1
+import argparse
+import asyncio
+import base64
+import random
+import struct
+import time
+from aiohttp import web
+
+
+A2S_HEADER = b"\xFF\xFF\xFF\xFF"
+A2S_SPLIT_HEADER = b"\xFE\xFF\xFF\xFF"
+A2S_INFO = 0x54
+A2S_PLAYER = 0x55
+S2A_CHALLENGE = 0x41
+S2A_INFO = 0x49
+S2A_PLAYER = 0x44
+
+RCON_RESPONSE_VALUE = 0
+RCON_EXECCOMMAND = 2
+RCON_AUTH_RESPONSE = 2
+RCON_AUTH = 3
+
+
+def player_names(count):
+    return [f"Player{i + 1}" for i in range(count)]
+
+
+class Faults:
+    """Latency, jitter and loss shared by the stand-ins"""
+
+    def __init__(self, latency=0.0, jitter=0.0, loss=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.loss = loss
+        self.random = random.Random(seed)
+
+    def delay(self):
+        return self.latency + self.random.uniform(0, self.jitter)
+
+    def lost(self):
+        return self.random.random() < self.loss
+
+
+class A2SServer(asyncio.DatagramProtocol):
+    """Answers A2S_INFO and A2S_PLAYER like a Source dedicated server
+
+    With challenge=True, queries without a valid challenge are answered with S2A_CHALLENGE first,
+    as servers do since 2020. Responses longer than split_size are sent as split packets.
+    Loss applies to every datagram in either direction, so a split response can arrive incomplete.
+    """
+
+    def __init__(self, players=0, max_players=32, name="Bench Server", map="bench", folder="bench",
+                 game="Bench", app_id=0, challenge=True, split_size=1248, faults=None):
+        self.players = player_names(players)
+        self.max_players = max_players
+        self.name, self.map, self.folder, self.game, self.app_id = name, map, folder, game, app_id
+        self.challenge = challenge
+        self.split_size = split_size
+        self.faults = faults or Faults()
+        self.challenges = {}  # client address -> challenge number
+        self.split_ids = 0
+        self.received = 0
+        self.transport = None
+
+    def connection_made(self, transport):
+        self.transport = transport
+
+    def datagram_received(self, data, addr):
+        self.received += 1
+        if self.faults.lost() or not data.startswith(A2S_HEADER) or len(data) < 5:
+            return
+        kind = data[4]
+        if kind == A2S_INFO:
+            challenge = data[25:29]  # after the "Source Engine Query\0" payload
+            response = self.info_response()
+        elif kind == A2S_PLAYER:
+            challenge = data[5:9]
+            response = self.player_response()
+        else:
+            return
+
+        if self.challenge and challenge != self.challenge_for(addr):
+            response = A2S_HEADER + bytes([S2A_CHALLENGE]) + self.challenge_for(addr)
+        asyncio.get_running_loop().call_later(self.faults.delay(), self.send, response, addr)
+
+    def challenge_for(self, addr):
+        if addr not in self.challenges:
+            self.challenges[addr] = struct.pack("<i", self.faults.random.randint(1, 2**31 - 1))
+        return self.challenges[addr]
+
+    def info_response(self):
+        return (A2S_HEADER + bytes([S2A_INFO, 17])
+                + b"".join(value.encode() + b"\x00" for value in (self.name, self.map, self.folder, self.game))
+                + struct.pack("<hBBB", self.app_id, len(self.players), self.max_players, 0)
+                + b"dw\x00\x00" + b"1.0.0\x00" + b"\x00")
+
+    def player_response(self):
+        # Index, name, score and seconds connected per player
+        return (A2S_HEADER + bytes([S2A_PLAYER, len(self.players)])
+                + b"".join(struct.pack("<B", index) + name.encode() + b"\x00" + struct.pack("<lf", index * 10, 600.0 * index)
+                           for index, name in enumerate(self.players)))
+
+    def send(self, response, addr):
+        if self.transport is None or self.transport.is_closing():
+            return
+        if len(response) <= self.split_size:
+            packets = [response]
+        else:
+            # Source multi-packet format: id, total, number, max packet size, then a slice of the response
+            self.split_ids += 1
+            chunks = [response[i:i + self.split_size] for i in range(0, len(response), self.split_size)]
+            packets = [A2S_SPLIT_HEADER + struct.pack("<lBBh", self.split_ids, len(chunks), number, self.split_size) + chunk
+                       for number, chunk in enumerate(chunks)]
+        for packet in packets:
+            if not self.faults.lost():
+                self.transport.sendto(packet, addr)
+
+
+class RconServer:
+    """Source RCON over TCP with Palworld's ShowPlayers/Info commands
+
+    A lost packet is never answered, so the client sees a timeout.
+    """
+
+    def __init__(self, password="", players=0, version="v0.3.0", name="Bench Server", faults=None):
+        self.password = password
+        self.players = player_names(players)
+        self.version = version
+        self.name = name
+        self.faults = faults or Faults()
+        self.connections = 0
+
+    def execute(self, command):
+        command = command.strip().lower()
+        if command == "showplayers":
+            return "name,playeruid,steamid\n" + "".join(
+                f"{name},{1000 + index},7656119{index:010d}\n" for index, name in enumerate(self.players))
+        if command == "info":
+            return f"Welcome to Pal Server[{self.version}] {self.name}\n"
+        return f"Unknown command: {command}\n"
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        authenticated = False
+        try:
+            while True:
+                size, = struct.unpack("<i", await reader.readexactly(4))
+                request_id, kind = struct.unpack("<ii", await reader.readexactly(8))
+                # The body is a null-terminated string followed by an empty one
+                body = (await reader.readexactly(size - 8)).split(b"\x00")[0].decode("utf-8", errors="ignore")
+                if self.faults.lost():
+                    continue
+                await asyncio.sleep(self.faults.delay())
+
+                if kind == RCON_AUTH:
+                    authenticated = body == self.password
+                    reply = (request_id if authenticated else -1, RCON_AUTH_RESPONSE, "")
+                elif kind == RCON_EXECCOMMAND and authenticated:
+                    reply = (request_id, RCON_RESPONSE_VALUE, self.execute(body))
+                else:
+                    reply = (-1, RCON_AUTH_RESPONSE, "")
+                payload = struct.pack("<ii", reply[0], reply[1]) + reply[2].encode() + b"\x00\x00"
+                writer.write(struct.pack("<i", len(payload)) + payload)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+
+class PalworldRestServer:
+    """The Palworld REST API (/v1/api/...) behind basic auth
+
+    Lost requests are answered with a 503.
+    """
+
+    def __init__(self, username="admin", password="", players=0, max_players=32, version="v0.3.0",
+                 name="Bench Server", faults=None):
+        self.credentials = "Basic " + base64.b64encode(f"{username}:{password}".encode()).decode()
+        self.players = player_names(players)
+        self.max_players = max_players
+        self.version = version
+        self.name = name
+        self.faults = faults or Faults()
+        self.started = time.monotonic()
+        self.runner = None
+
+    def payloads(self):
+        return {
+            "info": {"version": self.version, "servername": self.name, "description": "", "worldguid": "0" * 32},
+            "players": {"players": [
+                {"name": name, "accountName": name.lower(), "playerId": f"{index:08X}", "userId": f"steam_{index}",
+                 "ip": "127.0.0.1", "ping": 30.0, "location_x": 0.0, "location_y": 0.0, "level": 10,
+                 "building_count": 0}
+                for index, name in enumerate(self.players)]},
+            "metrics": {"serverfps": 60, "currentplayernum": len(self.players), "serverframetime": 16.6,
+                        "maxplayernum": self.max_players, "uptime": int(time.monotonic() - self.started), "days": 1},
+            "settings": {"ServerName": self.name, "ServerPlayerMaxNum": self.max_players, "Difficulty": "None"},
+        }
+
+    async def handle(self, request):
+        await asyncio.sleep(self.faults.delay())
+        if request.headers.get("Authorization") != self.credentials:
+            return web.Response(status=401, text="Unauthorized")
+        if self.faults.lost():
+            return web.Response(status=503, text="Service Unavailable")
+        payload = self.payloads().get(request.match_info["endpoint"])
+        if payload is None:
+            return web.Response(status=404, text="Not Found")
+        return web.json_response(payload)
+
+    async def start(self, host="127.0.0.1", port=0):
+        app = web.Application()
+        app.router.add_get("/v1/api/{endpoint}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        return site._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+
+async def start_a2s(server, host="127.0.0.1", port=0):
+    """Serve an A2SServer and return (transport, port); port 0 picks a free port"""
+    transport, _ = await asyncio.get_running_loop().create_datagram_endpoint(lambda: server, local_addr=(host, port))
+    return transport, transport.get_extra_info("sockname")[1]
+
+
+async def start_rcon(server, host="127.0.0.1", port=0):
+    """Serve an RconServer and return (asyncio server, port)"""
+    tcp_server = await asyncio.start_server(server.handle, host, port)
+    return tcp_server, tcp_server.sockets[0].getsockname()[1]
+
+
+async def serve(args):
+    def faults():
+        return Faults(args.latency, args.jitter, args.loss, args.seed)
+
+    a2s = A2SServer(players=args.players, max_players=args.max_players, challenge=not args.no_challenge,
+                    split_size=args.split_size, faults=faults())
+    rcon = RconServer(password=args.password, players=args.players, faults=faults())
+    rest = PalworldRestServer(password=args.password, players=args.players, max_players=args.max_players, faults=faults())
+    transport, a2s_port = await start_a2s(a2s, args.host, args.a2s_port)
+    rcon_server, rcon_port = await start_rcon(rcon, args.host, args.rcon_port)
+    rest_port = await rest.start(args.host, args.rest_port)
+    print(f"A2S on udp://{args.host}:{a2s_port}, RCON on tcp://{args.host}:{rcon_port}, "
+          f"Palworld REST on http://{args.host}:{rest_port}/v1/api with {args.players} players")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        transport.close()
+        rcon_server.close()
+        await rest.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve stand-in A2S, RCON and Palworld REST endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--a2s-port", type=int, default=27015)
+    parser.add_argument("--rcon-port", type=int, default=25575)
+    parser.add_argument("--rest-port", type=int, default=8212)
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--max-players", type=int, default=32)
+    parser.add_argument("--password", default="bench", help="RCON and REST admin password")
+    parser.add_argument("--no-challenge", action="store_true", help="Answer A2S queries without a challenge")
+    parser.add_argument("--split-size", type=int, default=1248, help="A2S responses longer than this are split")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds, up to this much")
+    parser.add_argument("--loss", type=float, default=0.0, help="Fraction of packets/requests dropped")
+    parser.add_argument("--seed", type=int, default=None)
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
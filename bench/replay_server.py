@@ -0,0 +1,117 @@
+# Local stand-in for OpenWeatherMap and dnd5eapi that replays recorded responses
+# Run with: python -m bench.replay_server --port 8600 --latency 0.1
+# then set OPENWEATHER_BASE_URL=http://127.0.0.1:8600/openweathermap
+#      and DND_API_BASE=http://127.0.0.1:8600/dnd5eapi
+import argparse
+import asyncio
+import collections
+import os
+import random
+from aiohttp import web
+from utils.replay import fixture_name
+
+
+FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
+
+
+class ReplayServer:
+    """Serve fixtures from <fixtures>/<service>/ with configurable latency and failure injection
+
+    A request with a query first looks for its exact fixture, then for the path's default fixture
+    (no query), then for any recorded query of that path, so any city or coordinate gets an answer.
+    """
+
+    def __init__(self, fixtures=FIXTURES_DIR, latency=0.0, jitter=0.0, error_rate=0.0, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        # Requests served per (service, status)
+        self.requests = collections.Counter()
+        self.runner = None
+        self.port = None
+
+        # Fixtures are read once so replaying costs no disk I/O
+        self.fixtures = {}
+        for service in os.listdir(fixtures):
+            directory = os.path.join(fixtures, service)
+            if os.path.isdir(directory):
+                self.fixtures[service] = {}
+                for filename in sorted(os.listdir(directory)):
+                    with open(os.path.join(directory, filename), "rb") as file:
+                        self.fixtures[service][filename] = file.read()
+
+    def lookup(self, service, path, params):
+        fixtures = self.fixtures.get(service, {})
+        exact = fixture_name(path, params)
+        if exact in fixtures:
+            return fixtures[exact]
+        default = fixture_name(path, {})
+        if default in fixtures:
+            return fixtures[default]
+        prefix = default[:-len(".json")] + "@"
+        for name, body in fixtures.items():
+            if name.startswith(prefix):
+                return body
+        return None
+
+    async def handle(self, request):
+        service, _, path = request.match_info["path"].partition("/")
+        delay = self.latency + self.random.uniform(0, self.jitter)
+        if delay:
+            await asyncio.sleep(delay)
+
+        if self.random.random() < self.error_rate:
+            self.requests[service, 503] += 1
+            return web.json_response({"error": "Injected failure"}, status=503)
+
+        body = self.lookup(service, f"/{path}", dict(request.query))
+        if body is None:
+            self.requests[service, 404] += 1
+            return web.json_response({"error": "Not found"}, status=404)
+        self.requests[service, 200] += 1
+        return web.Response(body=body, content_type="application/json")
+
+    async def start(self, host="127.0.0.1", port=0):
+        """Start serving and return the base URL; port 0 picks a free port"""
+        app = web.Application()
+        app.router.add_get("/{path:.*}", self.handle)
+        self.runner = web.AppRunner(app, access_log=None)
+        await self.runner.setup()
+        site = web.TCPSite(self.runner, host, port)
+        await site.start()
+        self.port = site._server.sockets[0].getsockname()[1]
+        return f"http://{host}:{self.port}"
+
+    async def stop(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    def url(self, service):
+        return f"http://127.0.0.1:{self.port}/{service}"
+
+
+async def serve(args):
+    server = ReplayServer(args.fixtures, args.latency, args.jitter, args.error_rate, args.seed)
+    await server.start(args.host, args.port)
+    for service in sorted(server.fixtures):
+        print(f"Replaying {len(server.fixtures[service])} {service} fixtures at {server.url(service)}")
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await server.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay recorded weather/D&D API responses")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8600)
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of <service>/ fixture folders")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Extra random seconds, up to this much")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with a 503")
+    parser.add_argument("--seed", type=int, default=None, help="Seed for reproducible jitter and failures")
+    try:
+        asyncio.run(serve(parser.parse_args()))
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,204 @@
+# Benchmark for the game server query paths in cogs/servers.py
+# Queries the stand-ins from bench/game_servers.py through the query engine in utils/gameservers.py and reports
+# latency, throughput, correctness and event loop blocking for each scenario.
+# Run from the repository root with: python -m bench.server_queries --queries 100 --concurrency 10
+import argparse
+import asyncio
+import json
+import logging
+import threading
+import time
+from bench.bot_throughput import percentile
+from bench.game_servers import A2SServer, Faults, PalworldRestServer, RconServer, start_a2s, start_rcon
+from utils import breaker, gameservers, metrics
+
+
+PASSWORD = "bench"
+
+# Scenario -> protocol and the stand-in's behavior
+SCENARIOS = {
+    "a2s": {"protocol": "a2s", "challenge": False},
+    "a2s_challenge": {"protocol": "a2s", "challenge": True},
+    "a2s_split": {"protocol": "a2s", "challenge": False, "split_size": 32},
+    "a2s_loss": {"protocol": "a2s", "challenge": False, "loss": 0.2},
+    "rcon": {"protocol": "rcon"},
+    "rcon_loss": {"protocol": "rcon", "loss": 0.2},
+    "rest": {"protocol": "rest"},
+    "rest_errors": {"protocol": "rest", "loss": 0.2},
+    "rest_timeout": {"protocol": "rest", "latency_factor": 2},
+}
+
+
+class StandIns:
+    """Runs the stand-in servers on their own event loop thread
+
+    The query paths may block the bot's event loop, which must not stop the servers from answering.
+    """
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_forever, daemon=True)
+        self.thread.start()
+
+    def call(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    async def start(self, scenario, args):
+        """Start the stand-in for a scenario and return (port, stop coroutine function)"""
+        # latency_factor makes the stand-in answer that many timeouts late
+        latency = args.timeout * scenario["latency_factor"] if "latency_factor" in scenario else args.latency
+        faults = Faults(latency, args.jitter, scenario.get("loss", 0.0), args.seed)
+        protocol = scenario["protocol"]
+        if protocol == "a2s":
+            server = A2SServer(players=args.players, max_players=args.max_players, challenge=scenario["challenge"],
+                               split_size=scenario.get("split_size", 1248), faults=faults)
+            transport, port = await start_a2s(server)
+
+            async def stop():
+                transport.close()
+        elif protocol == "rcon":
+            server = RconServer(password=PASSWORD, players=args.players, faults=faults)
+            tcp_server, port = await start_rcon(server)
+
+            async def stop():
+                tcp_server.close()
+        else:
+            server = PalworldRestServer(password=PASSWORD, players=args.players, max_players=args.max_players,
+                                        faults=faults)
+            port = await server.start()
+            stop = server.stop
+        return port, stop
+
+    def close(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self.thread.join()
+
+
+class LoopWatcher:
+    """Record the worst lateness of a periodic tick, i.e. how long the event loop was blocked"""
+
+    def __init__(self, interval=0.01):
+        self.interval = interval
+        self.worst = 0.0
+        self.expected = None
+        self.task = None
+
+    async def tick(self):
+        while True:
+            self.expected = time.perf_counter() + self.interval
+            await asyncio.sleep(self.interval)
+            self.worst = max(self.worst, time.perf_counter() - self.expected)
+
+    async def start(self):
+        self.task = asyncio.create_task(self.tick())
+        await asyncio.sleep(0)  # take the first reading before anything else runs
+
+    def stop(self):
+        """Stop watching and return the worst lag in seconds, including a tick that is overdue right now"""
+        self.task.cancel()
+        return max(self.worst, time.perf_counter() - self.expected)
+
+
+def short_circuits():
+    return sum(count for (name, _), count in metrics.counters.items() if name == "biobot_breaker_short_circuits_total")
+
+
+async def run_scenario(name, args, stand_ins):
+    scenario = SCENARIOS[name]
+    port, stop = stand_ins.call(stand_ins.start(scenario, args))
+    protocol = scenario["protocol"]
+    rest = None
+    if protocol == "a2s":
+        query = lambda: gameservers.query_a2s("127.0.0.1", port, timeout=args.timeout)
+    elif protocol == "rcon":
+        query = lambda: gameservers.query_palworld_rcon("127.0.0.1", port, PASSWORD, timeout=args.timeout)
+    else:
+        # One pooled client like the bot keeps per server, without the cache so every query hits the stand-in
+        rest = gameservers.PalworldRestClient("127.0.0.1", port, "admin", PASSWORD, timeout=args.timeout, cache=False)
+        query = rest.player_count
+    # RCON can't report the player limit, so query_palworld_rcon always answers with the Palworld default
+    expected = (args.players, gameservers.PALWORLD_MAX_PLAYERS if protocol == "rcon" else args.max_players)
+
+    # Every scenario starts with closed breakers
+    breaker.breakers.clear()
+    short_circuits_before = short_circuits()
+    latencies, answers = [], []
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def timed_query():
+        async with semaphore:
+            started = time.perf_counter()
+            answers.append(await query())
+            latencies.append(time.perf_counter() - started)
+
+    watcher = LoopWatcher()
+    await watcher.start()
+    started = time.perf_counter()
+    try:
+        await asyncio.gather(*(timed_query() for _ in range(args.queries)))
+    finally:
+        elapsed = time.perf_counter() - started
+        blocked = watcher.stop()
+        if rest:
+            await rest.close()
+        stand_ins.call(stop())
+
+    latencies.sort()
+    return {
+        "scenario": name, "queries": args.queries, "seconds": elapsed, "queries_per_second": args.queries / elapsed,
+        "answered": sum(answer != (None, None) for answer in answers),
+        "correct": sum(answer == expected for answer in answers),
+        "sample_answer": max(set(answers), key=answers.count) if answers else None,
+        "p50_ms": percentile(latencies, 0.50) * 1000, "p95_ms": percentile(latencies, 0.95) * 1000,
+        "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+        "loop_blocked_ms": blocked * 1000,
+        "short_circuited": short_circuits() - short_circuits_before,
+    }
+
+
+async def run(args):
+    stand_ins = StandIns()
+    try:
+        return [await run_scenario(name, args, stand_ins) for name in args.scenario]
+    finally:
+        stand_ins.close()
+
+
+def report(args, results):
+    print(f"\n{args.queries} queries per scenario at concurrency {args.concurrency}, "
+          f"{args.players}/{args.max_players} players, timeout {args.timeout}s")
+    print(f"\n{'scenario':<15}{'q/s':>8}{'answered':>10}{'correct':>9}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"
+          f"{'blocked ms':>12}{'tripped':>9}  most common answer")
+    for r in results:
+        print(f"{r['scenario']:<15}{r['queries_per_second']:>8.1f}{r['answered']:>10}{r['correct']:>9}{r['p50_ms']:>9.1f}"
+              f"{r['p95_ms']:>9.1f}{r['max_ms']:>9.1f}{r['loop_blocked_ms']:>12.1f}{r['short_circuited']:>9}"
+              f"  {r['sample_answer']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the game server query paths against local stand-ins")
+    parser.add_argument("--scenario", action="append", choices=sorted(SCENARIOS),
+                        help="Scenario to run, can be repeated (default: all)")
+    parser.add_argument("--queries", type=int, default=50, help="Queries per scenario")
+    parser.add_argument("--concurrency", type=int, default=10, help="Queries in flight at once")
+    parser.add_argument("--players", type=int, default=8)
+    parser.add_argument("--max-players", type=int, default=16)
+    parser.add_argument("--latency", type=float, default=0.02, help="Seconds the stand-ins take to answer")
+    parser.add_argument("--jitter", type=float, default=0.01)
+    parser.add_argument("--timeout", type=float, default=0.5, help="Query timeout passed to the query methods")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+    args.scenario = args.scenario or list(SCENARIOS)
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)-8s %(name)s: %(message)s")
+    results = asyncio.run(run(args))
+    report(args, results)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+# Load simulator for the temporary voice channel system in cogs/voice.py
+# Runs the Voice cog alone against bench/fake_discord.py through the phases of a large community event:
+# hosts flood the hub channel, guests pile into their channels and hop between them, hosts leave
+# (ownership transfers) and finally everyone leaves (channels are deleted).
+# Run from the repository root with: python -m bench.voice_load --guilds 4 --hosts 250 --guests 750
+import argparse
+import asyncio
+import collections
+import json
+import logging
+import random
+import sys
+import time
+import tracemalloc
+import discord
+from discord.ext import commands
+from bench.bot_throughput import percentile
+from bench.fake_discord import FakeDiscord
+from cogs.voice import Voice
+
+
+def registry_bytes(temp_channels):
+    """Size of the temp channel registry itself, not counting the channel objects discord.py caches anyway"""
+    total = sys.getsizeof(temp_channels)
+    for channel_id, info in temp_channels.items():
+        total += sys.getsizeof(channel_id) + sys.getsizeof(info)
+        for key, value in info.items():
+            if key == 'channel':
+                continue
+            total += sys.getsizeof(value)
+            if key == 'join_times':
+                total += sum(sys.getsizeof(member_id) + sys.getsizeof(joined) for member_id, joined in value.items())
+    return total
+
+
+class ErrorCounter(logging.Handler):
+    """Count errors the cog logs, since it catches its own exceptions"""
+
+    def __init__(self):
+        super().__init__(logging.ERROR)
+        self.count = 0
+
+    def emit(self, record):
+        self.count += 1
+
+
+class VoiceLoad:
+    def __init__(self, args):
+        self.args = args
+        self.rng = random.Random(args.seed)
+        # Phase name -> handler latencies in seconds
+        self.latencies = collections.defaultdict(list)
+        self.phase = None
+        self.phases = []
+        self.results = {}
+        self.errors = ErrorCounter()
+
+    async def boot(self):
+        # Only what the cog needs, the same intents main.py requests for it
+        intents = discord.Intents(guilds=True, voice_states=True)
+        self.client = commands.Bot(command_prefix="!", intents=intents, chunk_guilds_at_startup=False,
+                                   member_cache_flags=discord.MemberCacheFlags.from_intents(intents))
+        self.voice = Voice(self.client)
+        # Cog listeners are looked up on the instance when the cog is added, so this times every event
+        handler = self.voice.on_voice_state_update
+
+        async def timed(member, before, after):
+            started = time.perf_counter()
+            try:
+                await handler(member, before, after)
+            finally:
+                self.latencies[self.phase].append(time.perf_counter() - started)
+        self.voice.on_voice_state_update = timed
+
+        self.fake = FakeDiscord(self.client, rest_latency=self.args.rest_latency)
+        self.hosts, self.guests = [], []
+        for g in range(self.args.guilds):
+            guild = self.fake.add_guild(f"Event guild {g}", text_channels=1, hub_channel=self.voice.founders_channel_name)
+            self.hosts += [(guild["id"], self.fake.add_member(guild["id"])["user"]["id"]) for _ in range(self.args.hosts)]
+            self.guests += [(guild["id"], self.fake.add_member(guild["id"])["user"]["id"]) for _ in range(self.args.guests)]
+        self.fake.install()
+        await self.client._async_setup_hook()
+        await self.client.add_cog(self.voice)
+        await self.fake.connect()
+        logging.getLogger("cogs.voice").addHandler(self.errors)
+        self.baseline_tasks = asyncio.all_tasks()
+
+    async def settle(self):
+        """Wait until every handler and echoed gateway event has finished"""
+        while True:
+            await asyncio.sleep(0)
+            tasks = asyncio.all_tasks() - self.baseline_tasks - {asyncio.current_task()}
+            if not tasks:
+                return
+            await asyncio.wait(tasks, timeout=self.args.timeout)
+
+    async def run_phase(self, name, moves):
+        """Inject (guild, user, channel or None) voice moves as one burst and record what they cost"""
+        self.phase = name
+        rest_before = self.fake.rest_calls.copy()
+        started = time.perf_counter()
+        for guild_id, user_id, channel_id in moves:
+            self.fake.voice_state_update(guild_id, user_id, channel_id)
+        await self.settle()
+        elapsed = time.perf_counter() - started
+
+        latencies = sorted(self.latencies[name])
+        rest = self.fake.rest_calls - rest_before
+        events = len(latencies)
+        self.phases.append({
+            "phase": name, "injected": len(moves), "events": events, "seconds": elapsed,
+            "events_per_second": events / elapsed if elapsed else 0.0,
+            "p50_ms": percentile(latencies, 0.50) * 1000, "p95_ms": percentile(latencies, 0.95) * 1000,
+            "p99_ms": percentile(latencies, 0.99) * 1000, "max_ms": (latencies[-1] if latencies else 0.0) * 1000,
+            "rest_calls": dict(rest.most_common()),
+            "rest_per_event": sum(rest.values()) / events if events else 0.0,
+            "temp_channels": len(self.voice.temp_channels),
+        })
+
+    def temp_channel_ids(self, guild_id):
+        return [str(channel_id) for channel_id, info in self.voice.temp_channels.items()
+                if str(info['channel'].guild.id) == guild_id]
+
+    async def run(self):
+        await self.boot()
+        try:
+            if self.args.tracemalloc:
+                tracemalloc.start()
+                heap_before = tracemalloc.get_traced_memory()[0]
+
+            hubs = {guild_id: self.fake.voice_channel(guild_id, self.voice.founders_channel_name)["id"]
+                    for guild_id in self.fake.guilds}
+            await self.run_phase("join", [(guild_id, user_id, hubs[guild_id]) for guild_id, user_id in self.hosts])
+
+            rooms = {guild_id: self.temp_channel_ids(guild_id) for guild_id in self.fake.guilds}
+            await self.run_phase("fill", [(guild_id, user_id, self.rng.choice(rooms[guild_id]))
+                                          for guild_id, user_id in self.guests])
+
+            hops = [self.rng.choice(self.guests) for _ in range(self.args.hops)]
+            await self.run_phase("hop", [(guild_id, user_id, self.rng.choice(rooms[guild_id])) for guild_id, user_id in hops])
+
+            # Measured at the peak, with every channel open and every member tracked
+            self.results["peak_temp_channels"] = len(self.voice.temp_channels)
+            self.results["registry_bytes"] = registry_bytes(self.voice.temp_channels)
+            if self.args.tracemalloc:
+                self.results["heap_growth_bytes"] = tracemalloc.get_traced_memory()[0] - heap_before
+
+            await self.run_phase("host_leave", [(guild_id, user_id, None) for guild_id, user_id in self.hosts])
+            await self.run_phase("drain", [(guild_id, user_id, None) for guild_id, user_id in self.guests])
+        finally:
+            tracemalloc.stop()
+            await self.client.close()
+
+        self.results["phases"] = self.phases
+        self.results["temp_channels_left"] = len(self.voice.temp_channels)
+        self.results["errors"] = self.errors.count
+
+    def report(self):
+        r = self.results
+        print(f"\n{self.args.guilds} guilds x ({self.args.hosts} hosts + {self.args.guests} guests), "
+              f"{self.args.hops} hops, REST latency {self.args.rest_latency * 1000:.0f}ms")
+        print(f"\n{'phase':<12}{'events':>8}{'events/s':>10}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+              f"{'REST/ev':>9}{'channels':>10}")
+        for p in r["phases"]:
+            print(f"{p['phase']:<12}{p['events']:>8}{p['events_per_second']:>10.0f}{p['p50_ms']:>9.2f}{p['p95_ms']:>9.2f}"
+                  f"{p['p99_ms']:>9.2f}{p['max_ms']:>9.2f}{p['rest_per_event']:>9.2f}{p['temp_channels']:>10}")
+        print("\nREST calls per phase:")
+        for p in r["phases"]:
+            print(f"  {p['phase']}: " + (", ".join(f"{count} {route}" for route, count in p["rest_calls"].items()) or "none"))
+        channels = r["peak_temp_channels"]
+        print(f"\nPeak: {channels} temp channels, registry {r['registry_bytes'] / 1024:.1f} KiB"
+              f" ({r['registry_bytes'] / max(channels, 1):.0f} bytes per channel)")
+        if "heap_growth_bytes" in r:
+            print(f"Python heap growth to peak: {r['heap_growth_bytes'] / 2**20:.1f} MiB including discord.py's caches")
+        print(f"Temp channels left over: {r['temp_channels_left']}, errors logged: {r['errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate voice channel churn against the Voice cog")
+    parser.add_argument("--guilds", type=int, default=2)
+    parser.add_argument("--hosts", type=int, default=250, help="Members per guild who open their own channel")
+    parser.add_argument("--guests", type=int, default=750, help="Members per guild who join someone else's channel")
+    parser.add_argument("--hops", type=int, default=1000, help="Guest moves between channels, across all guilds")
+    parser.add_argument("--rest-latency", type=float, default=0.0, help="Seconds per Discord REST call")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--tracemalloc", action="store_true", help="Also measure total Python heap growth (slower)")
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--json", help="Write the results to this file")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=args.log_level, format="%(asctime)s %(levelname)-8s %(name)s: %(message)s")
+    load = VoiceLoad(args)
+    asyncio.run(load.run())
+    load.report()
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(load.results, file, indent=2)
+    if load.results["errors"] or load.results["temp_channels_left"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
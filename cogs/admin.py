@@ -2,9 +2,13 @@
 import discord
 from discord.ext import commands
 from discord import Embed, Member
+from discord import app_commands
 import asyncio
+import logging
 import os
 
+log = logging.getLogger(__name__)
+
 
 role_name = {
 "juicers":int(os.getenv("Juicers", "0")),
@@ -27,55 +31,303 @@ role_color = {
 }
 
 
+async def group_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest group keywords for the group slash command"""
+    return [app_commands.Choice(name=keyword, value=keyword) for keyword in role_name if current.lower() in keyword][:25]
+
+
+async def color_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest colors for the color slash command"""
+    return [app_commands.Choice(name=color, value=color) for color in role_color if current.lower() in color][:25]
+
+
+class RoleMenu(discord.ui.View):
+    """Persistent role menu backed by the role_name and role_color maps"""
+
+    def __init__(self, admin):
+        # No timeout and fixed custom IDs so the view survives bot restarts
+        super().__init__(timeout=None)
+        self.admin = admin
+
+    @discord.ui.select(
+        custom_id="role_menu:group",
+        placeholder="Toggle a gaming group",
+        options=[discord.SelectOption(label=keyword.title(), value=keyword) for keyword in role_name]
+    )
+    async def group_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        await self.respond(interaction, await self.admin.toggle_group(interaction.user, select.values[0]))
+
+    @discord.ui.select(
+        custom_id="role_menu:color",
+        placeholder="Pick a color",
+        options=[discord.SelectOption(label=color.title(), value=color) for color in role_color]
+    )
+    async def color_select(self, interaction: discord.Interaction, select: discord.ui.Select):
+        await self.respond(interaction, await self.admin.set_color(interaction.user, select.values[0]))
+
+    async def respond(self, interaction, message):
+        """Re-send the menu so the client clears the picked option, then tell only the user what changed
+
+        Without the reset, picking the same group again sends no interaction, so it couldn't be toggled back.
+        """
+        await interaction.response.edit_message(view=self)
+        await interaction.followup.send(message, ephemeral=True)
+
+    async def on_error(self, interaction, error, item):
+        log.error("Role menu error", exc_info=error)
+        if not interaction.response.is_done():
+            await interaction.response.send_message("Something went wrong updating your roles.", ephemeral=True)
+        else:
+            await interaction.followup.send("Something went wrong updating your roles.", ephemeral=True)
+
+
 class Admin(commands.Cog):
     def __init__(self, client):
         self.client = client
-
-    @commands.command()
-    async def group(self, ctx, keyword: str):        
-        role_id = role_name.get(keyword)
-        
-        if role_id:
-            role = discord.utils.get(ctx.guild.roles, id=role_id)
-            
-            if role:
-                if role in ctx.author.roles:
-                    await ctx.author.remove_roles(role)
-                    await ctx.author.send(f'Removed role: {role.name}')
-                else:
-                    await ctx.author.add_roles(role)
-                    await ctx.author.send(f'Added role: {role.name}')
+        # Per-guild index of resolved group/color roles, keyed by guild ID
+        self.role_index = {}
+        # Reverse index of user ID -> IDs of guilds the bot shares with them
+        self.member_guilds = {}
+        # Guilds whose full member list has been loaded into member_guilds
+        self.indexed_guilds = set()
+        # Users looked up in every unindexed guild once; join/leave events keep their entry current after that
+        self.resolved_users = set()
+
+    async def cog_load(self):
+        # Re-attach the persistent role menu so buttons on old messages keep working after a restart
+        self.client.add_view(RoleMenu(self))
+        # Cogs load in the background, so READY may already have been dispatched
+        if self.client.is_ready():
+            self.build_indexes()
+
+    def export_state(self):
+        """Snapshot the mutual-guild index for a hot reload"""
+        return {"member_guilds": self.member_guilds, "indexed_guilds": self.indexed_guilds,
+                "resolved_users": self.resolved_users}
+
+    def import_state(self, state):
+        """Restore the mutual-guild index after a hot reload"""
+        self.member_guilds = state["member_guilds"]
+        self.indexed_guilds = state["indexed_guilds"]
+        self.resolved_users = state.get("resolved_users", set())
+
+    def build_role_index(self, guild):
+        """Resolve the configured role IDs for a guild once and cache the Role objects"""
+        groups = {keyword: guild.get_role(role_id) for keyword, role_id in role_name.items() if role_id}
+        colors = {color: guild.get_role(role_id) for color, role_id in role_color.items() if role_id}
+
+        index = {
+            "group": {keyword: role for keyword, role in groups.items() if role},
+            "color": {color: role for color, role in colors.items() if role},
+        }
+        # Set of color role IDs so a member's current color can be stripped in one pass
+        index["color_ids"] = frozenset(role.id for role in index["color"].values())
+
+        self.role_index[guild.id] = index
+        return index
+
+    def get_role_index(self, guild):
+        """Return the role index for a guild, building it on first use"""
+        index = self.role_index.get(guild.id)
+        if index is None:
+            index = self.build_role_index(guild)
+        return index
+
+    async def apply_role_change(self, member, add=None, remove_ids=frozenset()):
+        """Apply a role change to a member with a single Member.edit call"""
+        # Skip @everyone, which is always the first role and can't be sent back to the API
+        roles = [role for role in member.roles[1:] if role.id not in remove_ids]
+        if add is not None and add not in roles:
+            roles.append(add)
+        await member.edit(roles=roles)
+
+    def index_guild_members(self, guild):
+        """Add every cached member of a guild to the mutual-guild index"""
+        for member in guild.members:
+            self.member_guilds.setdefault(member.id, set()).add(guild.id)
+        self.indexed_guilds.add(guild.id)
+
+    async def find_member(self, guild, user_id):
+        """One member of a guild whose member list isn't loaded, fetched without caching it, or None if they
+        aren't in it; raises if Discord couldn't be asked"""
+        if self.client.intents.members:
+            found = await guild.query_members(user_ids=[user_id], cache=False)
+            return found[0] if found else None
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
+
+    async def mutual_members(self, user_id):
+        """(guild, member) for every guild shared with a user
+
+        Only the guilds the reverse index lists are asked for the member, so member lists are never loaded
+        and memory keeps scaling with active users. A user the index can't vouch for yet is looked up once in
+        every guild that isn't indexed; the results go into the index and events keep it current from then on.
+        """
+        guild_ids = set(self.member_guilds.get(user_id, ()))
+        resolving = user_id not in self.resolved_users
+        if resolving:
+            guild_ids |= {guild.id for guild in self.client.guilds if guild.id not in self.indexed_guilds}
+        guilds = [guild for guild in map(self.client.get_guild, guild_ids) if guild]
+        found = await asyncio.gather(*(self.lookup_member(guild, user_id) for guild in guilds), return_exceptions=True)
+
+        mutual = []
+        for guild, member in zip(guilds, found):
+            if isinstance(member, BaseException):
+                # Leave the index alone and ask again next time
+                log.warning("Could not look up user %s in guild %s: %r", user_id, guild.id, member)
+                resolving = False
+            elif member:
+                self.member_guilds.setdefault(user_id, set()).add(guild.id)
+                mutual.append((guild, member))
             else:
-                await ctx.author.send(f'Role with ID "{role_id}" not found.')
+                self.unindex_member(user_id, guild.id)
+        # Without the members intent no join/leave events arrive to keep the entry current
+        if resolving and self.client.intents.members:
+            self.resolved_users.add(user_id)
+        return mutual
+
+    async def lookup_member(self, guild, user_id):
+        """The cached member, or one looked up on its own"""
+        return guild.get_member(user_id) or await self.find_member(guild, user_id)
+
+    def unindex_member(self, user_id, guild_id):
+        """Drop a single guild from a user's mutual-guild entry"""
+        guild_ids = self.member_guilds.get(user_id)
+        if guild_ids is not None:
+            guild_ids.discard(guild_id)
+            if not guild_ids:
+                del self.member_guilds[user_id]
+
+    @commands.Cog.listener()
+    async def on_ready(self):
+        # on_ready fires again after a reconnect, so the indexes start from a clean slate
+        self.build_indexes()
+
+    def build_indexes(self):
+        """Build the role and mutual-guild indexes from the populated cache"""
+        self.member_guilds = {}
+        self.indexed_guilds = set()
+        self.resolved_users = set()
+        for guild in self.client.guilds:
+            self.build_role_index(guild)
+            # Unchunked guilds are looked up one user at a time by mutual_members
+            if guild.chunked:
+                self.index_guild_members(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild):
+        self.build_role_index(guild)
+        if guild.chunked:
+            self.index_guild_members(guild)
         else:
-            await ctx.author.send('Invalid keyword. Please use a valid keyword.')
+            # Nobody has been looked up in the new guild yet
+            self.resolved_users.clear()
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild):
+        self.role_index.pop(guild.id, None)
+        self.indexed_guilds.discard(guild.id)
+        for user_id in list(self.member_guilds):
+            self.unindex_member(user_id, guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member):
+        self.member_guilds.setdefault(member.id, set()).add(member.guild.id)
+
+    @commands.Cog.listener()
+    async def on_message(self, message):
+        # Chatting members index themselves for free
+        if message.guild and not message.webhook_id:
+            self.member_guilds.setdefault(message.author.id, set()).add(message.guild.id)
+
+    @commands.Cog.listener()
+    async def on_raw_member_remove(self, payload):
+        # Raw event so leaves are tracked even when the member isn't cached
+        self.unindex_member(payload.user.id, payload.guild_id)
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role):
+        # Invalidate so the index is rebuilt lazily on the next lookup
+        self.role_index.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role):
+        self.role_index.pop(role.guild.id, None)
+
+    async def toggle_group(self, member, keyword):
+        """Toggle a group role on a member and return the message to report back"""
+        role_id = role_name.get(keyword)
+        if not role_id:
+            return 'Invalid keyword. Please use a valid keyword.'
 
-    @commands.command()
-    async def color(self, ctx, color: str):
+        role = self.get_role_index(member.guild)["group"].get(keyword)
+        if not role:
+            return f'Role with ID "{role_id}" not found.'
+
+        if role in member.roles:
+            await self.apply_role_change(member, remove_ids={role.id})
+            return f'Removed role: {role.name}'
+
+        await self.apply_role_change(member, add=role)
+        return f'Added role: {role.name}'
+
+    async def set_color(self, member, color):
+        """Swap a member's color role and return the message to report back"""
         role_id = role_color.get(color.lower())
+        if not role_id:
+            return f'Color "{color}" not recognized.'
 
-        if role_id:
-            role = discord.utils.get(ctx.guild.roles, id=role_id)
-            
-            if role:
-                if role in ctx.author.roles:
-                    await ctx.author.send(f'{ctx.author.mention}, you already have the {role.name} role.')
-                    return
+        index = self.get_role_index(member.guild)
+        role = index["color"].get(color.lower())
+        if not role:
+            return f'Role with ID "{role_id}" not found.'
 
-                # Remove existing color roles
-                existing_roles = [discord.utils.get(ctx.guild.roles, id=int(id)) for id in role_color.values()]
-                for existing_role in existing_roles:
-                    if existing_role in ctx.author.roles:
-                        await ctx.author.remove_roles(existing_role)
+        if role in member.roles:
+            return f'{member.mention}, you already have the {role.name} role.'
 
-                # Add the new role
-                await ctx.author.add_roles(role)
-                await ctx.author.send(f'{ctx.author.mention} has been added to the {role.name}!')
+        # Swap out any existing color roles and add the new one in a single update
+        await self.apply_role_change(member, add=role, remove_ids=index["color_ids"])
+        return f'{member.mention} has been added to the {role.name}!'
 
-            else:
-                await ctx.author.send(f'Role with ID "{role_id}" not found.')
+    async def send_role_result(self, ctx, message):
+        """Reply ephemerally to slash commands and by DM to prefix commands"""
+        if ctx.interaction:
+            await ctx.send(message, ephemeral=True)
         else:
-            await ctx.author.send(f'Color "{color}" not recognized.')
+            await ctx.author.send(message)
+
+    @commands.hybrid_command(description="Toggle a gaming group role")
+    @commands.guild_only()
+    @app_commands.describe(keyword="Group to join or leave")
+    @app_commands.autocomplete(keyword=group_autocomplete)
+    async def group(self, ctx, keyword: str):
+        await self.send_role_result(ctx, await self.toggle_group(ctx.author, keyword))
+
+    @commands.hybrid_command(description="Change your color role")
+    @commands.guild_only()
+    @app_commands.describe(color="Color to switch to")
+    @app_commands.autocomplete(color=color_autocomplete)
+    async def color(self, ctx, color: str):
+        await self.send_role_result(ctx, await self.set_color(ctx.author, color))
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def role_menu(self, ctx):
+        """Post the self-service role menu in the current channel (Admin only)"""
+        embed = discord.Embed(
+            title="Role Menu",
+            description="Pick a group to join or leave, or pick a new color.\nOnly you will see the result.",
+            color=discord.Color.blue()
+        )
+        await ctx.send(embed=embed, view=RoleMenu(self))
+
+    @role_menu.error
+    async def role_menu_error(self, ctx, error):
+        """Handle errors for role_menu command"""
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You need administrator permissions to use this command.")
 
     @commands.command()
     async def member_servers(self, ctx, member: discord.Member = None):
@@ -91,11 +343,9 @@ class Admin(commands.Cog):
         # Send confirmation in channel that command was received
         await ctx.send(f"Sending server list for {member.display_name} via DM...")
         
-        # Get all mutual guilds between the bot and the member
-        mutual_guilds = []
-        for guild in self.client.guilds:
-            if guild.get_member(member.id):
-                mutual_guilds.append(guild)
+        # Look up mutual guilds from the reverse index instead of scanning every guild
+        mutual_members = await self.mutual_members(member.id)
+        mutual_guilds = [guild for guild, _ in mutual_members]
         
         if not mutual_guilds:
             try:
@@ -116,18 +366,16 @@ class Admin(commands.Cog):
         
         # Add server information
         server_info = []
-        for guild in mutual_guilds:
-            guild_member = guild.get_member(member.id)
-            if guild_member:
-                # Get member's highest role in that server
-                highest_role = guild_member.top_role.name if guild_member.top_role.name != "@everyone" else "No special roles"
-                # Get join date
-                join_date = guild_member.joined_at.strftime("%Y-%m-%d") if guild_member.joined_at else "Unknown"
-                
-                server_info.append(f"**{guild.name}**\n"
-                                 f"├ Members: {guild.member_count}\n"
-                                 f"├ Highest Role: {highest_role}\n"
-                                 f"└ Joined: {join_date}")
+        for guild, guild_member in mutual_members:
+            # Get member's highest role in that server
+            highest_role = guild_member.top_role.name if guild_member.top_role.name != "@everyone" else "No special roles"
+            # Get join date
+            join_date = guild_member.joined_at.strftime("%Y-%m-%d") if guild_member.joined_at else "Unknown"
+            
+            server_info.append(f"**{guild.name}**\n"
+                             f"├ Members: {guild.member_count}\n"
+                             f"├ Highest Role: {highest_role}\n"
+                             f"└ Joined: {join_date}")
         
         # Split into multiple fields if too many servers
         if len(server_info) <= 5:
@@ -247,7 +495,19 @@ class Admin(commands.Cog):
             value="Assign color roles (removes existing color roles)\n**Available:** red, orange, yellow, green, blue, purple, pink, grey, black, white",
             inline=False
         )
-        
+
+        embed.add_field(
+            name="`!role_menu`",
+            value="Post a persistent role menu so members can pick groups and colors without commands",
+            inline=False
+        )
+
+        embed.add_field(
+            name="`!status_board [off]`",
+            value="Post a pinned game server status board in this channel that updates itself, or remove it",
+            inline=False
+        )
+
         embed.add_field(
             name="Examples",
             value="`!member_servers @username` - Check user's servers\n`!server_info` - Your own server info\n`!group palworld` - Toggle Palworld role\n`!color blue` - Get blue color role",
@@ -346,7 +606,9 @@ class Admin(commands.Cog):
                 value="`!member_servers [member]` - List all servers that a member shares with the bot\n"
                       "**Example:** `!member_servers @username`\n\n"
                       "`!server_info [member]` - Get detailed member information\n"
-                      "**Example:** `!server_info @username`",
+                      "**Example:** `!server_info @username`\n\n"
+                      "`!stats` - Command and upstream latency/error statistics\n\n"
+                      "`!status_board [off]` - Pinned game server status board that updates itself",
                 inline=False
             )
 
@@ -355,6 +617,7 @@ class Admin(commands.Cog):
                 name="**Server Monitoring**",
                 value="`!server` - See all running game servers\n"
                       "`!players [server_name]` - Check player counts\n"
+                      "`!players_history <server_name>` - Peak hours and trends\n"
                       "**Example:** `!players ark-server`",
                 inline=False
             )
@@ -366,7 +629,10 @@ class Admin(commands.Cog):
                       "**Example:** `!weather London`\n\n"
                       "`!forecast <city>` - Get weather forecast\n"
                       "**Example:** `!forecast New York`\n\n"
-                      "`!friends` - Weather for friend locations",
+                      "`!friends` - Weather for friend locations\n"
+                      "`!weather_digest <HH:MM> <city>` - Daily weather digest\n"
+                      "`!weather_alerts <city>` - Severe weather alerts\n"
+                      "`!weather_subs` / `!weather_unsub <#>` - Manage subscriptions",
                 inline=False
             )
 
@@ -390,7 +656,7 @@ class Admin(commands.Cog):
                       "`!race` - Random character race\n"
                       "`!class` - Random character class\n"
                       "`!background` - Random character background\n"
-                      "`!stats` - Roll character stats\n"
+                      "`!dnd_rolls` - Roll character stats\n"
                       "`!character` - Generate full random character\n"
                       "`!spell <level>` - Random spell by level",
                 inline=False
@@ -436,6 +702,7 @@ class Admin(commands.Cog):
                 name="**Server Monitoring**",
                 value="`!server` - See all running game servers\n"
                       "`!players [server_name]` - Check player counts\n"
+                      "`!players_history <server_name>` - Peak hours and trends\n"
                       "**Example:** `!players ark-server`",
                 inline=False
             )
@@ -447,7 +714,10 @@ class Admin(commands.Cog):
                       "**Example:** `!weather London`\n\n"
                       "`!forecast <city>` - Get weather forecast\n"
                       "**Example:** `!forecast New York`\n\n"
-                      "`!friends` - Weather for friend locations",
+                      "`!friends` - Weather for friend locations\n"
+                      "`!weather_digest <HH:MM> <city>` - Daily weather digest\n"
+                      "`!weather_alerts <city>` - Severe weather alerts\n"
+                      "`!weather_subs` / `!weather_unsub <#>` - Manage subscriptions",
                 inline=False
             )
 
@@ -471,7 +741,7 @@ class Admin(commands.Cog):
                       "`!race` - Random character race\n"
                       "`!class` - Random character class\n"
                       "`!background` - Random character background\n"
-                      "`!stats` - Roll character stats\n"
+                      "`!dnd_rolls` - Roll character stats\n"
                       "`!character` - Generate full random character\n"
                       "`!spell <level>` - Random spell by level",
                 inline=False
@@ -1,7 +1,9 @@
 # D&D 5e Character Creator using the official D&D 5e API
 import discord
 from discord.ext import commands
-import aiohttp
+from discord import app_commands
+from utils.dnd import DnDProvider
+from utils.governor import governed
 import random
 import json
 
@@ -10,18 +12,46 @@ import json
 class DnDCharacterCreator(commands.Cog):
     def __init__(self, client):
         self.client = client
-        self.api_base = "https://www.dnd5eapi.co/api/2014"
+        # SRD data source, swappable for a local replay server
+        self.provider = DnDProvider()
+        # Race/class listings used for slash command autocomplete, fetched once
+        self.index_cache = {}
         
+    def export_state(self):
+        """Snapshot cached API listings for a hot reload"""
+        return {"index_cache": self.index_cache, "last_good": self.provider.last_good}
+
+    def import_state(self, state):
+        """Restore cached API listings after a hot reload"""
+        self.index_cache = state["index_cache"]
+        self.provider.last_good = state.get("last_good", {})
+
+    async def cog_unload(self):
+        await self.provider.close()
+
     async def fetch_api_data(self, endpoint):
-        """Fetch data from the D&D 5e API"""
-        try:
-            async with aiohttp.ClientSession() as session:
-                async with session.get(f"{self.api_base}{endpoint}") as response:
-                    if response.status == 200:
-                        return await response.json()
-                    return None
-        except Exception:
-            return None
+        """Fetch data from the D&D 5e API, falling back to the last good response"""
+        return await self.provider.get(endpoint)
+
+    async def index_choices(self, endpoint, current):
+        """Return autocomplete choices from a cached /races or /classes listing"""
+        if endpoint not in self.index_cache:
+            data = await self.fetch_api_data(endpoint)
+            if not data:
+                return []
+            self.index_cache[endpoint] = [(entry["name"], entry["index"]) for entry in data["results"]]
+
+        current = current.lower()
+        return [
+            app_commands.Choice(name=name, value=index)
+            for name, index in self.index_cache[endpoint] if current in name.lower()
+        ][:25]
+
+    async def race_autocomplete(self, interaction: discord.Interaction, current: str):
+        return await self.index_choices("/races", current)
+
+    async def class_autocomplete(self, interaction: discord.Interaction, current: str):
+        return await self.index_choices("/classes", current)
 
     def roll_ability_scores(self, method="4d6_drop_lowest"):
         """Generate ability scores using various methods"""
@@ -47,9 +77,10 @@ class DnDCharacterCreator(commands.Cog):
         """Calculate ability modifier from ability score"""
         return (score - 10) // 2
 
-    @commands.command()
+    @commands.hybrid_command()
     async def dnd_races(self, ctx):
         """List all available D&D races"""
+        await ctx.defer()
         races_data = await self.fetch_api_data("/races")
         if not races_data:
             await ctx.send("Unable to fetch races data from the API.")
@@ -77,9 +108,10 @@ class DnDCharacterCreator(commands.Cog):
         embed.set_footer(text="Use !dnd_race <race_name> for detailed info about a specific race")
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     async def dnd_classes(self, ctx):
         """List all available D&D classes"""
+        await ctx.defer()
         classes_data = await self.fetch_api_data("/classes")
         if not classes_data:
             await ctx.send("Unable to fetch classes data from the API.")
@@ -107,9 +139,12 @@ class DnDCharacterCreator(commands.Cog):
         embed.set_footer(text="Use !dnd_class <class_name> for detailed info about a specific class")
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
+    @app_commands.describe(race_name="Race to look up, e.g. dwarf")
+    @app_commands.autocomplete(race_name=race_autocomplete)
     async def dnd_race(self, ctx, *, race_name: str):
         """Get detailed information about a specific race"""
+        await ctx.defer()
         race_data = await self.fetch_api_data(f"/races/{race_name.lower().replace(' ', '-')}")
         if not race_data:
             await ctx.send(f"Race '{race_name}' not found. Use `!dnd_races` to see available races.")
@@ -151,9 +186,12 @@ class DnDCharacterCreator(commands.Cog):
 
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
+    @app_commands.describe(class_name="Class to look up, e.g. wizard")
+    @app_commands.autocomplete(class_name=class_autocomplete)
     async def dnd_class(self, ctx, *, class_name: str):
         """Get detailed information about a specific class"""
+        await ctx.defer()
         class_data = await self.fetch_api_data(f"/classes/{class_name.lower().replace(' ', '-')}")
         if not class_data:
             await ctx.send(f"Class '{class_name}' not found. Use `!dnd_classes` to see available classes.")
@@ -198,9 +236,17 @@ class DnDCharacterCreator(commands.Cog):
         embed.set_footer(text=f"Use !dnd_create to start creating a {class_data['name']} character!")
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
+    @app_commands.describe(
+        race_name="Race for the character (random if omitted)",
+        class_name="Class for the character (random if omitted)",
+        character_name="Name for the character (generated if omitted)"
+    )
+    @app_commands.autocomplete(race_name=race_autocomplete, class_name=class_autocomplete)
+    @governed("dnd_create")
     async def dnd_create(self, ctx, race_name: str = None, class_name: str = None, *, character_name: str = None):
         """Create a random D&D character or specify race/class"""
+        await ctx.defer(ephemeral=True)
         
         # Get races and classes data
         races_data = await self.fetch_api_data("/races")
@@ -303,7 +349,14 @@ class DnDCharacterCreator(commands.Cog):
         except discord.Forbidden:
             await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
+    @app_commands.describe(method="Rolling method")
+    @app_commands.choices(method=[
+        app_commands.Choice(name="4d6 drop lowest", value="4d6"),
+        app_commands.Choice(name="Standard array", value="standard"),
+        app_commands.Choice(name="Point buy", value="point"),
+        app_commands.Choice(name="Straight 3d6", value="3d6")
+    ])
     async def dnd_rolls(self, ctx, method: str = "4d6"):
         """Generate ability scores using different methods"""
         methods = {
@@ -358,7 +411,7 @@ class DnDCharacterCreator(commands.Cog):
         
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     async def dnd_help(self, ctx):
         """Show D&D character creator help"""
         embed = discord.Embed(
@@ -395,7 +448,8 @@ class DnDCharacterCreator(commands.Cog):
         await ctx.send(embed=embed)
 
 
-    @commands.command(name='dice')
+    @commands.hybrid_command(name='dice', description="Roll dice in #d# format")
+    @app_commands.describe(dice="Dice to roll, e.g. 2d6")
     async def dice(self, ctx, dice: str):
         try:
             rolls, limit = map(int, dice.split('d'))
@@ -0,0 +1,121 @@
+# setup imports
+import discord
+from discord.ext import commands, tasks
+import logging
+import os
+import time
+
+
+# Set COG_HOT_RELOAD=1 to reload cogs automatically when their files change
+HOT_RELOAD = os.getenv("COG_HOT_RELOAD", "0") == "1"
+COGS_DIR = "./cogs"
+
+log = logging.getLogger(__name__)
+
+
+class Reloader(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        # Last seen modification time of each cog file
+        self.mtimes = self.scan_cogs()
+
+    async def cog_load(self):
+        if HOT_RELOAD:
+            self.watch_cogs.start()
+
+    async def cog_unload(self):
+        self.watch_cogs.cancel()
+
+    def scan_cogs(self):
+        """Return the modification time of every cog file"""
+        mtimes = {}
+        for filename in os.listdir(COGS_DIR):
+            if filename.endswith('.py'):
+                mtimes[filename[:-3]] = os.path.getmtime(os.path.join(COGS_DIR, filename))
+        return mtimes
+
+    def collect_state(self, extension):
+        """Collect handoff state from every cog instance belonging to an extension"""
+        state = {}
+        for name, cog in self.client.cogs.items():
+            if cog.__module__ == extension and hasattr(cog, "export_state"):
+                state[name] = cog.export_state()
+        return state
+
+    def restore_state(self, extension, state):
+        """Hand saved state to the freshly loaded cog instances of an extension"""
+        for name, cog in self.client.cogs.items():
+            if cog.__module__ == extension and name in state and hasattr(cog, "import_state"):
+                cog.import_state(state[name])
+
+    async def reload_cog(self, cog):
+        """Reload a cog in place, carrying its state over to the new instance"""
+        extension = f'cogs.{cog}'
+        start = time.perf_counter()
+
+        if extension not in self.client.extensions:
+            await self.client.load_extension(extension)
+        else:
+            state = self.collect_state(extension)
+            await self.client.reload_extension(extension)
+            self.restore_state(extension, state)
+
+        self.mtimes[cog] = os.path.getmtime(os.path.join(COGS_DIR, f'{cog}.py'))
+        log.info("Reloaded cog %s in %.0f ms", cog, (time.perf_counter() - start) * 1000)
+
+        # Pick up any slash command changes; unchanged trees skip the sync
+        sync_command_tree = getattr(self.client, "sync_command_tree", None)
+        if sync_command_tree:
+            await sync_command_tree()
+
+    @tasks.loop(seconds=2)
+    async def watch_cogs(self):
+        """Reload any cog whose file changed since the last scan"""
+        for cog, mtime in self.scan_cogs().items():
+            # Reloading this cog from its own loop would cancel the reload halfway through
+            if cog == "reload":
+                continue
+            if self.mtimes.get(cog) != mtime:
+                try:
+                    await self.reload_cog(cog)
+                except Exception as e:
+                    # Keep the old version running and don't retry until the file changes again
+                    self.mtimes[cog] = mtime
+                    log.exception("Failed to reload cog %s", cog)
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def reload(self, ctx, cog: str = None):
+        """Reload one cog, or every changed cog if none is given (Admin only)"""
+        if cog is None:
+            changed = [name for name, mtime in self.scan_cogs().items() if self.mtimes.get(name) != mtime]
+        elif cog in self.mtimes:
+            changed = [cog]
+        else:
+            await ctx.send(f"Unknown cog '{cog}'. Available cogs: {', '.join(sorted(self.mtimes))}")
+            return
+
+        if not changed:
+            await ctx.send("No cogs have changed since they were loaded.")
+            return
+
+        reloaded = []
+        for name in changed:
+            try:
+                await self.reload_cog(name)
+                reloaded.append(name)
+            except Exception as e:
+                await ctx.send(f"Failed to reload **{name}**: {e}")
+
+        if reloaded:
+            await ctx.send(f"Reloaded: {', '.join(reloaded)}")
+
+    @reload.error
+    async def reload_error(self, ctx, error):
+        """Handle errors for reload command"""
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You need administrator permissions to use this command.")
+
+
+async def setup(client):
+    await client.add_cog(Reloader(client))
@@ -1,353 +1,308 @@
 # setup imports
 import discord
-from discord.ext import commands
-import psutil
-import aiohttp
+from discord.ext import commands, tasks
+from discord import app_commands
 import asyncio
-import socket
-import struct
+import logging
 import os
+import time
+from utils import charts, metrics
+from utils.gameservers import POLL_INTERVAL, load_inventory, probe_all
+from utils.governor import governed
+from utils.storage import read_json, write_json_atomic
+from utils.timeseries import PlayerHistory, bucket_start
 
 
-processes = {
-    "ark": {
-        "process": "ArkAscendedServer.exe",
-        "port": 7777,  # Default ARK query port
-        "query_type": "ark"
-    },
-    "palworld": {
-        "process": "PalServer-Win64-Shipping-Cmd.exe", 
-        "port": 8211,  # Default Palworld game port (UDP)
-        "query_port": 25575,  # RCON port for queries (TCP)
-        "rest_api_port": 8212,  # REST API port (HTTP)
-        "query_type": "palworld_rest",  # Use REST API as primary method
-        "fallback_query": "palworld_rcon"  # Fallback to RCON if REST API fails
-    },
-    "enshrouded": {
-        "process": "enshrouded.exe",
-        "port": 15636,  # Default Enshrouded port  
-        "query_type": "steam"
-    }
-}
+# Server name -> GameServer; see utils/gameservers.py for the SERVER_INVENTORY_FILE format
+inventory = load_inventory()
+# Channel that gets a message when a server starts, stops or crosses a player threshold (0 disables)
+NOTIFY_CHANNEL = int(os.getenv("SERVER_NOTIFY_CHANNEL", "0"))
+# Role pinged when a server starts or climbs past a threshold (0 pings no one)
+NOTIFY_ROLE = int(os.getenv("SERVER_NOTIFY_ROLE", "0"))
+NOTIFY_THRESHOLDS = sorted(int(value) for value in os.getenv("SERVER_NOTIFY_THRESHOLDS", "1").split(",") if value.strip())
+# Polls in a row a new state must be seen before it is announced, so a flapping server doesn't spam
+NOTIFY_DEBOUNCE = max(1, int(os.getenv("SERVER_NOTIFY_DEBOUNCE", "2")))
+# Where each guild's status board message and the servers' start times are kept between restarts
+STATUS_BOARD_FILE = os.getenv("STATUS_BOARD_FILE", "status_boards.json")
+
+SPARKS = "▁▂▃▄▅▆▇█"
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+log = logging.getLogger(__name__)
+
+
+async def server_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest configured server names for slash commands"""
+    current = current.lower()
+    return [app_commands.Choice(name=name, value=name) for name in inventory if current in name][:25]
+
+
+def chunk_lines(header, lines, limit=2000):
+    """Split a header and lines into messages that fit Discord's length limit"""
+    messages, current = [], header
+    for line in lines:
+        if len(current) + len(line) + 1 > limit:
+            messages.append(current)
+            current = line
+        else:
+            current = f"{current}\n{line}" if current else line
+    messages.append(current)
+    return messages
+
+
+def sparkline(values):
+    """Draw values as a row of block characters scaled to the largest one"""
+    top = max(values, default=0) or 1
+    return "".join(SPARKS[round(value / top * (len(SPARKS) - 1))] for value in values)
+
+
+def server_key(status):
+    """The inventory key for a probe; history, boards and notifications are all keyed by it"""
+    return status["name"].lower()
+
+
+def server_state(status, previous=None):
+    """(online, number of NOTIFY_THRESHOLDS reached) for a probe; an unknown count keeps the previous level"""
+    if not status["online"]:
+        return False, 0
+    if status["players"] is None:
+        return True, previous[1] if previous and previous[0] else 0
+    return True, sum(status["players"] >= threshold for threshold in NOTIFY_THRESHOLDS)
+
+
+def describe_change(status, old, new):
+    """The notification line for a state change, and whether it should ping NOTIFY_ROLE"""
+    name = f"**{status['name']}**"
+    if not new[0]:
+        return f"🔴 {name} stopped", False
+    players = f"{status['players']}/{status['max_players']}" if status["max_players"] else f"{status['players']}"
+    if not old[0]:
+        counted = f" with {players} players" if status["players"] is not None else ""
+        return f"🟢 {name} started{counted} - {status['address']}", True
+    if new[1] > old[1]:
+        return f"📈 {name} is up to {players} players", True
+    return f"📉 {name} is down to {players} players", False
+
+
+def status_board_embed(statuses, online_since):
+    """The status board: every server in the inventory with its players and uptime"""
+    embed = discord.Embed(title="Game Servers", color=discord.Color.green())
+    show_hosts = len({status["host"] for status in statuses}) > 1
+    lines = []
+    for status in statuses:
+        where = f" on {status['host']}" if show_hosts else ""
+        if not status["online"]:
+            lines.append(f"🔴 **{status['name']}**{where} - offline")
+            continue
+        if status["players"] is None:
+            players = "player count unavailable"
+        elif status["max_players"] is not None:
+            players = f"{status['players']}/{status['max_players']} players"
+        else:
+            players = f"{status['players']} players"
+        # A relative timestamp ticks on its own in the client, so uptime never forces an edit
+        since = online_since.get(server_key(status))
+        uptime = f", up since <t:{since}:R>" if since else ""
+        lines.append(f"🟢 **{status['name']}**{where} - {players}{uptime}")
+    embed.description = "\n".join(lines)[:4096] or "No servers configured."
+    embed.set_footer(text=f"Updated every {POLL_INTERVAL:.0f} seconds when something changes")
+    return embed
 
 
 class Hosting(commands.Cog):
     def __init__(self, client):
         self.client = client
+        self.history = None
+        # Inventory key -> status from the latest background probe
+        self.latest = {}
+        # Inventory key -> (online, threshold level) last announced, and a different state still being confirmed
+        self.announced = {}
+        self.pending = {}
+        # Guild ID -> {"channel_id", "message_id"} of its status board, persisted to STATUS_BOARD_FILE
+        self.boards = {}
+        # Inventory key -> unix time it was first seen online in its current run
+        self.online_since = {}
+        # Guild ID -> the board embed as last sent, to skip edits that change nothing
+        self.board_content = {}
 
-    async def query_steam_server(self, host="127.0.0.1", port=27015, timeout=5):
-        """Query a Steam-based game server for player count using A2S_INFO protocol"""
-        try:
-            # Create UDP socket
-            sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            sock.settimeout(timeout)
-            
-            # A2S_INFO query packet
-            query = b'\xFF\xFF\xFF\xFF\x54Source Engine Query\x00'
-            
-            # Send query
-            sock.sendto(query, (host, port))
-            
-            # Receive response
-            data, addr = sock.recvfrom(1024)
-            sock.close()
-            
-            # Parse response (simplified)
-            if len(data) > 6 and data[4] == 0x49:  # A2S_INFO response
-                # Skip header and parse
-                offset = 6
-                # Skip server name (null-terminated string)
-                while offset < len(data) and data[offset] != 0:
-                    offset += 1
-                offset += 1
-                
-                # Skip map name
-                while offset < len(data) and data[offset] != 0:
-                    offset += 1
-                offset += 1
-                
-                # Skip folder name  
-                while offset < len(data) and data[offset] != 0:
-                    offset += 1
-                offset += 1
-                
-                # Skip game name
-                while offset < len(data) and data[offset] != 0:
-                    offset += 1
-                offset += 1
-                
-                if offset + 2 < len(data):
-                    # Skip app ID (2 bytes)
-                    offset += 2
-                    # Get player count
-                    players = data[offset] if offset < len(data) else 0
-                    # Get max players
-                    max_players = data[offset + 1] if offset + 1 < len(data) else 0
-                    return players, max_players
-                    
-        except Exception as e:
-            # Error querying server - silently handle
-            pass
-            
-        return None, None
+    async def cog_load(self):
+        self.history = await asyncio.to_thread(PlayerHistory)
+        saved = await asyncio.to_thread(read_json, STATUS_BOARD_FILE, {})
+        self.boards = {int(guild_id): board for guild_id, board in saved.get("boards", {}).items()}
+        self.online_since = saved.get("online_since", {})
+        self.poller.start()
 
-    async def query_ark_server(self, host="127.0.0.1", port=7777):
-        """Query ARK server using RCON or Steam query (simplified version)"""
-        # ARK uses Steam query protocol on query port
-        return await self.query_steam_server(host, port + 1)  # ARK query port is usually game port + 1
+    async def cog_unload(self):
+        self.poller.cancel()
+        await asyncio.to_thread(self.history.close)
+        await asyncio.gather(*(server.close() for server in inventory.values()))
 
-    async def query_palworld_rcon(self, host="127.0.0.1", port=25575, password="", timeout=5):
-        """Query Palworld server using RCON protocol"""
+    @tasks.loop(seconds=POLL_INTERVAL)
+    async def poller(self):
+        """Probe the whole inventory and record every server's player count"""
+        started = time.perf_counter()
+        statuses = await probe_all(inventory.values())
+        metrics.observe("biobot_server_poll_seconds", time.perf_counter() - started)
+        self.latest = {server_key(status): status for status in statuses}
+        if NOTIFY_CHANNEL:
+            await self.notify(self.state_changes(statuses))
+        await self.update_boards(statuses)
+
+        # An offline server has no players; an online one whose count is unknown is skipped
+        samples = {server_key(status): status["players"] if status["online"] else 0
+                   for status in statuses if not status["online"] or status["players"] is not None}
         try:
-            # Simple RCON implementation for Palworld
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(timeout)
-            sock.connect((host, port))
-            
-            # RCON packet structure: length(4) + id(4) + type(4) + body + null(2)
-            request_id = 12345  # Use a specific ID to track
-            auth_type = 3  # SERVERDATA_AUTH
-            exec_type = 2  # SERVERDATA_EXECCOMMAND
-            
-            # Authentication packet - MUST be done properly
-            if password:
-                auth_packet = struct.pack('<iii', request_id, auth_type, 0) + password.encode('utf-8') + b'\x00\x00'
-                length = len(auth_packet)
-                full_packet = struct.pack('<i', length) + auth_packet
-                sock.send(full_packet)
-                
-                # Read auth response and validate
-                auth_response = sock.recv(1024)
-                if len(auth_response) >= 12:
-                    auth_length, auth_id, auth_type_resp = struct.unpack('<iii', auth_response[:12])
-                    
-                    # Check if authentication succeeded
-                    if auth_id == -1:
-                        sock.close()
-                        return None, None
-                    elif auth_id != request_id:
-                        sock.close()
-                        return None, None
-                else:
-                    sock.close()
-                    return None, None
-            else:
-                sock.close()
-                return None, None
-            
-            # Send ShowPlayers command with new request ID
-            command_id = request_id + 1
-            command = "ShowPlayers"
-            exec_packet = struct.pack('<iii', command_id, exec_type, 0) + command.encode('utf-8') + b'\x00\x00'
-            length = len(exec_packet)
-            full_packet = struct.pack('<i', length) + exec_packet
-            sock.send(full_packet)
-            
-            # Read command response
-            response = sock.recv(4096)
-            sock.close()
-            
-            # Parse response for player count
-            if len(response) >= 12:
-                try:
-                    resp_length, resp_id, resp_type = struct.unpack('<iii', response[:12])
-                    
-                    # Extract the actual response string
-                    response_str = response[12:].decode('utf-8', errors='ignore').rstrip('\x00')
-                    
-                    # If response is empty or just whitespace, it means no players online
-                    if not response_str.strip():
-                        return 0, 32  # Return 0 players, 32 max
-                    
-                    # Parse response for player count using multiple methods
-                    player_count = 0
-                    lines = response_str.strip().split('\n')
-                    
-                    # Method 1: Count lines with player info patterns
-                    for line in lines:
-                        line_lower = line.lower().strip()
-                        if any(keyword in line_lower for keyword in ['name:', 'player', 'uid:', 'steamid:']):
-                            if line_lower and not line_lower.startswith(('welcome', 'server', 'version')):
-                                player_count += 1
-                    
-                    # Method 2: Try regex patterns if no players found
-                    if player_count == 0:
-                        import re
-                        # Look for various player patterns
-                        patterns = [
-                            r'name:\s*([^\s,]+)',
-                            r'player[^\s]*:\s*([^\s,]+)',
-                            r'([^\s]+)\s*,\s*uid:',
-                            r'([^\s]+)\s*,\s*steamid:'
-                        ]
-                        
-                        for pattern in patterns:
-                            matches = re.findall(pattern, response_str, re.IGNORECASE)
-                            if matches:
-                                player_count = len(matches)
-                                break
-                    
-                    # For max players, we'll use default or try to parse from server info
-                    max_players = 32  # Default Palworld max
-                    
-                    return player_count, max_players
-                    
-                except Exception as parse_error:
-                    # Even if parsing fails, if we got a response, assume 0 players
-                    return 0, 32
+            await asyncio.to_thread(self.history.record, samples)
+        except Exception:
+            log.exception("Could not record player counts")
+
+    def state_changes(self, statuses):
+        """Diff a poll against the announced states; a change counts once it held for NOTIFY_DEBOUNCE polls"""
+        changes = []
+        for status in statuses:
+            name = server_key(status)
+            old = self.announced.get(name)
+            new = server_state(status, old)
+            if old is None:
+                # The first poll after startup is the baseline, not news
+                self.announced[name] = new
+            elif new == old:
+                self.pending.pop(name, None)
             else:
-                # If we got a connection but short response, assume 0 players
-                return 0, 32
-            
-        except socket.timeout:
-            return None, None
-        except ConnectionRefusedError:
-            return None, None
-        except Exception as e:
-            # If we authenticated but got an error during query, assume 0 players
-            # This handles cases where the server is running but has issues
-            if "Authentication successful" in str(e) or hasattr(e, 'errno'):
-                return 0, 32
-            
-        return None, None
+                seen = self.pending.get(name)
+                count = seen[1] + 1 if seen and seen[0] == new else 1
+                if count >= NOTIFY_DEBOUNCE:
+                    self.pending.pop(name, None)
+                    self.announced[name] = new
+                    changes.append((status, old, new))
+                else:
+                    self.pending[name] = (new, count)
+        return changes
 
-    async def query_palworld_rest_api(self, host="127.0.0.1", port=8212, timeout=5):
-        """Query Palworld server using REST API for player information"""
-        try:
-            # Get REST API credentials from environment
-            rest_username = os.environ.get("PALWORLD_REST_USERNAME", "admin")
-            rest_password = os.environ.get("PALWORLD_REST_PASSWORD", "")
-            
-            if not rest_password:
-                return None, None
-            
-            # Use aiohttp to make HTTP requests to the REST API with basic auth
-            timeout_config = aiohttp.ClientTimeout(total=timeout)
-            auth = aiohttp.BasicAuth(rest_username, rest_password)
-            
-            async with aiohttp.ClientSession(timeout=timeout_config, auth=auth) as session:
-                # Get server info and player list
-                base_url = f"http://{host}:{port}/v1/api"
-                
-                # First get server info for max players
-                async with session.get(f"{base_url}/info") as response:
-                    if response.status == 401:
-                        return None, None
-                    elif response.status != 200:
-                        return None, None
-                        
-                    server_info = await response.json()
-                    
-                    # Extract server name and version for reference
-                    server_name = server_info.get("servername", "Unknown")
-                    max_players = server_info.get("serverPlayerMaxNum", 32)
-                    
-                # Get current players
-                async with session.get(f"{base_url}/players") as response:
-                    if response.status == 401:
-                        return None, None
-                    elif response.status != 200:
-                        return None, None
-                        
-                    players_data = await response.json()
-                    
-                    # Count current players
-                    if isinstance(players_data, dict) and "players" in players_data:
-                        current_players = len(players_data["players"])
-                    elif isinstance(players_data, list):
-                        current_players = len(players_data)
-                    else:
-                        current_players = 0
-                    
-                    return current_players, max_players
-                    
-        except aiohttp.ClientConnectorError:
-            return None, None
-        except aiohttp.ClientResponseError as e:
-            return None, None
-        except asyncio.TimeoutError:
-            return None, None
-        except Exception as e:
-            return None, None
-
-    async def get_server_player_count(self, server_name, server_info):
-        """Get player count for a specific server"""
+    async def notify(self, changes):
+        """Post all changes from one poll as a single message"""
+        if not changes:
+            return
+        lines, ping = [], False
+        for status, old, new in changes:
+            line, pings = describe_change(status, old, new)
+            lines.append(line)
+            ping = ping or pings
+            metrics.increment("biobot_server_notifications_total", server=status["name"])
+        if ping and NOTIFY_ROLE:
+            lines.insert(0, f"<@&{NOTIFY_ROLE}>")
+        channel = self.client.get_channel(NOTIFY_CHANNEL)
+        if channel is None:
+            log.warning("Server notification channel %s not found", NOTIFY_CHANNEL)
+            return
         try:
-            if server_info["query_type"] == "steam":
-                players, max_players = await self.query_steam_server(port=server_info["port"])
-            elif server_info["query_type"] == "ark":
-                players, max_players = await self.query_ark_server(port=server_info["port"])
-            elif server_info["query_type"] == "palworld_rcon":
-                query_port = server_info.get("query_port", 25575)
-                rcon_password = os.environ.get("PALWORLD_RCON_PASSWORD", "")
-                players, max_players = await self.query_palworld_rcon(port=query_port, password=rcon_password)
-                
-                # If RCON fails and we have a fallback, try it
-                if (players is None or max_players is None) and "fallback_query" in server_info:
-                    if server_info["fallback_query"] == "steam":
-                        players, max_players = await self.query_steam_server(port=server_info["port"])
-            elif server_info["query_type"] == "palworld_rest":
-                query_port = server_info.get("rest_api_port", 8212)
-                players, max_players = await self.query_palworld_rest_api(port=query_port)
-                
-                # If REST API fails and we have a fallback, try it
-                if (players is None or max_players is None) and "fallback_query" in server_info:
-                    if server_info["fallback_query"] == "palworld_rcon":
-                        query_port = server_info.get("query_port", 25575)
-                        rcon_password = os.environ.get("PALWORLD_RCON_PASSWORD", "")
-                        players, max_players = await self.query_palworld_rcon(port=query_port, password=rcon_password)
-            else:
-                return None, None
-                
-            return players, max_players
-        except Exception as e:
-            return None, None
+            for message in chunk_lines("", lines):
+                await channel.send(message, allowed_mentions=discord.AllowedMentions(everyone=False, users=False, roles=True))
+        except discord.HTTPException:
+            log.warning("Could not post server notifications", exc_info=True)
 
+    async def save_boards(self):
+        saved = {"boards": {str(guild_id): board for guild_id, board in self.boards.items()},
+                 "online_since": dict(self.online_since)}
+        await asyncio.to_thread(write_json_atomic, STATUS_BOARD_FILE, saved)
 
-    @commands.command()
+    async def update_boards(self, statuses):
+        """Edit every guild's status board whose content changed since it was last sent"""
+        running = {server_key(status) for status in statuses if status["online"]}
+        started = running - set(self.online_since)
+        stopped = set(self.online_since) - running
+        for name in started:
+            self.online_since[name] = int(time.time())
+        for name in stopped:
+            del self.online_since[name]
+        changed = bool(started or stopped)
+
+        embed = status_board_embed(statuses, self.online_since)
+        content = embed.to_dict()
+        for guild_id, board in list(self.boards.items()):
+            if self.board_content.get(guild_id) == content:
+                continue
+            # The channel can be missing from the cache while its guild is unavailable or the cache refills after
+            # a reconnect, so edit through a partial channel and let Discord say whether the board still exists
+            channel = (self.client.get_channel(board["channel_id"])
+                       or self.client.get_partial_messageable(board["channel_id"], guild_id=guild_id))
+            try:
+                await channel.get_partial_message(board["message_id"]).edit(embed=embed)
+                self.board_content[guild_id] = content
+            except discord.NotFound:
+                # The board or its channel was deleted; stop updating it
+                log.info("Status board for guild %s is gone", guild_id)
+                self.boards.pop(guild_id, None)
+                self.board_content.pop(guild_id, None)
+                changed = True
+            except discord.HTTPException:
+                log.warning("Could not update the status board for guild %s", guild_id, exc_info=True)
+        if changed:
+            await self.save_boards()
+
+    @poller.before_loop
+    async def before_poller(self):
+        await self.client.wait_until_ready()
+
+    def history_summary(self, server_name):
+        """Everything !players_history shows, read from the coarsest rollup that answers each part"""
+        now = time.time()
+        return {
+            "hours": self.history.series(server_name, "1h", bucket_start(now, "1h") - 24 * 3600),
+            "days": self.history.series(server_name, "1d", bucket_start(now, "1d") - 7 * 86400),
+            "peak_hours": self.history.peak_hours(server_name),
+            "trend": self.history.trend(server_name),
+        }
+
+    @commands.hybrid_command(description="Show running game servers with player counts")
+    @governed("server")
     async def server(self, ctx):
+        await ctx.defer()
+        # Every server is checked at once, across all hosts
+        statuses = await probe_all(inventory.values())
+        # Only name the host when the fleet spans more than one
+        show_hosts = len({status["host"] for status in statuses}) > 1
         running_processes = []
 
-        for name, server_info in processes.items():
-            process_name = server_info["process"]
-            if any(proc.name() == process_name for proc in psutil.process_iter()):
-                # Server is running, now get player count
-                players, max_players = await self.get_server_player_count(name, server_info)
-                
-                if players is not None and max_players is not None:
-                    running_processes.append(f"**{name}** ({players}/{max_players} players)")
-                else:
-                    running_processes.append(f"**{name}** (player count unavailable)")
+        for status in statuses:
+            if not status["online"]:
+                continue
+            name = f"**{status['name']}** on {status['host']}" if show_hosts else f"**{status['name']}**"
+            if status["players"] is not None and status["max_players"] is not None:
+                running_processes.append(f"{name} ({status['players']}/{status['max_players']} players)")
+            else:
+                running_processes.append(f"{name} (player count unavailable)")
 
         if running_processes:
-            await ctx.send(f"The following server(s) are running:\n{chr(10).join(running_processes)}")
+            for message in chunk_lines("The following server(s) are running:", running_processes):
+                await ctx.send(message)
         else:
             await ctx.send("No specified servers are currently running.")
 
-    @commands.command()
+    @commands.hybrid_command()
+    @app_commands.describe(server_name="Server to check")
+    @app_commands.autocomplete(server_name=server_autocomplete)
+    @governed("players")
     async def players(self, ctx, server_name: str = None):
         """Get detailed player information for a specific server"""
+        await ctx.defer()
         if server_name is None:
-            server_list = ", ".join(processes.keys())
+            server_list = ", ".join(inventory.keys())
             await ctx.send(f"Please specify a server name. Available servers: {server_list}")
             return
             
         server_name = server_name.lower()
-        if server_name not in processes:
-            server_list = ", ".join(processes.keys())
+        if server_name not in inventory:
+            server_list = ", ".join(inventory.keys())
             await ctx.send(f"Unknown server '{server_name}'. Available servers: {server_list}")
             return
             
-        server_info = processes[server_name]
-        process_name = server_info["process"]
-        
-        # Check if server is running
-        if not any(proc.name() == process_name for proc in psutil.process_iter()):
+        # Check if server is running and get player count
+        status, = await probe_all([inventory[server_name]])
+        if not status["online"]:
             await ctx.send(f"**{server_name}** server is not currently running.")
             return
-            
-        # Get player count
-        players, max_players = await self.get_server_player_count(server_name, server_info)
+        players, max_players = status["players"], status["max_players"]
         
         if players is not None and max_players is not None:
             embed = discord.Embed(
@@ -356,7 +311,21 @@ class Hosting(commands.Cog):
             )
             embed.add_field(name="Status", value="Online", inline=True)
             embed.add_field(name="Players", value=f"{players}/{max_players}", inline=True)
-            embed.add_field(name="Port", value=server_info["port"], inline=True)
+            embed.add_field(name="Address", value=status["address"], inline=True)
+
+            details = status["details"]
+            if details:
+                if details["fps"] is not None:
+                    embed.add_field(name="Server FPS", value=str(details["fps"]), inline=True)
+                if details["uptime"] is not None:
+                    embed.add_field(name="Up since", value=f"<t:{int(time.time() - details['uptime'])}:R>", inline=True)
+                if details["version"]:
+                    embed.add_field(name="Version", value=details["version"], inline=True)
+                if details["players"]:
+                    names = [f"{player['name']} (Lv {player['level']}, {round(player['ping'])} ms)"
+                             if player["level"] is not None and player["ping"] is not None else player["name"]
+                             for player in details["players"]]
+                    embed.add_field(name="Online now", value=", ".join(names)[:1024], inline=False)
             
             if players == 0:
                 embed.add_field(name="Activity", value="No players online", inline=False)
@@ -366,11 +335,116 @@ class Hosting(commands.Cog):
                 embed.add_field(name="Activity", value="Moderate activity", inline=False)
             else:
                 embed.add_field(name="Activity", value="High activity", inline=False)
-                
-            await ctx.send(embed=embed)
+
+            chart = await self.players_chart(server_name, max_players)
+            file = chart.attach(embed) if chart else None
+            message = await ctx.send(embed=embed, file=file)
+            if file:
+                chart.sent(message)
         else:
             await ctx.send(f"**{server_name}** is running but player count is unavailable. The server may not have query enabled or may be using a different query protocol.")
 
+    async def players_chart(self, server_name, max_players):
+        """Chart of the last 24 hours of player counts, or None without history"""
+        if self.history is None:
+            return None
+        hours = await asyncio.to_thread(self.history.series, server_name, "1h",
+                                    bucket_start(time.time(), "1h") - 24 * 3600)
+        if not hours:
+            return None
+        # Rounded so the chart only changes (and is redrawn) when a new hour is rolled up
+        points = [[bucket, round(average, 2), low, high] for bucket, average, low, high in hours]
+        return await charts.render("players", {"points": points, "bucket": 3600, "max_players": max_players,
+                                               "offset": time.localtime().tm_gmtoff})
+
+    @commands.command()
+    @commands.guild_only()
+    @commands.has_permissions(administrator=True)
+    async def status_board(self, ctx, action: str = None):
+        """Post a pinned, self-updating server status board in this channel, or `off` to remove it (Admin only)"""
+        old = self.boards.pop(ctx.guild.id, None)
+        self.board_content.pop(ctx.guild.id, None)
+        if old:
+            # Only one board per guild: the new one replaces it
+            channel = self.client.get_channel(old["channel_id"])
+            if channel is not None:
+                try:
+                    await channel.get_partial_message(old["message_id"]).delete()
+                except discord.HTTPException:
+                    pass
+        if action == "off":
+            await self.save_boards()
+            await ctx.send("Status board removed." if old else "This server has no status board.")
+            return
+
+        statuses = list(self.latest.values()) or await probe_all(inventory.values())
+        embed = status_board_embed(statuses, self.online_since)
+        message = await ctx.send(embed=embed)
+        try:
+            await message.pin()
+        except discord.HTTPException:
+            await ctx.send("I couldn't pin the status board; it needs Manage Messages to be pinned.", delete_after=15)
+        self.boards[ctx.guild.id] = {"channel_id": ctx.channel.id, "message_id": message.id}
+        self.board_content[ctx.guild.id] = embed.to_dict()
+        await self.save_boards()
+
+    @status_board.error
+    async def status_board_error(self, ctx, error):
+        """Handle errors for status_board command"""
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You need administrator permissions to use this command.")
+
+    @commands.hybrid_command(description="Player count history and trends for a game server")
+    @app_commands.describe(server_name="Server to show")
+    @app_commands.autocomplete(server_name=server_autocomplete)
+    async def players_history(self, ctx, server_name: str):
+        """Show a server's player counts over the last day and week, its busiest hours and its trend"""
+        server_name = server_name.lower()
+        if server_name not in inventory:
+            server_list = ", ".join(inventory.keys())
+            await ctx.send(f"Unknown server '{server_name}'. Available servers: {server_list}")
+            return
+
+        summary = await asyncio.to_thread(self.history_summary, server_name)
+        hours, days = summary["hours"], summary["days"]
+        if not hours and not days:
+            await ctx.send(f"No history for **{server_name}** yet. Player counts are recorded every "
+                           f"{POLL_INTERVAL:.0f} seconds and show up here once the first hour is over.")
+            return
+
+        embed = discord.Embed(title=f"{server_name.title()} Player History", color=discord.Color.blue())
+        if hours:
+            peak = max(hours, key=lambda row: row[3])
+            embed.add_field(
+                name="Last 24 hours",
+                value=f"`{sparkline([row[1] for row in hours])}`\n"
+                      f"Peak of {peak[3]} players around {time.strftime('%H:00', time.localtime(peak[0]))}",
+                inline=False)
+        if days:
+            busiest = max(days, key=lambda row: row[3])
+            embed.add_field(
+                name="Last 7 days",
+                value=f"`{sparkline([row[3] for row in days])}` daily peaks\n"
+                      f"Busiest day: {WEEKDAYS[time.gmtime(busiest[0]).tm_wday]} with {busiest[3]} players",
+                inline=False)
+        if summary["peak_hours"]:
+            embed.add_field(
+                name="Peak hours",
+                value="\n".join(f"{hour:02d}:00-{(hour + 1) % 24:02d}:00 - {average:.1f} players on average"
+                                for hour, average in summary["peak_hours"]),
+                inline=False)
+        recent, previous = summary["trend"]
+        if recent is not None:
+            if previous:
+                change = (recent - previous) / previous * 100
+                direction = "up" if change >= 0 else "down"
+                trend = f"{recent:.1f} players on average this week, {direction} {abs(change):.0f}% from {previous:.1f}"
+            else:
+                trend = f"{recent:.1f} players on average this week"
+            embed.add_field(name="Trend", value=trend, inline=False)
+        embed.set_footer(text=f"Sampled every {POLL_INTERVAL:.0f}s")
+        await ctx.send(embed=embed)
+
     @commands.command()
     async def help_server(self, ctx):
         """Display help for server monitoring commands"""
@@ -388,13 +462,25 @@ class Hosting(commands.Cog):
         
         embed.add_field(
             name="`!players <server_name>`",
-            value="Get detailed information about a specific server\n**Available servers:** ark, palworld, enshrouded",
+            value=f"Get detailed information about a specific server\n**Available servers:** {', '.join(inventory)}"[:1024],
+            inline=False
+        )
+        
+        embed.add_field(
+            name="`!players_history <server_name>`",
+            value="Player counts over the last day and week, peak hours and the weekly trend",
+            inline=False
+        )
+        
+        embed.add_field(
+            name="`!status_board [off]`",
+            value="Post a pinned status board in this channel that keeps itself up to date (Admin only)",
             inline=False
         )
         
         embed.add_field(
             name="Examples",
-            value="`!server` - List all running servers\n`!players palworld` - Check Palworld server details",
+            value="`!server` - List all running servers\n`!players palworld` - Check Palworld server details\n`!players_history palworld` - See when Palworld is busiest",
             inline=False
         )
         
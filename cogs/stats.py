@@ -0,0 +1,132 @@
+# setup imports
+import discord
+from discord.ext import commands
+from aiohttp import web
+import logging
+import os
+import time
+from utils import metrics
+
+
+# Local port for the Prometheus-style /metrics endpoint, 0 disables it
+METRICS_PORT = int(os.getenv("METRICS_PORT", "9108"))
+
+log = logging.getLogger(__name__)
+
+
+class Stats(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        self.runner = None
+
+    async def cog_load(self):
+        if METRICS_PORT:
+            app = web.Application()
+            app.router.add_get("/metrics", self.handle_metrics)
+            self.runner = web.AppRunner(app)
+            await self.runner.setup()
+            # Bind to localhost only; scrape through the host, never expose publicly
+            await web.TCPSite(self.runner, "127.0.0.1", METRICS_PORT).start()
+            log.info("Metrics endpoint listening on http://127.0.0.1:%s/metrics", METRICS_PORT)
+
+    async def cog_unload(self):
+        if self.runner:
+            await self.runner.cleanup()
+
+    async def handle_metrics(self, request):
+        return web.Response(text=metrics.render_prometheus(), content_type="text/plain")
+
+    @commands.Cog.listener()
+    async def on_command(self, ctx):
+        ctx.command_started = time.perf_counter()
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        started = getattr(ctx, "command_started", None)
+        if started is not None:
+            metrics.observe_command(ctx.command.qualified_name, time.perf_counter() - started, "ok")
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        command = ctx.command.qualified_name if ctx.command else "unknown"
+        started = getattr(ctx, "command_started", None)
+        if started is not None:
+            metrics.observe_command(command, time.perf_counter() - started, "error")
+        metrics.command_error(command, getattr(error, "original", error))
+
+        # Tell users when the command governor turned them away
+        if isinstance(error, (commands.CommandOnCooldown, commands.MaxConcurrencyReached)):
+            # Both carry the BucketType of the limit that was hit
+            scope = error.type if isinstance(error, commands.CommandOnCooldown) else error.per
+            metrics.increment("biobot_governor_rejections_total", command=command, scope=scope.name)
+        if isinstance(error, commands.CommandOnCooldown):
+            await ctx.send(f"Slow down! `{command}` is on cooldown, try again in {error.retry_after:.0f}s.",
+                           ephemeral=True, delete_after=10)
+            return
+        if isinstance(error, commands.MaxConcurrencyReached):
+            await ctx.send(f"`{command}` is already running, try again once it finishes.",
+                           ephemeral=True, delete_after=10)
+            return
+
+        # Registering this listener disables the library's default error printing, so keep it for unhandled errors
+        if ctx.command and ctx.command.has_error_handler():
+            return
+        if ctx.cog and ctx.cog.has_error_handler():
+            return
+        if isinstance(error, commands.CommandNotFound):
+            return
+        log.error("Ignoring exception in command %s", command, exc_info=error)
+
+    def summarize(self, metric, label):
+        """Merge histograms and error counts for a metric by one label"""
+        merged = {}
+        for (name, labels), histogram in metrics.histograms.items():
+            if name != metric:
+                continue
+            key = dict(labels)[label]
+            total = merged.setdefault(key, metrics.Histogram())
+            total.counts = [a + b for a, b in zip(total.counts, histogram.counts)]
+            total.total += histogram.total
+            total.count += histogram.count
+
+        errors = {}
+        for (name, labels), histogram in metrics.histograms.items():
+            labels = dict(labels)
+            if name == metric and labels.get("status") == "error":
+                errors[labels[label]] = errors.get(labels[label], 0) + histogram.count
+        return merged, errors
+
+    def format_summary(self, merged, errors):
+        lines = []
+        for key, histogram in sorted(merged.items(), key=lambda item: item[1].count, reverse=True)[:10]:
+            lines.append(f"**{key}** - {histogram.count} calls, "
+                         f"p50 ≤{histogram.quantile(0.5)}s, p95 ≤{histogram.quantile(0.95)}s, "
+                         f"{errors.get(key, 0)} errors")
+        return "\n".join(lines) or "No data yet"
+
+    @commands.command()
+    @commands.has_permissions(administrator=True)
+    async def stats(self, ctx):
+        """Show command and upstream latency/error statistics (Admin only)"""
+        embed = discord.Embed(
+            title="Bio-bot Stats",
+            description="Latency is estimated from histogram buckets",
+            color=discord.Color.blue()
+        )
+        commands_summary = self.summarize("biobot_command_duration_seconds", "command")
+        upstream_summary = self.summarize("biobot_upstream_duration_seconds", "upstream")
+        embed.add_field(name="Commands", value=self.format_summary(*commands_summary)[:1024], inline=False)
+        embed.add_field(name="Upstreams", value=self.format_summary(*upstream_summary)[:1024], inline=False)
+        if METRICS_PORT:
+            embed.set_footer(text=f"Full metrics at http://127.0.0.1:{METRICS_PORT}/metrics")
+        await ctx.send(embed=embed)
+
+    @stats.error
+    async def stats_error(self, ctx, error):
+        """Handle errors for stats command"""
+        if isinstance(error, commands.MissingPermissions):
+            await ctx.send("You need administrator permissions to use this command.")
+
+
+async def setup(client):
+    await client.add_cog(Stats(client))
@@ -1,8 +1,11 @@
 # Import required libraries
 import discord
 from discord.ext import commands
+from discord import app_commands
+import logging
 import time
 
+log = logging.getLogger(__name__)
 
 class Voice(commands.Cog):
     def __init__(self, client):
@@ -12,6 +15,21 @@ class Voice(commands.Cog):
         # Name of the channel to monitor
         self.founders_channel_name = "Welcome to the Party, PALS"
 
+    def export_state(self):
+        """Snapshot the temp channel registry for a hot reload"""
+        return {
+            channel_id: {key: value for key, value in info.items() if key != 'channel'}
+            for channel_id, info in self.temp_channels.items()
+        }
+
+    def import_state(self, state):
+        """Restore the temp channel registry after a hot reload"""
+        for channel_id, info in state.items():
+            channel = self.client.get_channel(channel_id)
+            # Skip channels that were deleted while the cog was reloading
+            if channel is not None:
+                self.temp_channels[channel_id] = {**info, 'channel': channel}
+
     @commands.Cog.listener()
     async def on_voice_state_update(self, member, before, after):
         """
@@ -95,21 +113,23 @@ class Voice(commands.Cog):
             # Move the user to their new channel
             await member.move_to(new_channel)
             
-            print(f"Created temporary channel '{new_channel_name}' for {member.display_name}")
+            log.info("Created temporary channel %r for %s", new_channel_name, member.display_name,
+                     extra={"channel_id": new_channel.id, "member_id": member.id})
             
         except discord.Forbidden:
-            print(f"Bot lacks permissions to create voice channels or move members")
+            log.warning("Bot lacks permissions to create voice channels or move members")
         except discord.HTTPException as e:
-            print(f"Failed to create voice channel: {e}")
+            log.error("Failed to create voice channel: %s", e)
         except Exception as e:
-            print(f"Unexpected error creating voice channel: {e}")
+            log.exception("Unexpected error creating voice channel")
 
     async def add_user_to_channel_tracking(self, member, channel):
         """Add a user to the join time tracking for a temporary channel"""
         if channel.id in self.temp_channels:
             current_time = time.time()
             self.temp_channels[channel.id]['join_times'][member.id] = current_time
-            print(f"{member.display_name} joined tracked channel: {channel.name}")
+            log.info("%s joined tracked channel: %s", member.display_name, channel.name,
+                     extra={"channel_id": channel.id, "member_id": member.id})
 
     async def handle_manual_rename(self, before, after):
         """Handle when a temporary channel is manually renamed"""
@@ -127,12 +147,14 @@ class Voice(commands.Cog):
             if after.name != expected_name:
                 channel_data['manually_renamed'] = True
                 channel_data['original_name_pattern'] = False
-                print(f"Channel '{before.name}' manually renamed to '{after.name}' - disabling auto-rename")
+                log.info("Channel %r manually renamed to %r - disabling auto-rename", before.name, after.name,
+                         extra={"channel_id": after.id})
             else:
                 # If it was renamed back to the owner pattern, re-enable auto-rename
                 channel_data['manually_renamed'] = False
                 channel_data['original_name_pattern'] = True
-                print(f"Channel '{after.name}' renamed back to owner pattern - enabling auto-rename")
+                log.info("Channel %r renamed back to owner pattern - enabling auto-rename", after.name,
+                         extra={"channel_id": after.id})
 
     async def remove_user_from_channel_tracking(self, member, channel):
         """Remove a user from the join time tracking"""
@@ -140,7 +162,8 @@ class Voice(commands.Cog):
             join_times = self.temp_channels[channel.id]['join_times']
             if member.id in join_times:
                 del join_times[member.id]
-                print(f"{member.display_name} left tracked channel: {channel.name}")
+                log.info("%s left tracked channel: %s", member.display_name, channel.name,
+                         extra={"channel_id": channel.id, "member_id": member.id})
 
     async def transfer_channel_ownership(self, channel):
         """Transfer ownership to the user who's been in the channel longest"""
@@ -178,18 +201,20 @@ class Voice(commands.Cog):
                 new_name = f"{new_owner.display_name}'s Chat"
                 
                 await channel.edit(name=new_name)
-                print(f"Transferred ownership and renamed '{old_name}' to '{new_name}' (new owner: {new_owner.display_name})")
+                log.info("Transferred ownership and renamed %r to %r (new owner: %s)", old_name, new_name, new_owner.display_name,
+                         extra={"channel_id": channel.id, "member_id": new_owner.id})
             else:
                 # Just transfer ownership without renaming
                 guild = channel.guild
                 old_creator = guild.get_member(old_creator_id)
                 old_creator_name = old_creator.display_name if old_creator else "Unknown User"
-                print(f"Transferred ownership of '{channel.name}' from {old_creator_name} to {new_owner.display_name} (custom name preserved)")
+                log.info("Transferred ownership of %r from %s to %s (custom name preserved)", channel.name, old_creator_name,
+                         new_owner.display_name, extra={"channel_id": channel.id, "member_id": new_owner.id})
             
         except discord.Forbidden:
-            print(f"Bot lacks permissions to edit voice channel: {channel.name}")
+            log.warning("Bot lacks permissions to edit voice channel: %s", channel.name)
         except Exception as e:
-            print(f"Error transferring channel ownership: {e}")
+            log.exception("Error transferring channel ownership")
 
     async def delete_temp_channel(self, channel):
         """Delete a temporary voice channel when it becomes empty"""
@@ -201,18 +226,18 @@ class Voice(commands.Cog):
                 
                 # Delete the channel
                 await channel.delete(reason="Temporary voice channel is empty")
-                print(f"Deleted empty temporary channel: {creator_name}")
+                log.info("Deleted empty temporary channel: %s", creator_name, extra={"channel_id": channel.id})
                 
         except discord.Forbidden:
-            print(f"Bot lacks permissions to delete voice channel: {channel.name}")
+            log.warning("Bot lacks permissions to delete voice channel: %s", channel.name)
         except discord.NotFound:
             # Channel was already deleted
             if channel.id in self.temp_channels:
                 del self.temp_channels[channel.id]
         except Exception as e:
-            print(f"Error deleting temporary channel: {e}")
+            log.exception("Error deleting temporary channel")
 
-    @commands.command()
+    @commands.hybrid_command()
     async def voice_help(self, ctx):
         """Show help for voice channel management"""
         embed = discord.Embed(
@@ -263,7 +288,7 @@ class Voice(commands.Cog):
         embed.set_footer(text="Voice management system active")
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     async def voice_status(self, ctx):
         """Show current temporary voice channels"""
         if not self.temp_channels:
@@ -316,10 +341,12 @@ class Voice(commands.Cog):
         
         await ctx.send(embed=embed)
 
-    @commands.command()
+    @commands.hybrid_command()
     @commands.has_permissions(administrator=True)
+    @app_commands.default_permissions(administrator=True)
     async def voice_cleanup(self, ctx):
         """Force cleanup of empty temporary channels (Admin only)"""
+        await ctx.defer()
         cleaned_count = 0
         
         # Make a copy of the keys to avoid dictionary size change during iteration
@@ -343,7 +370,7 @@ class Voice(commands.Cog):
                         del self.temp_channels[channel_id]
                         cleaned_count += 1
                 except Exception as e:
-                    print(f"Error during cleanup of channel {channel_id}: {e}")
+                    log.exception("Error during cleanup of channel %s", channel_id)
         
         if cleaned_count > 0:
             await ctx.send(f"Cleaned up {cleaned_count} empty temporary voice channel(s).")
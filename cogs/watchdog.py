@@ -0,0 +1,106 @@
+# setup imports
+import discord
+from discord.ext import commands
+import asyncio
+import logging
+import os
+import sys
+import threading
+import time
+import traceback
+from utils import metrics
+
+
+# How often the event loop heartbeat ticks, and how long it may go silent before it counts as a stall
+HEARTBEAT_INTERVAL = 0.1
+STALL_THRESHOLD = float(os.getenv("STALL_THRESHOLD", "0.5"))
+
+log = logging.getLogger(__name__)
+
+
+class Watchdog(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        # Context ID -> "cog/command" for every command currently running
+        self.inflight = {}
+        self.last_tick = time.monotonic()
+        self.stopped = threading.Event()
+        self.heartbeat_task = None
+        self.monitor_thread = None
+
+    async def cog_load(self):
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread_id = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self.heartbeat_task = asyncio.create_task(self.heartbeat())
+        self.monitor_thread = threading.Thread(target=self.monitor, name="event-loop-watchdog", daemon=True)
+        self.monitor_thread.start()
+        # A bot hook rather than an on_command listener: listeners run as separate tasks, so a command that
+        # blocks before its first await wouldn't be in flight yet, while before_invoke runs inline in invoke
+        self.client.before_invoke(self.command_started)
+
+    async def cog_unload(self):
+        self.stopped.set()
+        if self.heartbeat_task:
+            self.heartbeat_task.cancel()
+        if self.client._before_invoke == self.command_started:
+            self.client._before_invoke = None
+
+    async def heartbeat(self):
+        """Tick on the event loop and record how late each tick runs"""
+        while True:
+            start = self.loop.time()
+            await asyncio.sleep(HEARTBEAT_INTERVAL)
+            lag = self.loop.time() - start - HEARTBEAT_INTERVAL
+            self.last_tick = time.monotonic()
+            metrics.observe("biobot_event_loop_lag_seconds", max(lag, 0.0))
+
+    def monitor(self):
+        """Runs in a thread: report the loop's stack when the heartbeat stops ticking"""
+        reported_tick = None
+        while not self.stopped.wait(STALL_THRESHOLD / 2):
+            last_tick = self.last_tick
+            blocked_for = time.monotonic() - last_tick
+            # Report each stall once, while the blocking callback is still on the stack
+            if blocked_for < STALL_THRESHOLD or reported_tick == last_tick:
+                continue
+            reported_tick = last_tick
+            self.report_stall(blocked_for)
+
+    def blocking_cog_frame(self, frame):
+        """Return (cog module, function) of the innermost cog frame on the blocked stack"""
+        while frame is not None:
+            filename = frame.f_code.co_filename
+            if os.path.basename(os.path.dirname(filename)) == "cogs":
+                return os.path.basename(filename)[:-3], frame.f_code.co_name
+            frame = frame.f_back
+        return "none", "unknown"
+
+    def report_stall(self, blocked_for):
+        frame = sys._current_frames().get(self.loop_thread_id)
+        stack = "".join(traceback.format_stack(frame)) if frame else "    <stack unavailable>\n"
+
+        # Attribute the stall to the cog code on the blocked stack and list the commands in flight
+        cog, function = self.blocking_cog_frame(frame)
+        inflight = ", ".join(self.inflight.values()) or "none"
+
+        metrics.increment("biobot_event_loop_stalls_total", cog=cog, function=function)
+        log.warning("Event loop blocked for %.2fs+ in %s.%s (commands in flight: %s):\n%s",
+                    blocked_for, cog, function, inflight, stack,
+                    extra={"blocked_seconds": blocked_for, "cog": cog, "function": function})
+
+    async def command_started(self, ctx):
+        cog = ctx.cog.qualified_name if ctx.cog else "none"
+        self.inflight[id(ctx)] = f"{cog}/{ctx.command.qualified_name}"
+
+    @commands.Cog.listener()
+    async def on_command_completion(self, ctx):
+        self.inflight.pop(id(ctx), None)
+
+    @commands.Cog.listener()
+    async def on_command_error(self, ctx, error):
+        self.inflight.pop(id(ctx), None)
+
+
+async def setup(client):
+    await client.add_cog(Watchdog(client))
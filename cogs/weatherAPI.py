@@ -1,212 +1,262 @@
 # setup imports
 import discord
-from discord.ext import commands
-import aiohttp
+from discord.ext import commands, tasks
+from discord import app_commands
+from utils import charts
+from utils.breaker import breaker_for
+from utils.governor import governed
+from utils.storage import read_json, write_json_atomic
+from utils.weather import make_backend
 import asyncio
+import datetime
+import logging
 import os
+import time
+from urllib.parse import urlsplit
 
 WEATHER_KEY = os.environ["WEATHER_KEY"]
 WEATHER_KEY2 = os.environ["WEATHER_KEY2"]
 
+# Fetches and caches geocoding and weather documents, see utils/weather.py
+backend = make_backend(WEATHER_KEY2)
+# utils/breaker.py trips breakers per host, so follow OPENWEATHER_BASE_URL rather than assuming OpenWeatherMap's
+WEATHER_HOST = urlsplit(backend.base_url).netloc
+
+# Where weather digest/alert subscriptions are kept between restarts
+SUBSCRIPTIONS_FILE = os.getenv("WEATHER_SUBSCRIPTIONS_FILE", "weather_subscriptions.json")
+MAX_SUBSCRIPTIONS_PER_USER = 5
+# How often subscribed locations are checked for severe weather, and how long before the same alert repeats
+ALERT_INTERVAL = 30 * 60
+ALERT_REPEAT = 6 * 60 * 60
+
+log = logging.getLogger(__name__)
+
+# Locations shown by !friends, also used to suggest cities for slash commands
+friend_cities = [
+    "graz", "stuttgart", "gavle", "london",
+    "new york", "nashville", "port of spain",
+    "chicago", "champaign", "st louis", "fargo", "denver",
+    "tucson", "burbank", "los angeles", "vancouver"
+]
+
+# For US cities, use abbreviated state
+state_abbrev = {
+    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
+    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
+    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
+    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
+    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
+    'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
+    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
+    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
+    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
+    'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
+    'District of Columbia': 'DC'
+}
+
+# For international cities, use abbreviated country
+country_abbrev = {
+    'US': 'USA', 'CA': 'Can', 'GB': 'UK', 'AU': 'Aus',
+    'DE': 'Ger', 'FR': 'Fra', 'IT': 'Ita', 'ES': 'Spa',
+    'AT': 'Aut', 'CH': 'Swi', 'NL': 'Net', 'BE': 'Bel',
+    'JP': 'Jpn', 'CN': 'Chn', 'IN': 'Ind', 'BR': 'Bra',
+    'MX': 'Mex', 'RU': 'Rus', 'SE': 'Swe', 'NO': 'Nor',
+    'DK': 'Den', 'FI': 'Fin', 'PL': 'Pol', 'CZ': 'Cze'
+}
+
+
+async def city_autocomplete(interaction: discord.Interaction, current: str):
+    """Suggest known cities for the city option of weather slash commands"""
+    current = current.lower()
+    return [
+        app_commands.Choice(name=city.title(), value=city)
+        for city in friend_cities if current in city
+    ][:25]
+
+
+async def weather_unavailable(ctx):
+    """Answer straight away while OpenWeatherMap's circuit breaker is open"""
+    if breaker_for(WEATHER_HOST).is_open():
+        await ctx.send("The weather service is unavailable right now, please try again in a few minutes.")
+        return True
+    return False
+
+
+def format_location(geo):
+    """Format location with city and abbreviated state/country"""
+    city_name = geo['name']
+    if geo.get('state'):
+        return f"{city_name}, {state_abbrev.get(geo['state'], geo['state'])}"
+    return f"{city_name}, {country_abbrev.get(geo['country'], geo['country'])}"
+
+
+def local_time(timezone_offset):
+    """Current local time for a UTC offset in seconds"""
+    return datetime.datetime.utcnow() + datetime.timedelta(seconds=timezone_offset)
+
+
+def current_embed(location, document):
+    """Build the !weather embed"""
+    current = document["current"]
+    temp_c = round(current["temp"])
+    temp_f = round(temp_c * 9/5 + 32)
+    feels_like_c = round(current["feels_like"])
+    feels_like_f = round(feels_like_c * 9/5 + 32)
+    humidity = current["humidity"]
+    wind_speed = current["wind_speed"]
+    condition = current["description"]
+    image_url = f"http://openweathermap.org/img/wn/{current['icon']}@2x.png"
+
+    # Get precipitation probability if available
+    precip_percent = 0
+    if current["pop"] is not None:
+        precip_percent = round(current["pop"] * 100)
+    elif current["precipitating"]:
+        precip_percent = 100  # If there's active precipitation, assume 100%
+
+    # Get local time from timezone offset
+    time_str = local_time(document["timezone"]).strftime("%H:%M")
+
+    embed = discord.Embed(colour=discord.Color(int("98FBCA", 16)))
+    embed.add_field(name="", value=f"```ansi\n\u001b[0;36m\u001b[1mCurrently in {location}: {condition}\u001b[0m\n```", inline=False)
+
+    # Use separate fields like the old code for better spacing
+    embed.add_field(name="Temp", value=f"{temp_c}c / {temp_f}f", inline=True)
+    embed.add_field(name="Precip", value=f"{precip_percent}%", inline=True)
+    embed.add_field(name="Humidity", value=f"{humidity}%", inline=True)
+    embed.add_field(name="Feels like", value=f"{feels_like_c}c / {feels_like_f}f", inline=True)
+    embed.add_field(name="Wind", value=f"{wind_speed} m/s", inline=True)
+    embed.add_field(name="Local time", value=f"{time_str}", inline=True)
+    embed.set_thumbnail(url=image_url)
+    return embed
+
+
+def friends_line(document):
+    """One line of the !friends overview"""
+    spaces = "     "  # 5 spaces for formatting
+    temp_c = round(document["current"]["temp"])
+    temp_f = round(temp_c * 9/5 + 32)
+    condition = document["current"]["description"]
+    time_str = local_time(document["timezone"]).strftime("%H:%M")
+    return f"{time_str}{spaces}{temp_c}c / {temp_f}f{spaces}{condition}"
+
+
+def forecast_embed(location, document):
+    """Build the !forecast embed"""
+    embed = discord.Embed(colour=discord.Color(int("98FBCA", 16)))
+    embed.add_field(name="", value=f"```ansi\n\u001b[0;36m\u001b[1mThe 3 day forecast for {location}\u001b[0m\n```", inline=False)
+    for i, day in enumerate(document["daily"][:3]):
+        maxtemp_c = round(day['max'])
+        mintemp_c = round(day['min'])
+        maxtemp_f = round(maxtemp_c * 9/5 + 32)
+        mintemp_f = round(mintemp_c * 9/5 + 32)
+        precip_percent = round(day['pop'] * 100)
+        image_url = f"http://openweathermap.org/img/wn/{day['icon']}@2x.png"
+
+        # Format date nicely
+        date_obj = datetime.datetime.strptime(day['date'], "%Y-%m-%d")
+        formatted_date = date_obj.strftime("%a, %b %d")
+
+        # Use separate fields like the old code for better spacing
+        embed.add_field(name=f"**{formatted_date}**", value="", inline=False)
+        embed.add_field(name="", value="     High:   " + f"{maxtemp_c}c / {maxtemp_f}f", inline=False)
+        embed.add_field(name="", value="     Low:   " + f"{mintemp_c}c / {mintemp_f}f", inline=False)
+        embed.add_field(name="", value="     Cond:   " + f"{day['description']}", inline=False)
+        embed.add_field(name="", value="     Precip:   " + f"{precip_percent}%", inline=False)
+
+        if i == 0:
+            embed.set_thumbnail(url=image_url)
+    return embed
+
+
+async def forecast_chart(document):
+    """Temperature and precipitation chart for the 3 days in the !forecast embed"""
+    horizon = document["hourly"][0]["dt"] + 3 * 86400 if document["hourly"] else 0
+    # Rounded so refetches of an unchanged forecast hash to the same chart
+    hourly = [[entry["dt"], round(entry["temp"], 1), round(entry["pop"], 2)]
+              for entry in document["hourly"] if entry["dt"] < horizon]
+    if not hourly:
+        return None
+    return await charts.render("forecast", {"hourly": hourly, "offset": document["timezone"]})
+
+
+def severe_conditions(document):
+    """Return descriptions of official alerts and severe weather now or in the next 12 hours"""
+    found = list(document["alerts"])
+    horizon = time.time() + 12 * 60 * 60
+    entries = [("Now", document["current"])]
+    for entry in document["hourly"]:
+        if entry["dt"] <= horizon:
+            when = datetime.datetime.utcfromtimestamp(entry["dt"] + document["timezone"]).strftime("%H:%M")
+            entries.append((when, entry))
+
+    for when, entry in entries:
+        # OpenWeatherMap condition codes: 2xx thunderstorms, heavy/freezing rain, heavy snow, squalls and tornadoes
+        if entry['id'] // 100 == 2 or entry['id'] in (502, 503, 504, 511, 602, 622, 771, 781):
+            found.append(f"{when}: {entry['description']}")
+        gust = entry['wind_gust'] or entry['wind_speed']
+        if gust >= 20:
+            found.append(f"{when}: wind gusts of {round(gust)} m/s")
+        if entry['temp'] >= 35 or entry['temp'] <= -15:
+            found.append(f"{when}: extreme temperature of {round(entry['temp'])}c")
+    return found
+
 
 class Weather(commands.Cog):
     def __init__(self, client):
         self.client = client
 
-    @commands.command()
+    async def cog_unload(self):
+        await backend.close()
+
+    @commands.hybrid_command(description="Current weather for a city")
+    @app_commands.describe(city="City to look up, e.g. London or New York")
+    @app_commands.autocomplete(city=city_autocomplete)
+    @governed("weather")
     async def weather(self, ctx: commands.Context, *, city: str):
-        geo_url = "http://api.openweathermap.org/geo/1.0/direct"
-        weather_url = "http://api.openweathermap.org/data/2.5/weather"
-        params_geo = {
-            "q": city,
-            "limit": 1,
-            "appid": WEATHER_KEY2
-        }
+        await ctx.defer()
+        if await weather_unavailable(ctx):
+            return
+
+        geo = await backend.geocode(city)
+        if not geo:
+            await ctx.send(f"Could not find geolocation for city: {city}")
+            return
+
+        document = await backend.conditions(geo['lat'], geo['lon'])
+        if not document:
+            await ctx.send(f"Failed to retrieve weather data for {city}")
+            return
+
+        await ctx.send(embed=current_embed(format_location(geo), document))
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(geo_url, params=params_geo) as res_geo:
-                geo_data = await res_geo.json()
-                if not geo_data:
-                    await ctx.send(f"Could not find geolocation for city: {city}")
-                    return
-                
-                lat = geo_data[0]['lat']
-                lon = geo_data[0]['lon']
-                
-                params_weather = {
-                    "lat": lat,
-                    "lon": lon,
-                    "appid": WEATHER_KEY2,
-                    "units": "metric"  # Change to 'imperial' for Fahrenheit
-                }
-
-                async with session.get(weather_url, params=params_weather) as res_weather:
-                    weather_data = await res_weather.json()
-                    if res_weather.status != 200:
-                        await ctx.send(f"Failed to retrieve weather data for {city}")
-                        return
-
-                    # Format location with city and abbreviated state/country
-                    city_name = geo_data[0]['name']
-                    if 'state' in geo_data[0] and geo_data[0]['state']:
-                        # For US cities, use abbreviated state
-                        state_abbrev = {
-                            'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-                            'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
-                            'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
-                            'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-                            'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
-                            'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
-                            'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
-                            'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-                            'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
-                            'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
-                            'District of Columbia': 'DC'
-                        }.get(geo_data[0]['state'], geo_data[0]['state'])
-                        location = f"{city_name}, {state_abbrev}"
-                    else:
-                        # For international cities, use abbreviated country
-                        country_code = geo_data[0]['country']
-                        country_abbrev = {
-                            'US': 'USA', 'CA': 'Can', 'GB': 'UK', 'AU': 'Aus',
-                            'DE': 'Ger', 'FR': 'Fra', 'IT': 'Ita', 'ES': 'Spa',
-                            'AT': 'Aut', 'CH': 'Swi', 'NL': 'Net', 'BE': 'Bel',
-                            'JP': 'Jpn', 'CN': 'Chn', 'IN': 'Ind', 'BR': 'Bra',
-                            'MX': 'Mex', 'RU': 'Rus', 'SE': 'Swe', 'NO': 'Nor',
-                            'DK': 'Den', 'FI': 'Fin', 'PL': 'Pol', 'CZ': 'Cze'
-                        }.get(country_code, country_code)
-                        location = f"{city_name}, {country_abbrev}"
-
-                    temp_c = round(weather_data["main"]["temp"])
-                    temp_f = round(temp_c * 9/5 + 32)
-                    feels_like_c = round(weather_data["main"]["feels_like"])
-                    feels_like_f = round(feels_like_c * 9/5 + 32)
-                    humidity = weather_data["main"]["humidity"]
-                    wind_speed = weather_data["wind"]["speed"]
-                    condition = weather_data["weather"][0]["description"]
-                    image_url = f"http://openweathermap.org/img/wn/{weather_data['weather'][0]['icon']}@2x.png"
-
-                    # Get precipitation probability if available
-                    precip_percent = 0
-                    if 'pop' in weather_data:
-                        precip_percent = round(weather_data['pop'] * 100)
-                    elif 'rain' in weather_data or 'snow' in weather_data:
-                        precip_percent = 100  # If there's active precipitation, assume 100%
-
-                    # Get local time from timezone offset
-                    import datetime
-                    timezone_offset = weather_data.get('timezone', 0)
-                    local_time = datetime.datetime.utcnow() + datetime.timedelta(seconds=timezone_offset)
-                    time_str = local_time.strftime("%H:%M")
-
-                    embed = discord.Embed(colour=discord.Color(int("98FBCA", 16)))
-                    embed.add_field(name="", value=f"```ansi\n\u001b[0;36m\u001b[1mCurrently in {location}: {condition}\u001b[0m\n```", inline=False)
-
-                    # Use separate fields like the old code for better spacing
-                    embed.add_field(name="Temp", value=f"{temp_c}c / {temp_f}f", inline=True)
-                    embed.add_field(name="Precip", value=f"{precip_percent}%", inline=True)
-                    embed.add_field(name="Humidity", value=f"{humidity}%", inline=True)
-                    embed.add_field(name="Feels like", value=f"{feels_like_c}c / {feels_like_f}f", inline=True)
-                    embed.add_field(name="Wind", value=f"{wind_speed} m/s", inline=True)
-                    embed.add_field(name="Local time", value=f"{time_str}", inline=True)
-                    embed.set_thumbnail(url=image_url)
-
-                    await ctx.send(embed=embed)
-
-    @commands.command()
+    @commands.hybrid_command(description="Weather overview for friend locations")
+    @governed("friends")
     async def friends(self, ctx: commands.Context):
-        cities = [
-            "graz", "stuttgart", "gavle", "london", 
-            "new york", "nashville", "port of spain", 
-            "chicago", "champaign", "st louis", "fargo", "denver", 
-            "tucson", "burbank", "los angeles", "vancouver"
-        ]
-        
-        spaces = "     "  # 5 spaces for formatting
-        geo_url = "http://api.openweathermap.org/geo/1.0/direct"
-        weather_url = "http://api.openweathermap.org/data/2.5/weather"
-        
-        # Step 1: Make API calls and collect all data
-        city_results = {}
-        
-        async with aiohttp.ClientSession() as session:
-            for city in cities:
-                try:
-                    # Get coordinates
-                    params_geo = {"q": city, "limit": 1, "appid": WEATHER_KEY2}
-                    async with session.get(geo_url, params=params_geo) as res_geo:
-                        if res_geo.status != 200:
-                            continue
-                        geo_data = await res_geo.json()
-                        if not geo_data:
-                            continue
-
-                        lat = geo_data[0]['lat']
-                        lon = geo_data[0]['lon']
-
-                        # Get weather data
-                        params_weather = {
-                            "lat": lat, "lon": lon, "appid": WEATHER_KEY2, "units": "metric"
-                        }
-                        async with session.get(weather_url, params=params_weather) as res_weather:
-                            if res_weather.status != 200:
-                                continue
-                            weather_data = await res_weather.json()
-
-                            # Format location
-                            city_name = geo_data[0]['name']
-                            if 'state' in geo_data[0] and geo_data[0]['state']:
-                                state_abbrev = {
-                                    'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-                                    'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
-                                    'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
-                                    'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-                                    'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
-                                    'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
-                                    'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
-                                    'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-                                    'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
-                                    'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
-                                    'District of Columbia': 'DC'
-                                }.get(geo_data[0]['state'], geo_data[0]['state'])
-                                location = f"{city_name}, {state_abbrev}"
-                            else:
-                                country_code = geo_data[0]['country']
-                                country_abbrev = {
-                                    'US': 'USA', 'CA': 'Can', 'GB': 'UK', 'AU': 'Aus',
-                                    'DE': 'Ger', 'FR': 'Fra', 'IT': 'Ita', 'ES': 'Spa',
-                                    'AT': 'Aut', 'CH': 'Swi', 'NL': 'Net', 'BE': 'Bel',
-                                    'JP': 'Jpn', 'CN': 'Chn', 'IN': 'Ind', 'BR': 'Bra',
-                                    'MX': 'Mex', 'RU': 'Rus', 'SE': 'Swe', 'NO': 'Nor',
-                                    'DK': 'Den', 'FI': 'Fin', 'PL': 'Pol', 'CZ': 'Cze'
-                                }.get(country_code, country_code)
-                                location = f"{city_name}, {country_abbrev}"
-
-                            # Get weather info
-                            temp_c = round(weather_data["main"]["temp"])
-                            temp_f = round(temp_c * 9/5 + 32)
-                            condition = weather_data["weather"][0]["description"]
-
-                            # Get local time
-                            import datetime
-                            timezone_offset = weather_data.get('timezone', 0)
-                            local_time = datetime.datetime.utcnow() + datetime.timedelta(seconds=timezone_offset)
-                            time_str = local_time.strftime("%H:%M")
-
-                            # Step 2: Store formatted result for this city
-                            city_results[location] = f"{time_str}{spaces}{temp_c}c / {temp_f}f{spaces}{condition}"
-
-                except Exception:
-                    continue
-        
+        await ctx.defer()
+        if await weather_unavailable(ctx):
+            return
+
+        async def city_line(city):
+            # Geocodes are cached and documents shared with !weather/!forecast, so most of these are cache hits
+            geo = await backend.geocode(city)
+            document = await backend.conditions(geo['lat'], geo['lon']) if geo else None
+            return (format_location(geo), friends_line(document)) if document else None
+
+        # Step 1: Fetch every city concurrently, keeping the list order
+        results = await asyncio.gather(*(city_line(city) for city in friend_cities), return_exceptions=True)
+
+        # Step 2: Keep the formatted result for each city that answered
+        city_results = dict(result for result in results if result and not isinstance(result, Exception))
+
         # Step 3: Build embed with pre-formatted values
         embed = discord.Embed(colour=discord.Color(int("98FBCA", 16)))
         embed.add_field(name="", value=f"```ansi\n\u001b[0;36m\u001b[1mFriends Weather Overview\u001b[0m\n```", inline=False)
-        
+
         # Add each city as separate fields with bold location names
         for location, formatted_result in city_results.items():
             embed.add_field(name=f"**{location}**", value=f"```\n{formatted_result}\n```", inline=False)
-        
+
         await ctx.send(embed=embed)
 
 
@@ -214,117 +264,225 @@ class Forecast(commands.Cog):
     def __init__(self, client):
         self.client = client
 
-    @commands.command()
+    @commands.hybrid_command(description="3 day forecast for a city")
+    @app_commands.describe(city="City to look up, e.g. London or New York")
+    @app_commands.autocomplete(city=city_autocomplete)
+    @governed("forecast")
     async def forecast(self, ctx: commands.Context, *, city: str):
-        geo_url = "http://api.openweathermap.org/geo/1.0/direct"
-        forecast_url = "http://api.openweathermap.org/data/2.5/forecast"
-        params_geo = {
-            "q": city,
-            "limit": 1,
-            "appid": WEATHER_KEY2
-        }
+        await ctx.defer()
+        if await weather_unavailable(ctx):
+            return
+
+        geo = await backend.geocode(city)
+        if not geo:
+            await ctx.send(f"Could not find geolocation for city: {city}")
+            return
 
-        async with aiohttp.ClientSession() as session:
-            async with session.get(geo_url, params=params_geo) as res_geo:
-                geo_data = await res_geo.json()
-                if not geo_data:
-                    await ctx.send(f"Could not find geolocation for city: {city}")
-                    return
-                
-                lat = geo_data[0]['lat']
-                lon = geo_data[0]['lon']
-                
-                params_forecast = {
-                    "lat": lat,
-                    "lon": lon,
-                    "appid": WEATHER_KEY2,
-                    "units": "metric",  # Change to 'imperial' for Fahrenheit
-                    "cnt": 24 * 3  # Get forecast for next 3 days (8 intervals per day)
-                }
-
-                async with session.get(forecast_url, params=params_forecast) as res_forecast:
-                    forecast_data = await res_forecast.json()
-                    if res_forecast.status != 200:
-                        await ctx.send(f"Failed to retrieve forecast data for {city}")
-                        return
-
-                    # Format location with city and abbreviated state/country
-                    city_name = geo_data[0]['name']
-                    if 'state' in geo_data[0] and geo_data[0]['state']:
-                        # For US cities, use abbreviated state
-                        state_abbrev = {
-                            'Alabama': 'AL', 'Alaska': 'AK', 'Arizona': 'AZ', 'Arkansas': 'AR', 'California': 'CA',
-                            'Colorado': 'CO', 'Connecticut': 'CT', 'Delaware': 'DE', 'Florida': 'FL', 'Georgia': 'GA',
-                            'Hawaii': 'HI', 'Idaho': 'ID', 'Illinois': 'IL', 'Indiana': 'IN', 'Iowa': 'IA',
-                            'Kansas': 'KS', 'Kentucky': 'KY', 'Louisiana': 'LA', 'Maine': 'ME', 'Maryland': 'MD',
-                            'Massachusetts': 'MA', 'Michigan': 'MI', 'Minnesota': 'MN', 'Mississippi': 'MS', 'Missouri': 'MO',
-                            'Montana': 'MT', 'Nebraska': 'NE', 'Nevada': 'NV', 'New Hampshire': 'NH', 'New Jersey': 'NJ',
-                            'New Mexico': 'NM', 'New York': 'NY', 'North Carolina': 'NC', 'North Dakota': 'ND', 'Ohio': 'OH',
-                            'Oklahoma': 'OK', 'Oregon': 'OR', 'Pennsylvania': 'PA', 'Rhode Island': 'RI', 'South Carolina': 'SC',
-                            'South Dakota': 'SD', 'Tennessee': 'TN', 'Texas': 'TX', 'Utah': 'UT', 'Vermont': 'VT',
-                            'Virginia': 'VA', 'Washington': 'WA', 'West Virginia': 'WV', 'Wisconsin': 'WI', 'Wyoming': 'WY',
-                            'District of Columbia': 'DC'
-                        }.get(geo_data[0]['state'], geo_data[0]['state'])
-                        location = f"{city_name}, {state_abbrev}"
-                    else:
-                        # For international cities, use abbreviated country
-                        country_code = geo_data[0]['country']
-                        country_abbrev = {
-                            'US': 'USA', 'CA': 'Can', 'GB': 'UK', 'AU': 'Aus',
-                            'DE': 'Ger', 'FR': 'Fra', 'IT': 'Ita', 'ES': 'Spa',
-                            'AT': 'Aut', 'CH': 'Swi', 'NL': 'Net', 'BE': 'Bel',
-                            'JP': 'Jpn', 'CN': 'Chn', 'IN': 'Ind', 'BR': 'Bra',
-                            'MX': 'Mex', 'RU': 'Rus', 'SE': 'Swe', 'NO': 'Nor',
-                            'DK': 'Den', 'FI': 'Fin', 'PL': 'Pol', 'CZ': 'Cze'
-                        }.get(country_code, country_code)
-                        location = f"{city_name}, {country_abbrev}"
-
-                    daily_forecasts = {}
-                    for forecast in forecast_data['list']:
-                        date = forecast['dt_txt'].split(' ')[0]
-                        temp_max = forecast['main']['temp_max']
-                        temp_min = forecast['main']['temp_min']
-                        if date not in daily_forecasts:
-                            daily_forecasts[date] = {'max': temp_max, 'min': temp_min, 'pop': forecast['pop']}
-                        else:
-                            daily_forecasts[date]['max'] = max(daily_forecasts[date]['max'], temp_max)
-                            daily_forecasts[date]['min'] = min(daily_forecasts[date]['min'], temp_min)
-                            daily_forecasts[date]['pop'] = max(daily_forecasts[date]['pop'], forecast['pop'])  # Use max pop for chance of rain
-
-                    embed = discord.Embed(colour=discord.Color(int("98FBCA", 16)))
-                    embed.add_field(name="", value=f"```ansi\n\u001b[0;36m\u001b[1mThe 3 day forecast for {location}\u001b[0m\n```", inline=False)
-                    for i, (date, temps) in enumerate(daily_forecasts.items()):
-                        if i >= 3:
-                            break
-                        maxtemp_c = round(temps['max'])
-                        mintemp_c = round(temps['min'])
-                        maxtemp_f = round(maxtemp_c * 9/5 + 32)
-                        mintemp_f = round(mintemp_c * 9/5 + 32)
-                        precip_percent = round(temps['pop'] * 100)
-
-                        # Retrieve condition and image_url for the first forecast entry of each day
-                        condition = forecast_data['list'][i * 8]['weather'][0]['description']
-                        image_url = f"http://openweathermap.org/img/wn/{forecast_data['list'][i * 8]['weather'][0]['icon']}@2x.png"
-
-                        # Format date nicely
-                        import datetime
-                        date_obj = datetime.datetime.strptime(date, "%Y-%m-%d")
-                        formatted_date = date_obj.strftime("%a, %b %d")
-
-                        # Use separate fields like the old code for better spacing
-                        embed.add_field(name=f"**{formatted_date}**", value="", inline=False)
-                        embed.add_field(name="", value="     High:   " + f"{maxtemp_c}c / {maxtemp_f}f", inline=False)
-                        embed.add_field(name="", value="     Low:   " + f"{mintemp_c}c / {mintemp_f}f", inline=False)
-                        embed.add_field(name="", value="     Cond:   " + f"{condition}", inline=False)
-                        embed.add_field(name="", value="     Precip:   " + f"{precip_percent}%", inline=False)
-
-                        if i == 0:
-                            embed.set_thumbnail(url=image_url)
-
-                    await ctx.send(embed=embed)
+        document = await backend.conditions(geo['lat'], geo['lon'])
+        if not document:
+            await ctx.send(f"Failed to retrieve forecast data for {city}")
+            return
+
+        embed = forecast_embed(format_location(geo), document)
+        chart = await forecast_chart(document)
+        file = chart.attach(embed) if chart else None
+        message = await ctx.send(embed=embed, file=file)
+        if file:
+            chart.sent(message)
+
+
+class WeatherSubscriptions(commands.Cog):
+    def __init__(self, client):
+        self.client = client
+        # Subscription dicts, persisted to SUBSCRIPTIONS_FILE
+        self.subscriptions = []
+        self.next_id = 1
+        # Check alerts on the first cycle
+        self.last_alert_check = time.monotonic() - ALERT_INTERVAL
+
+    async def cog_load(self):
+        self.subscriptions = await asyncio.to_thread(read_json, SUBSCRIPTIONS_FILE, [])
+        self.next_id = max((sub["id"] for sub in self.subscriptions), default=0) + 1
+        self.scheduler.start()
+
+    async def cog_unload(self):
+        self.scheduler.cancel()
+
+    async def save(self):
+        await asyncio.to_thread(write_json_atomic, SUBSCRIPTIONS_FILE, [dict(sub) for sub in self.subscriptions])
+
+    def digest_due(self, sub):
+        """True once the subscriber's local digest time has passed and today's digest hasn't been sent"""
+        now = local_time(sub["timezone"])
+        return now.strftime("%H:%M") >= sub["time"] and sub["last_sent"] != now.strftime("%Y-%m-%d")
+
+    @tasks.loop(minutes=5)
+    async def scheduler(self):
+        """Fetch each subscribed location once per cycle and deliver to all of its subscribers"""
+        check_alerts = time.monotonic() - self.last_alert_check >= ALERT_INTERVAL
+        if check_alerts:
+            self.last_alert_check = time.monotonic()
+
+        # Group due subscriptions by location so N subscribers to one city cost one set of calls
+        due = {}
+        for sub in self.subscriptions:
+            if (sub["kind"] == "digest" and self.digest_due(sub)) or (sub["kind"] == "alerts" and check_alerts):
+                due.setdefault((round(sub["lat"], 2), round(sub["lon"], 2)), []).append(sub)
+        if not due or breaker_for(WEATHER_HOST).is_open():
+            return
+
+        results = await asyncio.gather(*(self.deliver(subs) for subs in due.values()), return_exceptions=True)
+        for result in results:
+            if isinstance(result, Exception):
+                log.error("Weather subscription delivery failed", exc_info=result)
+        await self.save()
+
+    @scheduler.before_loop
+    async def before_scheduler(self):
+        await self.client.wait_until_ready()
+
+    async def deliver(self, subs):
+        """Fetch one location and send digests/alerts to everyone subscribed to it"""
+        document = await backend.conditions(subs[0]["lat"], subs[0]["lon"])
+        if not document:
+            return
+
+        severe = severe_conditions(document)
+        alert_key = "|".join(severe)
+        sends = []
+        for sub in subs:
+            if sub["kind"] == "digest":
+                embeds = [current_embed(sub["location"], document), forecast_embed(sub["location"], document)]
+                sub["last_sent"] = local_time(sub["timezone"]).strftime("%Y-%m-%d")
+                sends.append(self.send_to(sub, content=f"Your daily weather for {sub['location']}", embeds=embeds))
+            elif severe:
+                # Don't repeat the same alert until ALERT_REPEAT has passed
+                if sub.get("last_alert") == alert_key and time.time() - sub.get("last_alert_at", 0) < ALERT_REPEAT:
+                    continue
+                sub["last_alert"] = alert_key
+                sub["last_alert_at"] = time.time()
+                embed = discord.Embed(title=f"⚠️ Severe weather for {sub['location']}",
+                                      description="\n".join(severe), color=discord.Color.red())
+                sends.append(self.send_to(sub, embed=embed))
+        await asyncio.gather(*sends)
+
+    async def send_to(self, sub, **kwargs):
+        """Send to a subscription's channel or user, logging rather than raising on failure"""
+        try:
+            if sub["target"] == "channel":
+                destination = self.client.get_channel(sub["target_id"])
+            else:
+                destination = self.client.get_user(sub["target_id"]) or await self.client.fetch_user(sub["target_id"])
+            if destination is not None:
+                await destination.send(**kwargs)
+                return
+        except discord.HTTPException:
+            pass
+        log.warning("Could not deliver weather subscription %s", sub["id"], extra={"subscription": sub["id"]})
+
+    async def subscribe(self, ctx, kind, city, at="00:00"):
+        """Validate a city and store a digest or alert subscription for the current channel or DM"""
+        await ctx.defer(ephemeral=True)
+
+        # Subscriptions made in a server post to that channel, which needs Manage Channels
+        in_guild = ctx.guild is not None
+        if in_guild and not ctx.channel.permissions_for(ctx.author).manage_channels:
+            await ctx.send("You need Manage Channels to subscribe this channel. DM me to subscribe just yourself.",
+                           ephemeral=True)
+            return
+        if sum(sub["owner_id"] == ctx.author.id for sub in self.subscriptions) >= MAX_SUBSCRIPTIONS_PER_USER:
+            await ctx.send(f"You already have {MAX_SUBSCRIPTIONS_PER_USER} weather subscriptions.", ephemeral=True)
+            return
+        if await weather_unavailable(ctx):
+            return
+
+        geo = await backend.geocode(city)
+        document = await backend.conditions(geo['lat'], geo['lon']) if geo else None
+        if not document:
+            await ctx.send(f"Could not find weather for city: {city}", ephemeral=True)
+            return
+
+        sub = {
+            "id": self.next_id,
+            "kind": kind,
+            "target": "channel" if in_guild else "user",
+            "target_id": ctx.channel.id if in_guild else ctx.author.id,
+            "owner_id": ctx.author.id,
+            "location": format_location(geo),
+            "lat": geo['lat'],
+            "lon": geo['lon'],
+            "timezone": document["timezone"],
+            "time": at,
+            "last_sent": None,
+        }
+        # Don't send today's digest straight away if its time has already passed
+        if kind == "digest" and self.digest_due(sub):
+            sub["last_sent"] = local_time(sub["timezone"]).strftime("%Y-%m-%d")
+        self.next_id += 1
+        self.subscriptions.append(sub)
+        await self.save()
+
+        where = "this channel" if in_guild else "you"
+        if kind == "digest":
+            await ctx.send(f"Subscribed {where} to a daily weather digest for {sub['location']} at {at} local time "
+                           f"(#{sub['id']}).", ephemeral=True)
+        else:
+            await ctx.send(f"Subscribed {where} to severe weather alerts for {sub['location']} (#{sub['id']}).",
+                           ephemeral=True)
+
+    @commands.hybrid_command(description="Daily weather digest for a city at a local time")
+    @app_commands.describe(at="Local time in the city, HH:MM", city="City to look up, e.g. London or New York")
+    @app_commands.autocomplete(city=city_autocomplete)
+    @governed("weather_subscribe")
+    async def weather_digest(self, ctx: commands.Context, at: str, *, city: str):
+        try:
+            at = datetime.datetime.strptime(at, "%H:%M").strftime("%H:%M")
+        except ValueError:
+            await ctx.send("Give the time as HH:MM, e.g. `!weather_digest 07:30 London`", ephemeral=True)
+            return
+        await self.subscribe(ctx, "digest", city, at)
+
+    @commands.hybrid_command(description="Severe weather alerts for a city")
+    @app_commands.describe(city="City to look up, e.g. London or New York")
+    @app_commands.autocomplete(city=city_autocomplete)
+    @governed("weather_subscribe")
+    async def weather_alerts(self, ctx: commands.Context, *, city: str):
+        await self.subscribe(ctx, "alerts", city)
+
+    @commands.hybrid_command(description="List weather subscriptions for you and this channel")
+    async def weather_subs(self, ctx: commands.Context):
+        subs = [sub for sub in self.subscriptions
+                if sub["owner_id"] == ctx.author.id or (sub["target"] == "channel" and sub["target_id"] == ctx.channel.id)]
+        if not subs:
+            await ctx.send("No weather subscriptions. Use `!weather_digest` or `!weather_alerts` to add one.",
+                           ephemeral=True)
+            return
+        lines = []
+        for sub in subs:
+            what = f"daily digest at {sub['time']}" if sub["kind"] == "digest" else "severe weather alerts"
+            where = f"<#{sub['target_id']}>" if sub["target"] == "channel" else "DM"
+            lines.append(f"`#{sub['id']}` {sub['location']} - {what} ({where})")
+        await ctx.send("\n".join(lines), ephemeral=True)
+
+    @commands.hybrid_command(description="Remove a weather subscription")
+    @app_commands.describe(subscription="Subscription number from /weather_subs")
+    async def weather_unsub(self, ctx: commands.Context, subscription: int):
+        for sub in self.subscriptions:
+            if sub["id"] != subscription:
+                continue
+            # Owners can always remove theirs, channel managers can remove the channel's
+            can_manage = (sub["target"] == "channel" and ctx.guild is not None and sub["target_id"] == ctx.channel.id
+                          and ctx.channel.permissions_for(ctx.author).manage_channels)
+            if sub["owner_id"] != ctx.author.id and not can_manage:
+                break
+            self.subscriptions.remove(sub)
+            await self.save()
+            await ctx.send(f"Removed weather subscription #{subscription}.", ephemeral=True)
+            return
+        await ctx.send(f"No weather subscription #{subscription} that you can remove.", ephemeral=True)
 
 
 async def setup(client):
     await client.add_cog(Weather(client))
     await client.add_cog(Forecast(client))
-
+    await client.add_cog(WeatherSubscriptions(client))
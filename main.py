@@ -1,35 +1,201 @@
-# Import required libraries
-import discord
-from discord.ext import commands
-import os
-import asyncio
-from dotenv import load_dotenv
-
-# set common variables
-intents = discord.Intents.all()
-client = commands.Bot(command_prefix="!", intents=intents)
-load_dotenv()
-
-intents.message_content = True
-intents.messages = True
-intents.reactions = True
-token = os.environ["TOKEN"]
-
-# Run bot on discord
-@client.event
-async def on_ready():
-    print("Fuck it, we'll do it live...")
-
-@client.event
-async def load_extensions():
-  for filename in os.listdir('./cogs'):
-    if filename.endswith('.py'):
-        await client.load_extension(f'cogs.{filename[:-3]}')
-        print(f"Loaded Cog: {filename[:-3]}")
-
-async def main():
-    async with client:
-        await load_extensions()
-        await client.start(token)
-
-asyncio.run(main())
\ No newline at end of file
+# Import required libraries
+import discord
+from discord.ext import commands
+import os
+import ast
+import asyncio
+import hashlib
+import importlib
+import json
+import logging
+import time
+from dotenv import load_dotenv
+
+# set common variables
+load_dotenv()
+
+# Imported after load_dotenv so LOG_* settings from .env apply
+from utils.logs import setup_logging
+log = logging.getLogger("bio-bot")
+
+# Gateway intents each cog relies on on top of the base set; only the union for loaded cogs is requested
+cog_intents = {
+    "admin": {"members"},  # join/leave events for the mutual-guild index and per-user member lookups
+    "dnd": set(),
+    "fun": set(),
+    "reload": set(),
+    "servers": set(),
+    "stats": set(),
+    "voice": {"voice_states"},  # temp channel tracking, members in voice are cached
+    "watchdog": set(),
+    "weatherAPI": set(),
+    "workout": set(),
+}
+
+# Needed by every profile: guild/channel/role cache and command messages
+base_intents = {"guilds", "guild_messages", "dm_messages"}
+
+cog_names = sorted(filename[:-3] for filename in os.listdir('./cogs') if filename.endswith('.py'))
+
+def build_intents(profile):
+    """Build the gateway intents and member cache policy for an intents profile
+
+    full  - every intent, every member cached and chunked at startup (legacy behaviour)
+    cogs  - only what the loaded cogs declare, plus message content for prefix commands
+    slash - same as cogs but without message content, for slash-command-only deployments
+    """
+    log.info("Intents profile: %s", profile)
+    if profile == "full":
+        intents = discord.Intents.all()
+        return intents, discord.MemberCacheFlags.from_intents(intents), True
+
+    names = set(base_intents)
+    if profile != "slash":
+        names.add("message_content")
+
+    for cog in cog_names:
+        required = cog_intents.get(cog)
+        if required is None:
+            # Undeclared cogs get the library defaults rather than silently missing events
+            required = {name for name, enabled in discord.Intents.default() if enabled}
+            log.warning("Cog %s has no intent declaration, assuming defaults", cog)
+        else:
+            log.info("Cog %s requires: %s", cog, ', '.join(sorted(required)) or 'base only')
+        names |= required
+
+    intents = discord.Intents(**{name: True for name in names})
+    # Cache members in voice and members seen through join events/on-demand chunks, nothing else
+    member_cache_flags = discord.MemberCacheFlags.from_intents(intents)
+    return intents, member_cache_flags, False
+
+# Set by build_bot()
+client = None
+log_listener = None
+
+# Bump to force a slash command sync even if the command tree hasn't changed
+COMMAND_TREE_VERSION = 1
+COMMAND_TREE_HASH_FILE = ".command_tree_hash"
+
+# Run bot on discord
+async def on_ready():
+    log.info("Fuck it, we'll do it live...")
+
+def import_dependencies(cog):
+    """Import the modules a cog imports at the top level, without running the cog itself"""
+    path = os.path.join('./cogs', f'{cog}.py')
+    with open(path, encoding="utf-8") as f:
+        tree = ast.parse(f.read(), path)
+    for node in tree.body:
+        if isinstance(node, ast.Import):
+            names = [alias.name for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            # `from utils import charts` names a submodule, `from discord import Embed` an attribute; try both
+            names = [node.module] + [f"{node.module}.{alias.name}" for alias in node.names if alias.name != "*"]
+        else:
+            continue
+        for name in names:
+            try:
+                importlib.import_module(name)
+            except ImportError:
+                # Attributes aren't modules; a real failure is reported by load_extension with the cog's traceback
+                pass
+
+async def load_cog(cog):
+    """Load a single cog, timing the import of its dependencies and its setup separately"""
+    start = time.perf_counter()
+    # Import dependencies in a worker thread so heavy ones (psutil, aiohttp) don't block the event loop;
+    # the cog module itself is only executed once, by load_extension
+    await asyncio.to_thread(import_dependencies, cog)
+    imported = time.perf_counter()
+    await client.load_extension(f'cogs.{cog}')
+    loaded = time.perf_counter()
+    log.info("Loaded cog %s (import %.0f ms, setup %.0f ms)", cog, (imported - start) * 1000, (loaded - imported) * 1000)
+
+async def load_extensions():
+    """Load every cog concurrently, then sync slash commands once all are registered"""
+    start = time.perf_counter()
+    results = await asyncio.gather(*(load_cog(cog) for cog in cog_names), return_exceptions=True)
+    for cog, result in zip(cog_names, results):
+        if isinstance(result, Exception):
+            log.error("Failed to load cog %s", cog, exc_info=result)
+    log.info("Loaded %d cog(s) in %.0f ms", len(cog_names), (time.perf_counter() - start) * 1000)
+    await sync_command_tree()
+
+def command_tree_hash():
+    """Hash the app command payloads so unchanged trees can skip syncing"""
+    payload = []
+    for command in client.tree.get_commands():
+        try:
+            payload.append(command.to_dict(client.tree))
+        except TypeError:
+            # discord.py < 2.4 takes no tree argument
+            payload.append(command.to_dict())
+    payload.sort(key=lambda command: command["name"])
+    # Keyed by application so switching to another bot's token always syncs
+    data = json.dumps({"version": COMMAND_TREE_VERSION, "application_id": client.application_id, "commands": payload},
+                      sort_keys=True)
+    return hashlib.sha256(data.encode("utf-8")).hexdigest()
+
+async def sync_command_tree():
+    """Sync slash commands with Discord only when the command tree has changed"""
+    tree_hash = command_tree_hash()
+    try:
+        with open(COMMAND_TREE_HASH_FILE) as f:
+            if f.read().strip() == tree_hash:
+                log.info("Command tree unchanged, skipping sync")
+                return
+    except FileNotFoundError:
+        pass
+
+    synced = await client.tree.sync()
+    with open(COMMAND_TREE_HASH_FILE, "w") as f:
+        f.write(tree_hash)
+    log.info("Synced %d slash command(s)", len(synced))
+
+def cog_loader_done(task):
+    """Log a failed background load, which would otherwise only surface when the task is garbage collected"""
+    if not task.cancelled() and task.exception():
+        log.error("Loading cogs failed", exc_info=task.exception())
+
+async def setup_hook():
+    # Load cogs in the background so the gateway connection isn't held up by imports
+    client.cog_loader = asyncio.create_task(load_extensions())
+    client.cog_loader.add_done_callback(cog_loader_done)
+
+def build_bot():
+    """Start logging and build the client
+
+    Not done at import time: the chart worker processes (see utils/charts.py) are spawned, so each one
+    imports main.py again and would otherwise open a second log writer and build a second bot.
+    """
+    global client, log_listener
+    log_listener = setup_logging()
+    intents, member_cache_flags, chunk_at_startup = build_intents(os.getenv("INTENTS_PROFILE", "cogs"))
+    log.info("Requesting intents: %s", ', '.join(name for name, enabled in intents if enabled))
+
+    client = commands.Bot(
+        command_prefix="!",
+        intents=intents,
+        member_cache_flags=member_cache_flags,
+        # Guilds are chunked on demand by the cogs that need full member lists
+        chunk_guilds_at_startup=chunk_at_startup
+    )
+    client.add_listener(on_ready)
+    client.setup_hook = setup_hook
+    # Exposed so cogs reloaded at runtime can pick up slash command changes
+    client.sync_command_tree = sync_command_tree
+    return client
+
+async def main():
+    token = os.environ["TOKEN"]
+    build_bot()
+    try:
+        async with client:
+            await client.start(token)
+    finally:
+        # Flush queued log records before exiting
+        log_listener.stop()
+
+# Guarded so benchmarks can import main.py and build the client without starting it
+if __name__ == "__main__":
+    asyncio.run(main())
\ No newline at end of file
@@ -0,0 +1,78 @@
+# Lightweight status agent for game server hosts
+# Copy this file to every machine that runs game servers and start it next to them:
+#   SERVER_AGENT_TOKEN=secret python server_agent.py --host 0.0.0.0 --port 8700
+# It listens on loopback by default and refuses any other address without a token.
+# The bot then asks GET /status?process=<name>&process=<name> which of those processes are running.
+# Only needs aiohttp and psutil.
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import os
+import socket
+import time
+import psutil
+from aiohttp import web
+
+
+# Seconds a process listing is reused, so a burst of bot requests costs one scan
+SCAN_TTL = 2.0
+
+
+class Agent:
+    def __init__(self, token=""):
+        self.token = token
+        self.scanned_at = 0.0
+        self.names = set()
+        self.lock = asyncio.Lock()
+        psutil.cpu_percent(None)  # first call only sets the baseline
+
+    async def process_names(self):
+        async with self.lock:
+            if time.monotonic() - self.scanned_at > SCAN_TTL:
+                self.names = await asyncio.to_thread(
+                    lambda: {proc.info["name"] for proc in psutil.process_iter(["name"])})
+                self.scanned_at = time.monotonic()
+            return self.names
+
+    async def status(self, request):
+        # Constant-time comparison so response timing doesn't leak the token; as bytes, since str needs ASCII
+        authorization = request.headers.get("Authorization", "").encode("utf-8", "surrogateescape")
+        if self.token and not hmac.compare_digest(authorization, f"Bearer {self.token}".encode("utf-8")):
+            return web.json_response({"error": "Unauthorized"}, status=401)
+        names = await self.process_names()
+        return web.json_response({
+            "host": socket.gethostname(),
+            "processes": {name: name in names for name in request.query.getall("process", [])},
+            "cpu_percent": psutil.cpu_percent(None),
+            "memory_percent": psutil.virtual_memory().percent,
+            "uptime": int(time.time() - psutil.boot_time()),
+        })
+
+
+def is_loopback(host):
+    if host == "localhost":
+        return True
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return False
+
+
+def make_app(token=""):
+    app = web.Application()
+    app.router.add_get("/status", Agent(token).status)
+    return app
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report which game server processes run on this host")
+    parser.add_argument("--host", default=os.getenv("SERVER_AGENT_HOST", "127.0.0.1"),
+                        help="Address to listen on, SERVER_AGENT_HOST or loopback by default")
+    parser.add_argument("--port", type=int, default=int(os.getenv("SERVER_AGENT_PORT", "8700")))
+    parser.add_argument("--token", default=os.getenv("SERVER_AGENT_TOKEN", ""),
+                        help="Shared secret the bot must send, SERVER_AGENT_TOKEN by default")
+    args = parser.parse_args()
+    if not args.token and not is_loopback(args.host):
+        parser.error(f"refusing to listen on {args.host} without a token, set SERVER_AGENT_TOKEN or --token")
+    web.run_app(make_app(args.token), host=args.host, port=args.port, access_log=None)
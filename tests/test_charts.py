@@ -0,0 +1,23 @@
+from utils import charts
+
+
+def test_nice_ticks_spans_range():
+    assert charts.nice_ticks(0, 17) == [0, 5, 10, 15, 20]
+
+
+def test_nice_ticks_flat_series():
+    for value in (0, 12.5, -3):
+        ticks = charts.nice_ticks(value, value)
+        assert len(set(ticks)) >= 2
+        assert ticks[0] <= value <= ticks[-1]
+
+
+def test_render_forecast_flat_temperature():
+    hourly = [[1700000000 + hour * 3600, 20.0, 0] for hour in range(24)]
+    assert charts.render_forecast({"hourly": hourly, "offset": 0}).startswith(b"\x89PNG")
+
+
+def test_render_players_without_players():
+    points = [[1700000000 + hour * 3600, 0, 0, 0] for hour in range(24)]
+    data = {"points": points, "bucket": 3600, "offset": 0, "max_players": None}
+    assert charts.render_players(data).startswith(b"\x89PNG")
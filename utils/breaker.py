@@ -0,0 +1,157 @@
+# Circuit breakers for upstream dependencies (OpenWeatherMap, dnd5eapi, game server queries)
+# After repeated failures an upstream is skipped instantly instead of waiting out its timeout
+import aiohttp
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+from utils import metrics
+
+
+# Consecutive failures that open a breaker, and seconds to wait before probing again
+FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURES", "3"))
+RESET_TIMEOUT = float(os.getenv("BREAKER_RESET", "30"))
+MAX_RESET_TIMEOUT = 300
+
+log = logging.getLogger(__name__)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling an upstream whose breaker is open"""
+
+
+class CircuitBreaker:
+    """Closed -> open after consecutive failures -> half-open trial -> closed again"""
+
+    def __init__(self, name, probe=None, max_reset_timeout=MAX_RESET_TIMEOUT):
+        self.name = name
+        # Optional coroutine returning True when the upstream is healthy again
+        self.probe = probe
+        # Longest wait between trials as repeated failures back off
+        self.max_reset_timeout = max_reset_timeout
+        self.state = "closed"
+        self.failures = 0
+        self.opened_at = 0.0
+        self.reset_timeout = RESET_TIMEOUT
+        self.probe_task = None
+
+    def is_open(self):
+        """True while calls should fail fast; doesn't consume the half-open trial"""
+        if self.state == "open" and not self.probe:
+            return time.monotonic() - self.opened_at < self.reset_timeout
+        return self.state != "closed"
+
+    def allow(self):
+        """Return True if a call may go through, letting one trial call through once the timeout passes"""
+        if self.state == "closed":
+            return True
+        # Breakers with a background probe stay open until the probe succeeds
+        if self.state == "open" and not self.probe and time.monotonic() - self.opened_at >= self.reset_timeout:
+            self.transition("half_open")
+            return True
+        metrics.increment("biobot_breaker_short_circuits_total", upstream=self.name)
+        return False
+
+    def record_success(self):
+        self.failures = 0
+        if self.state != "closed":
+            self.reset_timeout = RESET_TIMEOUT
+            self.transition("closed")
+
+    def record_failure(self):
+        self.failures += 1
+        if self.state == "half_open":
+            # Trial failed, back off before the next one
+            self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+            self.trip()
+        elif self.state == "closed" and self.failures >= FAILURE_THRESHOLD:
+            self.trip()
+
+    def trip(self):
+        self.opened_at = time.monotonic()
+        self.transition("open")
+        if self.probe and (self.probe_task is None or self.probe_task.done()):
+            self.probe_task = asyncio.get_running_loop().create_task(self.probe_until_healthy())
+
+    def transition(self, state):
+        log.warning("Circuit breaker for %s is now %s", self.name, state, extra={"upstream": self.name})
+        metrics.increment("biobot_breaker_transitions_total", upstream=self.name, state=state)
+        self.state = state
+
+    async def probe_until_healthy(self):
+        """Probe the upstream in the background until it answers, then close the breaker"""
+        while self.state != "closed":
+            await asyncio.sleep(self.reset_timeout)
+            try:
+                healthy = await self.probe()
+            except Exception:
+                healthy = False
+            if healthy:
+                self.record_success()
+            else:
+                self.reset_timeout = min(self.reset_timeout * 2, self.max_reset_timeout)
+
+    @contextmanager
+    def guard(self):
+        """Wrap a non-HTTP upstream call: fail fast while open, record the outcome otherwise"""
+        if not self.allow():
+            raise CircuitOpenError(self.name)
+        try:
+            yield
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+
+
+# Upstream name (host for HTTP) -> CircuitBreaker
+breakers = {}
+
+
+def breaker_for(name, probe=None, max_reset_timeout=MAX_RESET_TIMEOUT):
+    breaker = breakers.get(name)
+    if breaker is None:
+        breaker = breakers[name] = CircuitBreaker(name, probe, max_reset_timeout)
+    elif probe and not breaker.probe:
+        # Looked up by a cog before the first request, adopt the HTTP hook's probe
+        breaker.probe = probe
+    return breaker
+
+
+def http_probe(base_url):
+    """Build a probe that treats any non-5xx answer from the host as healthy"""
+    async def probe():
+        timeout = aiohttp.ClientTimeout(total=5)
+        async with aiohttp.ClientSession(timeout=timeout) as session:
+            async with session.get(base_url) as response:
+                return response.status < 500
+    return probe
+
+
+async def on_request_start(session, context, params):
+    url = urlsplit(str(params.url))
+    breaker = breaker_for(url.netloc, http_probe(f"{url.scheme}://{url.netloc}/"))
+    if not breaker.allow():
+        raise CircuitOpenError(url.netloc)
+
+
+async def on_request_end(session, context, params):
+    breaker = breaker_for(urlsplit(str(params.url)).netloc)
+    if params.response.status >= 500:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+
+
+async def on_request_exception(session, context, params):
+    if not isinstance(params.exception, CircuitOpenError):
+        breaker_for(urlsplit(str(params.url)).netloc).record_failure()
+
+
+# Pass as ClientSession(trace_configs=[..., http_breaker]) to guard every request by host
+http_breaker = aiohttp.TraceConfig()
+http_breaker.on_request_start.append(on_request_start)
+http_breaker.on_request_end.append(on_request_end)
+http_breaker.on_request_exception.append(on_request_exception)
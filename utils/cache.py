@@ -0,0 +1,23 @@
+# Bounded in-memory caches shared by the utils modules (weather documents and geocodes, rendered charts)
+from collections import OrderedDict
+
+
+class LRUCache(OrderedDict):
+    """An OrderedDict of at most maxsize entries; store through remember() so the least recently used one is evicted"""
+
+    def __init__(self, maxsize):
+        super().__init__()
+        self.maxsize = maxsize
+
+    def remember(self, key, value):
+        self[key] = value
+        self.move_to_end(key)
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def recall(self, key, default=None):
+        """Like get(), but a hit counts as a use"""
+        if key not in self:
+            return default
+        self.move_to_end(key)
+        return self[key]
@@ -0,0 +1,279 @@
+# Chart images for embeds (player counts, forecasts), drawn with Pillow
+# Drawing is CPU-bound, so it runs in a process pool; charts are cached by a hash of their data
+# and, once uploaded, the Discord CDN copy is reused for as long as the data doesn't change
+import asyncio
+import concurrent.futures
+import hashlib
+import io
+import json
+import logging
+import multiprocessing
+import os
+import time
+from urllib.parse import parse_qs, urlsplit
+import discord
+from PIL import Image, ImageDraw, ImageFont
+from utils import metrics
+from utils.cache import LRUCache
+
+
+# Worker processes for drawing; 0 draws in a thread instead (slower for the bot, but no extra processes)
+CHART_WORKERS = int(os.getenv("CHART_WORKERS", "2"))
+MAX_CACHED = 64
+# Attachment URLs without an expiry are reused for this long
+UPLOAD_TTL = 6 * 60 * 60
+
+WIDTH, HEIGHT = 720, 260
+LEFT, RIGHT, TOP, BOTTOM = 60, 60, 14, 28
+# Discord's dark theme embed background and muted greys
+BACKGROUND = (47, 49, 54)
+GRID = (70, 74, 82)
+TEXT = (185, 187, 190)
+PLAYERS = (88, 101, 242)
+PLAYERS_RANGE = (60, 66, 110)
+TEMPERATURE = (237, 66, 69)
+PRECIPITATION = (52, 118, 168)
+
+log = logging.getLogger(__name__)
+
+# Pillow's bundled font, scalable since Pillow 10.1
+FONT = ImageFont.load_default(size=13)
+WEEKDAYS = ["Mon", "Tue", "Wed", "Thu", "Fri", "Sat", "Sun"]
+
+
+def nice_ticks(low, high, count=5):
+    """Round tick values spanning low..high, e.g. 0, 5, 10, 15; always at least two distinct values"""
+    if high - low < 1e-9:
+        # A flat series still needs an axis to scale against
+        low, high = low - 1, high + 1
+    span = high - low
+    step = 10 ** int(f"{span / count:e}".split("e")[1])
+    for factor in (1, 2, 5, 10):
+        if span / (step * factor) <= count:
+            step *= factor
+            break
+    start = int(low // step) * step
+    ticks = []
+    value = start
+    while value <= high + step * 0.001:
+        ticks.append(round(value, 6))
+        value += step
+    if ticks[-1] < high:
+        ticks.append(round(value, 6))
+    return ticks
+
+
+def axis_label(value):
+    return str(int(value)) if float(value).is_integer() else f"{value:.1f}"
+
+
+def plot_area():
+    return LEFT, TOP, WIDTH - RIGHT, HEIGHT - BOTTOM
+
+
+def new_chart():
+    image = Image.new("RGB", (WIDTH, HEIGHT), BACKGROUND)
+    return image, ImageDraw.Draw(image)
+
+
+def png(image):
+    buffer = io.BytesIO()
+    image.save(buffer, "PNG")
+    return buffer.getvalue()
+
+
+def draw_time_axis(draw, start, end, offset, every_hours):
+    """Vertical grid lines and labels at local hours divisible by every_hours, weekday names at midnight"""
+    x0, y0, x1, y1 = plot_area()
+    step = every_hours * 3600
+    tick = (int(start + offset) // step + 1) * step - offset
+    while tick < end:
+        x = x0 + (tick - start) / (end - start) * (x1 - x0)
+        local = time.gmtime(tick + offset)
+        label = WEEKDAYS[local.tm_wday] if local.tm_hour == 0 else f"{local.tm_hour:02d}"
+        draw.line([(x, y0), (x, y1)], fill=GRID)
+        draw.text((x, y1 + 6), label, fill=TEXT, font=FONT, anchor="mt")
+        tick += step
+
+
+def draw_value_axis(draw, ticks, suffix="", right=False):
+    """Horizontal grid lines with labels on the left (or right) edge"""
+    x0, y0, x1, y1 = plot_area()
+    low, high = ticks[0], ticks[-1]
+    for value in ticks:
+        y = y1 - (value - low) / (high - low) * (y1 - y0)
+        if not right:
+            draw.line([(x0, y), (x1, y)], fill=GRID)
+        label = axis_label(value) + suffix
+        if right:
+            draw.text((x1 + 6, y), label, fill=TEXT, font=FONT, anchor="lm")
+        else:
+            draw.text((x0 - 6, y), label, fill=TEXT, font=FONT, anchor="rm")
+
+
+def render_players(data):
+    """Player count over time: the min-max range per bucket as a band and the average as a line
+
+    data: {"points": [[timestamp, average, low, high], ...], "bucket": seconds, "offset": utc offset, "max_players": n}
+    """
+    image, draw = new_chart()
+    x0, y0, x1, y1 = plot_area()
+    points = data["points"]
+    start, end = points[0][0], points[-1][0] + data["bucket"]
+    ticks = nice_ticks(0, max(data.get("max_players") or 0, max(point[3] for point in points), 1))
+    draw_value_axis(draw, ticks)
+    draw_time_axis(draw, start, end, data["offset"], 6 if end - start > 12 * 3600 else 1)
+
+    def x_of(timestamp):
+        return x0 + (timestamp - start) / (end - start) * (x1 - x0)
+
+    def y_of(value):
+        return y1 - value / ticks[-1] * (y1 - y0)
+
+    for timestamp, _, low, high in points:
+        draw.rectangle([x_of(timestamp), y_of(high), x_of(timestamp + data["bucket"]), y_of(low)], fill=PLAYERS_RANGE)
+    middles = [(x_of(timestamp + data["bucket"] / 2), y_of(average)) for timestamp, average, _, _ in points]
+    if len(middles) > 1:
+        draw.line(middles, fill=PLAYERS, width=3, joint="curve")
+    else:
+        (x, y), = middles
+        draw.ellipse([x - 3, y - 3, x + 3, y + 3], fill=PLAYERS)
+    return png(image)
+
+
+def render_forecast(data):
+    """Temperature as a line over chance-of-precipitation bars
+
+    data: {"hourly": [[timestamp, temperature, pop], ...], "offset": utc offset}
+    """
+    image, draw = new_chart()
+    x0, y0, x1, y1 = plot_area()
+    hourly = data["hourly"]
+    # Each entry covers the time until the next one (1 hour for One Call, 3 for the 2.5 forecast)
+    spacing = hourly[1][0] - hourly[0][0] if len(hourly) > 1 else 3600
+    start, end = hourly[0][0], hourly[-1][0] + spacing
+    temperatures = [entry[1] for entry in hourly]
+    ticks = nice_ticks(min(temperatures), max(temperatures))
+    draw_value_axis(draw, ticks, "°")
+    draw_value_axis(draw, [0, 25, 50, 75, 100], "%", right=True)
+    draw_time_axis(draw, start, end, data["offset"], 6)
+
+    def x_of(timestamp):
+        return x0 + (timestamp - start) / (end - start) * (x1 - x0)
+
+    for timestamp, _, pop in hourly:
+        if pop:
+            draw.rectangle([x_of(timestamp) + 1, y1 - pop * (y1 - y0), x_of(timestamp + spacing) - 1, y1], fill=PRECIPITATION)
+    low, high = ticks[0], ticks[-1]
+    middles = [(x_of(timestamp + spacing / 2), y1 - (temperature - low) / (high - low) * (y1 - y0))
+               for timestamp, temperature, _ in hourly]
+    draw.line(middles, fill=TEMPERATURE, width=3, joint="curve")
+    return png(image)
+
+
+RENDERERS = {"players": render_players, "forecast": render_forecast}
+
+
+def render_chart(kind, data):
+    """Worker entry point, module level so the process pool can pickle it"""
+    return RENDERERS[kind](data)
+
+
+class Chart:
+    """A rendered chart and where it lives on Discord once it has been uploaded"""
+
+    def __init__(self, key, png, filename):
+        self.key = key
+        self.png = png
+        self.filename = filename
+
+    def attach(self, embed):
+        """Point the embed's image at the chart; returns the file to send along, or None to reuse an earlier upload"""
+        url = uploaded_url(self.key)
+        if url:
+            metrics.increment("biobot_chart_uploads_total", result="reused")
+            embed.set_image(url=url)
+            return None
+        metrics.increment("biobot_chart_uploads_total", result="uploaded")
+        embed.set_image(url=f"attachment://{self.filename}")
+        return discord.File(io.BytesIO(self.png), filename=self.filename)
+
+    def sent(self, message):
+        """Remember the CDN URL a message gave the chart, so the next embed can link it instead of uploading"""
+        for attachment in message.attachments:
+            if attachment.filename == self.filename:
+                uploads.remember(self.key, (attachment.url, url_expiry(attachment.url)))
+                return
+
+
+# Content hash -> PNG bytes, and -> (CDN URL, expiry time)
+rendered = LRUCache(MAX_CACHED)
+uploads = LRUCache(MAX_CACHED)
+# Content hash -> in-flight render, so identical concurrent requests draw once
+pending = {}
+pool = None
+
+
+def url_expiry(url):
+    """Discord attachment URLs carry their expiry as a hex timestamp in ?ex="""
+    expires = parse_qs(urlsplit(url).query).get("ex")
+    try:
+        # Stop reusing the link a little before it actually expires
+        return int(expires[0], 16) - 300
+    except (TypeError, ValueError):
+        return time.time() + UPLOAD_TTL
+
+
+def uploaded_url(key):
+    upload = uploads.get(key)
+    if upload and upload[1] > time.time():
+        return upload[0]
+    return None
+
+
+def get_pool():
+    global pool
+    if pool is None and CHART_WORKERS > 0:
+        # Spawned rather than forked: a fork can copy a lock another of the bot's threads is holding.
+        # Spawned workers import main.py again, which is why it only builds the bot in build_bot()
+        pool = concurrent.futures.ProcessPoolExecutor(max_workers=CHART_WORKERS,
+                                                      mp_context=multiprocessing.get_context("spawn"))
+    return pool
+
+
+async def draw(key, kind, data):
+    global pool
+    started = time.perf_counter()
+    try:
+        image = await asyncio.get_running_loop().run_in_executor(get_pool(), render_chart, kind, data)
+    except concurrent.futures.process.BrokenProcessPool:
+        # A worker died; start a fresh pool for the next chart
+        pool = None
+        raise
+    metrics.observe("biobot_chart_render_seconds", time.perf_counter() - started, kind=kind)
+    rendered.remember(key, image)
+    return image
+
+
+async def render(kind, data, filename=None):
+    """Render a chart from JSON-able data, reusing the cached image for identical data; None if drawing fails"""
+    key = hashlib.sha256(json.dumps([kind, data], sort_keys=True).encode()).hexdigest()
+    filename = filename or f"{kind}.png"
+    cached = rendered.recall(key)
+    if cached is not None:
+        metrics.increment("biobot_chart_cache_total", result="hit")
+        return Chart(key, cached, filename)
+
+    metrics.increment("biobot_chart_cache_total", result="miss")
+    if key not in pending:
+        pending[key] = asyncio.ensure_future(draw(key, kind, data))
+    task = pending[key]
+    try:
+        image = await asyncio.shield(task)
+    except Exception:
+        log.exception("Could not render %s chart", kind)
+        return None
+    finally:
+        if task.done() and pending.get(key) is task:
+            del pending[key]
+    return Chart(key, image, filename)
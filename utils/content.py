@@ -0,0 +1,36 @@
+# Canned responses for the static-response commands (!water, !goat, !goatcam, !ilyft, !coin, !workout)
+# The text lives in CONTENT_FILE so it can be changed without touching code; everything a command can send
+# is built once when the file is loaded, so a command only picks an entry
+import json
+import os
+from itertools import product
+
+
+CONTENT_FILE = os.getenv("CONTENT_FILE", os.path.join(os.path.dirname(os.path.dirname(__file__)), "data", "content.json"))
+
+
+class Content:
+    """Precomputed responses; build with load_content()"""
+
+    def __init__(self, data):
+        # Command -> tuple of complete messages
+        self.responses = {name: tuple(entry["responses"]) for name, entry in data.items() if "responses" in entry}
+
+        # One line per year from its fate's template, in year order
+        goat = data["goat"]
+        self.responses["goat"] = tuple(goat["templates"][fate].format(year=year)
+                                       for year, fate in sorted(goat["years"].items()))
+
+        # Per exercise slot, per kind, every exercise/amount line; picking the kind first keeps reps and holds equally likely
+        workout = data["workout"]
+        self.workout = tuple(
+            tuple(tuple(f"\nExercise {slot}: {exercise}\n{kind['label']}: {amount}\n"
+                        for exercise, amount in product(kind["exercises"], kind["amounts"]))
+                  for kind in workout["kinds"].values())
+            for slot in range(1, workout["exercises"] + 1))
+
+
+def load_content(path=CONTENT_FILE):
+    """Read and precompute the content file; blocks on disk I/O, so call it through asyncio.to_thread"""
+    with open(path, encoding="utf-8") as file:
+        return Content(json.load(file))
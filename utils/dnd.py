@@ -0,0 +1,45 @@
+# D&D 5e SRD data provider used by the dnd cog
+# Point DND_API_BASE at a replay server (bench/replay_server.py) to run without the real API
+import aiohttp
+import os
+from utils import metrics, replay
+from utils.breaker import http_breaker
+
+
+DND_API_BASE = os.getenv("DND_API_BASE", "https://www.dnd5eapi.co/api/2014")
+
+
+class DnDProvider:
+    """Fetches SRD data from dnd5eapi.co or a compatible stand-in, keeping the last good response"""
+
+    def __init__(self, base_url=DND_API_BASE):
+        self.base_url = base_url.rstrip("/")
+        self.session = None
+        # Last good response per endpoint, served while the API is down
+        self.last_good = {}
+
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            # The breaker fails fast while the API is down instead of waiting out the timeout
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10),
+                                                 trace_configs=[metrics.http_trace, http_breaker])
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def get(self, endpoint):
+        """Return the JSON for an endpoint like /races/elf, None if it doesn't exist"""
+        try:
+            async with self.get_session().get(f"{self.base_url}{endpoint}") as response:
+                if response.status == 200:
+                    data = await response.json()
+                    self.last_good[endpoint] = data
+                    replay.record("dnd5eapi", endpoint, {}, data)
+                    return data
+                if response.status == 404:
+                    return None
+        except Exception:
+            pass
+        return self.last_good.get(endpoint)
@@ -0,0 +1,459 @@
+# Game server inventory and query engine shared by the server cogs
+# Servers can live on any host: liveness comes from a local process check, a server_agent.py running
+# on the game host, or the query protocol itself, and a whole inventory is probed concurrently
+import aiohttp
+import asyncio
+import json
+import logging
+import os
+import psutil
+import struct
+import time
+from utils import metrics
+from utils.breaker import breaker_for, http_breaker, http_probe
+
+
+INVENTORY_FILE = os.getenv("SERVER_INVENTORY_FILE", "servers.json")
+# Default port and shared secret for server_agent.py on game hosts
+AGENT_PORT = int(os.getenv("SERVER_AGENT_PORT", "8700"))
+AGENT_TOKEN = os.getenv("SERVER_AGENT_TOKEN", "")
+# Seconds before a query or agent request counts as failed
+QUERY_TIMEOUT = float(os.getenv("SERVER_QUERY_TIMEOUT", "5"))
+# Seconds between background probes of the whole inventory
+POLL_INTERVAL = float(os.getenv("SERVER_POLL_INTERVAL", "60"))
+# A stopped server trips its breaker like any failure; backing off no longer than a poll
+# means the poller sees it again on the first poll after it comes back
+BREAKER_MAX_RESET = POLL_INTERVAL
+# Servers queried at once during a probe round
+PROBE_CONCURRENCY = int(os.getenv("SERVER_PROBE_CONCURRENCY", "16"))
+
+LOCAL_HOSTS = {"127.0.0.1", "localhost", "::1"}
+# Palworld's default player limit, for query paths that don't report one
+PALWORLD_MAX_PLAYERS = 32
+
+# Game -> defaults for inventory entries of that game
+games = {
+    "ark": {
+        "process": "ArkAscendedServer.exe",
+        "port": 7777,  # Default ARK game port, queried on port + 1
+        "query_type": "ark"
+    },
+    "palworld": {
+        "process": "PalServer-Win64-Shipping-Cmd.exe",
+        "port": 8211,  # Default Palworld game port (UDP)
+        "query_port": 25575,  # RCON port for queries (TCP)
+        "rest_api_port": 8212,  # REST API port (HTTP)
+        "query_type": "palworld_rest",  # Use REST API as primary method
+        "fallback_query": "palworld_rcon"  # Fallback to RCON if REST API fails
+    },
+    "enshrouded": {
+        "process": "enshrouded.exe",
+        "port": 15636,  # Default Enshrouded port
+        "query_type": "steam"
+    }
+}
+
+log = logging.getLogger(__name__)
+
+
+# A2S (Steam server query) over UDP
+
+A2S_HEADER = b"\xFF\xFF\xFF\xFF"
+A2S_SPLIT_HEADER = b"\xFE\xFF\xFF\xFF"
+A2S_INFO_REQUEST = A2S_HEADER + b"\x54Source Engine Query\x00"
+S2A_CHALLENGE = 0x41
+S2A_INFO = 0x49
+
+
+class A2SProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.packets = asyncio.Queue()
+
+    def datagram_received(self, data, addr):
+        self.packets.put_nowait(data)
+
+    def error_received(self, exc):
+        self.packets.put_nowait(exc)
+
+
+async def receive_a2s(packets):
+    """Next complete response, reassembling split packets"""
+    parts = {}
+    while True:
+        packet = await packets.get()
+        if isinstance(packet, Exception):
+            raise packet
+        if packet.startswith(A2S_HEADER):
+            return packet
+        if packet.startswith(A2S_SPLIT_HEADER) and len(packet) >= 16:
+            # id, total, number and max packet size precede each slice of the response
+            split_id, total, number, _ = struct.unpack("<lBBh", packet[4:12])
+            if split_id & 0x80000000:
+                raise ValueError("Compressed A2S responses are not supported")
+            parts[number] = packet[12:]
+            if len(parts) == total:
+                return b"".join(parts[i] for i in range(total))
+
+
+def parse_a2s_info(data):
+    """Players and max players from an S2A_INFO response"""
+    if len(data) < 6 or data[4] != S2A_INFO:
+        raise ValueError("Not an A2S_INFO response")
+    # Skip the header and protocol version, then server name, map, folder and game
+    offset = 6
+    for _ in range(4):
+        offset = data.index(b"\x00", offset) + 1
+    # Skip the app ID (2 bytes)
+    return data[offset + 2], data[offset + 3]
+
+
+async def a2s_info(host, port, timeout=QUERY_TIMEOUT):
+    """Send A2S_INFO, answering a challenge if the server asks for one, and return (players, max players)"""
+    loop = asyncio.get_running_loop()
+    transport, protocol = await loop.create_datagram_endpoint(A2SProtocol, remote_addr=(host, port))
+    try:
+        async with asyncio.timeout(timeout):
+            request = A2S_INFO_REQUEST
+            while True:
+                transport.sendto(request)
+                try:
+                    # Resend if nothing comes back in a third of the timeout, UDP packets get lost
+                    response = await asyncio.wait_for(receive_a2s(protocol.packets), timeout / 3)
+                except asyncio.TimeoutError:
+                    continue
+                if response[4] == S2A_CHALLENGE:
+                    request = A2S_INFO_REQUEST + response[5:9]
+                    continue
+                return parse_a2s_info(response)
+    finally:
+        transport.close()
+
+
+async def query_a2s(host, port, timeout=QUERY_TIMEOUT):
+    """Player count of a Steam-based game server, or (None, None)"""
+    upstream = f"a2s {host}:{port}"
+    try:
+        # A tripped breaker raises straight away and lands in the except below
+        with breaker_for(upstream, max_reset_timeout=BREAKER_MAX_RESET).guard(), metrics.track_upstream(upstream):
+            return await a2s_info(host, port, timeout)
+    except Exception:
+        return None, None
+
+
+# Source RCON over TCP, as Palworld speaks it
+
+RCON_RESPONSE_VALUE = 0
+RCON_EXECCOMMAND = 2
+RCON_AUTH = 3
+
+
+def rcon_packet(request_id, kind, body):
+    # id, type, null-terminated body and an empty string, prefixed with the length
+    payload = struct.pack("<ii", request_id, kind) + body.encode("utf-8") + b"\x00\x00"
+    return struct.pack("<i", len(payload)) + payload
+
+
+async def read_rcon_packet(reader):
+    size, = struct.unpack("<i", await reader.readexactly(4))
+    payload = await reader.readexactly(size)
+    request_id, kind = struct.unpack("<ii", payload[:8])
+    return request_id, kind, payload[8:].split(b"\x00")[0].decode("utf-8", errors="ignore")
+
+
+async def rcon_command(host, port, password, command, timeout=QUERY_TIMEOUT):
+    """Authenticate and run one RCON command, returning its output"""
+    async with asyncio.timeout(timeout):
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            writer.write(rcon_packet(1, RCON_AUTH, password))
+            request_id, kind, _ = await read_rcon_packet(reader)
+            # Source servers send an empty response value ahead of the auth response
+            if kind == RCON_RESPONSE_VALUE:
+                request_id, kind, _ = await read_rcon_packet(reader)
+            if request_id == -1:
+                raise PermissionError(f"RCON authentication to {host}:{port} failed")
+
+            writer.write(rcon_packet(2, RCON_EXECCOMMAND, command))
+            _, _, output = await read_rcon_packet(reader)
+            return output
+        finally:
+            writer.close()
+
+
+def count_palworld_players(output):
+    """Count players in ShowPlayers output: a name,playeruid,steamid header and one line per player"""
+    lines = [line for line in output.strip().splitlines() if line.strip()]
+    if lines and lines[0].lower().startswith("name,"):
+        lines = lines[1:]
+    return len(lines)
+
+
+async def query_palworld_rcon(host, port, password, timeout=QUERY_TIMEOUT):
+    """Player count of a Palworld server over RCON, or (None, None)"""
+    if not password:
+        return None, None
+    upstream = f"rcon {host}:{port}"
+    try:
+        with breaker_for(upstream, max_reset_timeout=BREAKER_MAX_RESET).guard(), metrics.track_upstream(upstream):
+            output = await rcon_command(host, port, password, "ShowPlayers", timeout)
+    except Exception:
+        return None, None
+    return count_palworld_players(output), PALWORLD_MAX_PLAYERS
+
+
+# Palworld REST API
+
+# Endpoint -> seconds its answer is reused; the live numbers go stale fast, the server's setup rarely changes
+REST_CACHE_SECONDS = {"info": 600, "players": 10, "metrics": 10, "settings": 600}
+
+
+class PalworldRestClient:
+    """Palworld REST API (/v1/api) client for one server
+
+    Holds one authenticated, pooled session and fetches /info, /players, /metrics and /settings concurrently.
+    Each answer is cached for REST_CACHE_SECONDS and revalidated with If-None-Match when the server sent an ETag.
+    Methods must be called on the bot's event loop; close() the client when done.
+    """
+
+    def __init__(self, host, port, username, password, timeout=QUERY_TIMEOUT, cache=True):
+        self.base_url = f"http://{host}:{port}/v1/api"
+        self.netloc = f"{host}:{port}"
+        self.auth = aiohttp.BasicAuth(username, password) if password else None
+        self.timeout = timeout
+        self.cache = cache
+        self.session = None
+        # Endpoint -> (monotonic time fetched, ETag, JSON body)
+        self.cached = {}
+        # Everything the last successful status() learned, for !players
+        self.details = None
+
+    def get_session(self):
+        # Created on first use so it belongs to the running event loop
+        if self.session is None or self.session.closed:
+            # Registered ahead of http_breaker's own lookup so the host gets the game server backoff cap
+            breaker_for(self.netloc, http_probe(f"http://{self.netloc}/"), max_reset_timeout=BREAKER_MAX_RESET)
+            self.session = aiohttp.ClientSession(
+                auth=self.auth, timeout=aiohttp.ClientTimeout(total=self.timeout),
+                trace_configs=[metrics.http_trace, http_breaker])
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch(self, endpoint):
+        """JSON body of one endpoint, from the cache while it is fresh; raises on errors"""
+        cached = self.cached.get(endpoint) if self.cache else None
+        if cached and time.monotonic() - cached[0] < REST_CACHE_SECONDS[endpoint]:
+            return cached[2]
+        headers = {"If-None-Match": cached[1]} if cached and cached[1] else {}
+        async with self.get_session().get(f"{self.base_url}/{endpoint}", headers=headers) as response:
+            if response.status == 304 and cached:
+                body = cached[2]
+            else:
+                response.raise_for_status()
+                body = await response.json(content_type=None)
+        self.cached[endpoint] = (time.monotonic(), response.headers.get("ETag"), body)
+        return body
+
+    async def status(self):
+        """Players, limits and performance of the server, or None if /players or /metrics can't be read"""
+        if self.auth is None:
+            return None
+        info, players, server_metrics, settings = await asyncio.gather(
+            *(self.fetch(endpoint) for endpoint in REST_CACHE_SECONDS), return_exceptions=True)
+        for endpoint, answer in zip(REST_CACHE_SECONDS, (info, players, server_metrics, settings)):
+            if isinstance(answer, Exception):
+                log.debug("Palworld REST %s/%s failed: %r", self.base_url, endpoint, answer)
+        if isinstance(players, Exception) or isinstance(server_metrics, Exception):
+            self.details = None
+            return None
+        # /info and /settings only add detail, so an old copy or none at all is fine
+        info = info if isinstance(info, dict) else {}
+        settings = settings if isinstance(settings, dict) else {}
+        if isinstance(players, dict):
+            players = players.get("players", [])
+        self.details = {
+            "players": [{"name": player.get("name", "?"), "level": player.get("level"), "ping": player.get("ping")}
+                        for player in players],
+            "max_players": server_metrics.get("maxplayernum") or settings.get("ServerPlayerMaxNum") or PALWORLD_MAX_PLAYERS,
+            "fps": server_metrics.get("serverfps"),
+            "frame_time": server_metrics.get("serverframetime"),
+            "uptime": server_metrics.get("uptime"),
+            "days": server_metrics.get("days"),
+            "version": info.get("version"),
+            "server_name": info.get("servername") or settings.get("ServerName"),
+        }
+        return self.details
+
+    async def player_count(self):
+        """(players, max players), or (None, None)"""
+        status = await self.status()
+        if status is None:
+            return None, None
+        return len(status["players"]), status["max_players"]
+
+
+# Inventory
+
+class GameServer:
+    """One game server instance from the inventory"""
+
+    def __init__(self, name, game, host="127.0.0.1", port=None, process=None, query_type="steam",
+                 fallback_query=None, query_port=None, rest_api_port=None, check=None, agent_port=AGENT_PORT,
+                 rcon_password=None, rest_username=None, rest_password=None):
+        self.name = name
+        self.game = game
+        self.host = host
+        self.port = port
+        self.process = process
+        self.query_type = query_type
+        self.fallback_query = fallback_query
+        self.query_port = query_port
+        self.rest_api_port = rest_api_port
+        # process: psutil on this machine, agent: server_agent.py on the host, query: the server answering
+        self.check = check or ("process" if host in LOCAL_HOSTS else "query")
+        self.agent_port = agent_port
+        # Credentials default to the shared environment variables
+        self.rcon_password = rcon_password if rcon_password is not None else os.environ.get("PALWORLD_RCON_PASSWORD", "")
+        self.rest_username = rest_username or os.environ.get("PALWORLD_REST_USERNAME", "admin")
+        self.rest_password = rest_password if rest_password is not None else os.environ.get("PALWORLD_REST_PASSWORD", "")
+        self.rest = None
+        if "palworld_rest" in (query_type, fallback_query):
+            self.rest = PalworldRestClient(host, rest_api_port or 8212, self.rest_username, self.rest_password)
+
+    @classmethod
+    def from_config(cls, entry, agent_port=AGENT_PORT):
+        """Build a server from an inventory entry, filling in its game's defaults"""
+        game = entry.get("game", entry["name"])
+        config = {"agent_port": agent_port, **games.get(game, {}), **entry, "game": game}
+        return cls(**config)
+
+    @property
+    def address(self):
+        return f"{self.host}:{self.port}"
+
+    async def query(self, query_type):
+        if query_type == "steam":
+            return await query_a2s(self.host, self.query_port or self.port)
+        if query_type == "ark":
+            # ARK answers Steam queries on its query port, usually the game port + 1
+            return await query_a2s(self.host, self.query_port or self.port + 1)
+        if query_type == "palworld_rcon":
+            return await query_palworld_rcon(self.host, self.query_port or 25575, self.rcon_password)
+        if query_type == "palworld_rest":
+            return await self.rest.player_count()
+        return None, None
+
+    @property
+    def details(self):
+        """Extra detail from the last query (Palworld REST: player list, FPS, uptime), or None"""
+        return self.rest.details if self.rest else None
+
+    async def close(self):
+        if self.rest:
+            await self.rest.close()
+
+    async def player_count(self):
+        """Query the player count, trying the fallback query if the primary one fails"""
+        players, max_players = await self.query(self.query_type)
+        if (players is None or max_players is None) and self.fallback_query:
+            players, max_players = await self.query(self.fallback_query)
+        return players, max_players
+
+
+def load_inventory(path=INVENTORY_FILE):
+    """Server name -> GameServer from the inventory file, or one local server per known game without one
+
+    The file holds {"agent_port": 8700, "servers": [{"name": "palworld-eu", "game": "palworld", "host": "10.0.0.5"}, ...]};
+    every entry takes its game's defaults from `games` unless it overrides them.
+    """
+    if not os.path.exists(path):
+        return {name: GameServer.from_config({"name": name}) for name in games}
+    with open(path, encoding="utf-8") as file:
+        config = json.load(file)
+    agent_port = config.get("agent_port", AGENT_PORT)
+    servers = {}
+    for entry in config.get("servers", []):
+        server = GameServer.from_config(entry, agent_port)
+        servers[server.name.lower()] = server
+    log.info("Loaded %d game servers on %d hosts from %s", len(servers),
+             len({server.host for server in servers.values()}), path)
+    return servers
+
+
+# Probing
+
+def local_process_names():
+    return {proc.info["name"] for proc in psutil.process_iter(["name"])}
+
+
+async def agent_processes(host, port, names, session):
+    """Ask server_agent.py on a host which of the given processes run there, or None if it can't be reached"""
+    upstream = f"agent {host}:{port}"
+    headers = {"Authorization": f"Bearer {AGENT_TOKEN}"} if AGENT_TOKEN else {}
+    try:
+        with metrics.track_upstream(upstream):
+            async with session.get(f"http://{host}:{port}/status", params=[("process", name) for name in names],
+                                   headers=headers) as response:
+                if response.status != 200:
+                    log.warning("Server agent %s answered %d", upstream, response.status)
+                    return None
+                return (await response.json())["processes"]
+    except Exception as e:
+        log.warning("Server agent %s unreachable: %s", upstream, e)
+        return None
+
+
+async def probe(server, running=None):
+    """Status of one server; running is the process check result when one was made, None otherwise"""
+    started = time.monotonic()
+    details = None
+    if running is False:
+        players, max_players = None, None
+    else:
+        players, max_players = await server.player_count()
+        if players is not None:
+            details = server.details
+    if running is None:
+        # Without a process check the server is up if it answers its query
+        running = players is not None
+    return {
+        "name": server.name, "game": server.game, "host": server.host, "address": server.address,
+        "online": running, "players": players, "max_players": max_players, "details": details,
+        "checked_at": time.time(), "seconds": time.monotonic() - started,
+    }
+
+
+async def probe_all(servers):
+    """Probe servers concurrently: one process listing per host, then the queries, PROBE_CONCURRENCY at a time"""
+    servers = list(servers)
+    # Process checks first, batched so each host is asked once however many servers it runs
+    running = {}
+    local = [server for server in servers if server.check == "process"]
+    if local:
+        names = await asyncio.to_thread(local_process_names)
+        running.update({server.name: server.process in names for server in local})
+
+    by_agent = {}
+    for server in servers:
+        if server.check == "agent":
+            by_agent.setdefault((server.host, server.agent_port), []).append(server)
+    if by_agent:
+        async with aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=QUERY_TIMEOUT)) as session:
+            answers = await asyncio.gather(*(
+                agent_processes(host, port, sorted({server.process for server in hosted}), session)
+                for (host, port), hosted in by_agent.items()))
+        for hosted, processes in zip(by_agent.values(), answers):
+            # An unreachable agent leaves these servers to the query check
+            if processes is not None:
+                running.update({server.name: processes.get(server.process, False) for server in hosted})
+
+    semaphore = asyncio.Semaphore(PROBE_CONCURRENCY)
+
+    async def limited(server):
+        async with semaphore:
+            return await probe(server, running.get(server.name))
+
+    return await asyncio.gather(*(limited(server) for server in servers))
@@ -0,0 +1,137 @@
+# Central cooldown and concurrency limits for commands that fan out to external services
+# Applied declaratively with @governed("<command>") under the command decorator
+import json
+import os
+import time
+from discord.ext import commands
+
+
+# Command -> limits. Cooldowns are token buckets of `rate` uses refilled over `per` seconds,
+# checked for every listed scope. Concurrency caps simultaneous runs per scope; wait=True queues
+# extra invocations behind the running one, wait=False rejects them. Hybrid commands must not wait:
+# the queue is ahead of ctx.defer(), and a slash interaction left unanswered for 3s fails.
+limits = {
+    "friends": {
+        "cooldowns": [(1, 60, "user"), (2, 60, "guild")],
+        "concurrency": (1, "guild", False),
+    },
+    "weather": {
+        "cooldowns": [(3, 30, "user"), (10, 60, "guild")],
+        "concurrency": (2, "channel", False),
+    },
+    "forecast": {
+        "cooldowns": [(3, 30, "user"), (10, 60, "guild")],
+        "concurrency": (2, "channel", False),
+    },
+    "weather_subscribe": {
+        "cooldowns": [(3, 60, "user")],
+    },
+    "dnd_create": {
+        "cooldowns": [(2, 10, "user"), (10, 60, "guild")],
+        "concurrency": (1, "user", False),
+    },
+    "server": {
+        "cooldowns": [(2, 15, "channel"), (5, 30, "guild")],
+        "concurrency": (1, "guild", False),
+    },
+    "players": {
+        "cooldowns": [(3, 15, "user"), (5, 15, "channel")],
+        "concurrency": (1, "guild", False),
+    },
+}
+
+# COMMAND_LIMITS may override entries as JSON, e.g. {"friends": {"cooldowns": [[1, 120, "guild"]]}}
+for command, override in json.loads(os.getenv("COMMAND_LIMITS", "{}")).items():
+    limits[command] = {**limits.get(command, {}), **override}
+
+# Caps how many idle buckets are kept before full ones are pruned
+MAX_BUCKETS = 10000
+
+
+class TokenBucket:
+    """Refills `rate` tokens evenly over `per` seconds, up to a burst of `rate`"""
+
+    __slots__ = ("rate", "per", "tokens", "updated")
+
+    def __init__(self, rate, per, now):
+        self.rate = rate
+        self.per = per
+        self.tokens = float(rate)
+        self.updated = now
+
+    def refill(self, now):
+        self.tokens = min(self.rate, self.tokens + (now - self.updated) * self.rate / self.per)
+        self.updated = now
+
+    def consume(self, now):
+        """Take a token, returning 0 on success or the seconds until one is available"""
+        self.refill(now)
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) * self.per / self.rate
+
+
+# (command, scope, key) -> TokenBucket
+buckets = {}
+
+
+def scope_key(ctx, scope):
+    if scope == "user":
+        return ctx.author.id
+    if scope == "channel":
+        return ctx.channel.id
+    # Guild limits fall back to the user in DMs
+    return ctx.guild.id if ctx.guild else ctx.author.id
+
+
+def prune_buckets(now):
+    """Drop buckets that have refilled completely; they behave the same as new ones"""
+    for key, bucket in list(buckets.items()):
+        bucket.refill(now)
+        if bucket.tokens >= bucket.rate:
+            del buckets[key]
+
+
+def governed(command):
+    """Apply the configured cooldowns and concurrency limit for a command"""
+    config = limits.get(command, {})
+
+    def decorator(func):
+        cooldowns = config.get("cooldowns", [])
+
+        def scoped_buckets(ctx, now):
+            """The command's bucket for every scope, raising CommandOnCooldown if any of them is empty"""
+            if len(buckets) > MAX_BUCKETS:
+                prune_buckets(now)
+            scoped = []
+            for rate, per, scope in cooldowns:
+                key = (command, scope, scope_key(ctx, scope))
+                bucket = buckets.get(key)
+                if bucket is None:
+                    bucket = buckets[key] = TokenBucket(rate, per, now)
+                bucket.refill(now)
+                if bucket.tokens < 1:
+                    # Counted in biobot_governor_rejections_total by cogs/stats.py, with concurrency rejections
+                    retry_after = (1 - bucket.tokens) * per / rate
+                    raise commands.CommandOnCooldown(commands.Cooldown(rate, per), retry_after, commands.BucketType[scope])
+                scoped.append(bucket)
+            return scoped
+
+        async def spend(*args):
+            # A before-invoke hook rather than a check: checks also run for !help and slash command
+            # visibility, which must not use up tokens. Inside a cog the hook gets (cog, ctx).
+            ctx = args[-1]
+            now = time.monotonic()
+            # Check every scope before consuming so a rejection doesn't burn tokens elsewhere
+            for bucket in scoped_buckets(ctx, now):
+                bucket.consume(now)
+
+        if cooldowns:
+            func = commands.before_invoke(spend)(func)
+        if "concurrency" in config:
+            number, scope, wait = config["concurrency"]
+            func = commands.max_concurrency(number, commands.BucketType[scope], wait=wait)(func)
+        return func
+
+    return decorator
@@ -0,0 +1,112 @@
+# Queue-backed structured logging shared by main.py and every cog
+# Handlers run on a background thread so log I/O never blocks the event loop
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import random
+import sys
+import time
+
+
+LOG_DIR = os.getenv("LOG_DIR", "logs")
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
+# Per-logger overrides, e.g. "cogs.voice=WARNING,discord=INFO"
+LOG_LEVELS = os.getenv("LOG_LEVELS", "")
+# Per-logger sampling of INFO and below, e.g. "cogs.voice=0.1" keeps 10% of voice join/leave lines
+LOG_SAMPLING = os.getenv("LOG_SAMPLING", "")
+
+# Attributes every LogRecord has; anything else was passed through extra= and is logged as a field
+RESERVED = set(vars(logging.makeLogRecord({}))) | {"message", "asctime"}
+
+
+def parse_pairs(value):
+    """Parse "name=value,name=value" settings into a dict"""
+    pairs = {}
+    for item in value.split(","):
+        if "=" in item:
+            name, setting = item.split("=", 1)
+            pairs[name.strip()] = setting.strip()
+    return pairs
+
+
+class JSONFormatter(logging.Formatter):
+    """Format records as one JSON object per line, including extra= fields"""
+
+    def format(self, record):
+        entry = {
+            "ts": time.strftime("%Y-%m-%dT%H:%M:%S", time.gmtime(record.created)) + f".{int(record.msecs):03d}Z",
+            "level": record.levelname,
+            "logger": record.name,
+            "msg": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in RESERVED:
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class LogQueueHandler(logging.handlers.QueueHandler):
+    """Queue records with their traceback in exc_text instead of folded into msg
+
+    The stock prepare() formats the traceback into the message, so the JSON log would have no "exc" field.
+    """
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        # Args and traceback objects may not survive the trip to the listener thread, the rendered text does
+        record.msg = record.getMessage()
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+class SamplingFilter(logging.Filter):
+    """Keep only a fraction of low-severity records from a chatty logger"""
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        return record.levelno > logging.INFO or random.random() < self.rate
+
+
+def setup_logging():
+    """Route all logging through a queue to rotating JSON files and stderr
+
+    Returns the QueueListener, which must be stopped on shutdown to flush pending records.
+    """
+    os.makedirs(LOG_DIR, exist_ok=True)
+
+    file_handler = logging.handlers.RotatingFileHandler(
+        os.path.join(LOG_DIR, "bio-bot.jsonl"), maxBytes=10 * 1024 * 1024, backupCount=5, encoding="utf-8"
+    )
+    file_handler.setFormatter(JSONFormatter())
+
+    console_handler = logging.StreamHandler(sys.stderr)
+    console_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)-8s %(name)s: %(message)s"))
+
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, file_handler, console_handler, respect_handler_level=True)
+
+    root = logging.getLogger()
+    root.handlers.clear()
+    root.addHandler(LogQueueHandler(log_queue))
+    root.setLevel(LOG_LEVEL)
+
+    for name, level in parse_pairs(LOG_LEVELS).items():
+        logging.getLogger(name).setLevel(level.upper())
+    for name, rate in parse_pairs(LOG_SAMPLING).items():
+        logging.getLogger(name).addFilter(SamplingFilter(float(rate)))
+
+    listener.start()
+    return listener
@@ -0,0 +1,143 @@
+# Shared metrics registry for command and upstream instrumentation
+# Lives outside ./cogs so every cog (and every reload of a cog) records into the same registry
+import aiohttp
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+
+# Latency buckets in seconds, from fast cache hits to slow upstream timeouts
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram in the Prometheus style"""
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKETS) + 1)  # last slot is +Inf
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        for i, bound in enumerate(BUCKETS):
+            if seconds <= bound:
+                self.counts[i] += 1
+                break
+        else:
+            self.counts[-1] += 1
+        self.total += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in"""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for i, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= target:
+                return BUCKETS[i] if i < len(BUCKETS) else float("inf")
+        return float("inf")
+
+
+# (metric name, sorted label tuple) -> Histogram / int
+histograms = {}
+counters = {}
+
+
+def labels_key(labels):
+    return tuple(sorted(labels.items()))
+
+
+def observe(metric, seconds, **labels):
+    key = (metric, labels_key(labels))
+    histogram = histograms.get(key)
+    if histogram is None:
+        histogram = histograms[key] = Histogram()
+    histogram.observe(seconds)
+
+
+def increment(metric, **labels):
+    key = (metric, labels_key(labels))
+    counters[key] = counters.get(key, 0) + 1
+
+
+def observe_command(command, seconds, status):
+    observe("biobot_command_duration_seconds", seconds, command=command, status=status)
+
+
+def command_error(command, error):
+    increment("biobot_command_errors_total", command=command, error=type(error).__name__)
+
+
+def observe_upstream(upstream, seconds, status):
+    observe("biobot_upstream_duration_seconds", seconds, upstream=upstream, status=status)
+
+
+def upstream_error(upstream, error):
+    increment("biobot_upstream_errors_total", upstream=upstream, error=type(error).__name__)
+
+
+@contextmanager
+def track_upstream(upstream):
+    """Time a block that talks to an upstream service, recording any exception it raises"""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception as e:
+        observe_upstream(upstream, time.perf_counter() - start, "error")
+        upstream_error(upstream, e)
+        raise
+    observe_upstream(upstream, time.perf_counter() - start, "ok")
+
+
+async def on_request_start(session, context, params):
+    context.start = time.perf_counter()
+
+
+async def on_request_end(session, context, params):
+    status = "ok" if params.response.status < 400 else "error"
+    observe_upstream(urlsplit(str(params.url)).netloc, time.perf_counter() - context.start, status)
+
+
+async def on_request_exception(session, context, params):
+    upstream = urlsplit(str(params.url)).netloc
+    observe_upstream(upstream, time.perf_counter() - context.start, "error")
+    upstream_error(upstream, params.exception)
+
+
+# Pass as ClientSession(trace_configs=[http_trace]) to time every request by host
+http_trace = aiohttp.TraceConfig()
+http_trace.on_request_start.append(on_request_start)
+http_trace.on_request_end.append(on_request_end)
+http_trace.on_request_exception.append(on_request_exception)
+
+
+def format_labels(labels, **extra):
+    items = list(labels) + list(extra.items())
+    if not items:
+        return ""
+    return "{" + ",".join(f'{name}="{str(value).replace(chr(34), chr(39))}"' for name, value in items) + "}"
+
+
+def render_prometheus():
+    """Render every metric in the Prometheus text exposition format"""
+    lines = []
+    for name in sorted({metric for metric, _ in histograms}):
+        lines.append(f"# TYPE {name} histogram")
+        for (metric, labels), histogram in sorted(histograms.items()):
+            if metric != name:
+                continue
+            cumulative = 0
+            for bound, bucket_count in zip(BUCKETS + ("+Inf",), histogram.counts):
+                cumulative += bucket_count
+                lines.append(f"{name}_bucket{format_labels(labels, le=bound)} {cumulative}")
+            lines.append(f"{name}_sum{format_labels(labels)} {histogram.total}")
+            lines.append(f"{name}_count{format_labels(labels)} {histogram.count}")
+    for name in sorted({metric for metric, _ in counters}):
+        lines.append(f"# TYPE {name} counter")
+        for (metric, labels), value in sorted(counters.items()):
+            if metric == name:
+                lines.append(f"{name}{format_labels(labels)} {value}")
+    return "\n".join(lines) + "\n"
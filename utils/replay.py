@@ -0,0 +1,34 @@
+# Recording of upstream responses as fixtures for bench/replay_server.py
+# Run the bot with UPSTREAM_RECORD_DIR set to capture every successful weather/D&D response
+import json
+import logging
+import os
+
+
+RECORD_DIR = os.getenv("UPSTREAM_RECORD_DIR", "")
+# Query parameters that never belong in a fixture name
+SECRET_PARAMS = {"appid"}
+
+log = logging.getLogger(__name__)
+
+
+def fixture_name(path, params):
+    """Map a request path and query to a fixture file name, e.g. races__elf.json or data__2.5__weather@lat=1&lon=2.json"""
+    name = path.strip("/").replace("/", "__") or "index"
+    # Lower-cased and slash-free so lookups like ?q=London and ?q=london share a fixture
+    query = "&".join(f"{key}={str(value).lower().replace('/', '_')}"
+                     for key, value in sorted(params.items()) if key not in SECRET_PARAMS)
+    return f"{name}@{query}.json" if query else f"{name}.json"
+
+
+def record(service, path, params, body):
+    """Save a response under RECORD_DIR/<service>/ when recording is enabled"""
+    if not RECORD_DIR:
+        return
+    directory = os.path.join(RECORD_DIR, service)
+    try:
+        os.makedirs(directory, exist_ok=True)
+        with open(os.path.join(directory, fixture_name(path, params)), "w", encoding="utf-8") as file:
+            json.dump(body, file)
+    except OSError:
+        log.exception("Could not record %s %s", service, path)
@@ -0,0 +1,20 @@
+# JSON state files the cogs keep between restarts (weather subscriptions, status boards)
+# Both functions block on disk I/O, so call them through asyncio.to_thread
+import json
+import os
+
+
+def read_json(path, default):
+    """The file's contents, or default if it doesn't exist yet"""
+    try:
+        with open(path, encoding="utf-8") as file:
+            return json.load(file)
+    except FileNotFoundError:
+        return default
+
+
+def write_json_atomic(path, data):
+    """Replace the file with data; written to a temporary file first so a crash never leaves half a file behind"""
+    with open(path + ".tmp", "w", encoding="utf-8") as file:
+        json.dump(data, file, indent=2)
+    os.replace(path + ".tmp", path)
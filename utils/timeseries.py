@@ -0,0 +1,123 @@
+# Player count history for the game servers, stored in SQLite as 1 minute, 1 hour and 1 day rollups
+# Writes only ever append rows: a minute is written once it is over, and an hour or day is rolled up
+# from the finer table once it is over, so every query reads just the one resolution it needs
+import os
+import sqlite3
+import threading
+import time
+
+
+HISTORY_FILE = os.getenv("PLAYER_HISTORY_FILE", "player_history.sqlite3")
+
+# Resolution -> (bucket seconds, seconds of rows kept, or None to keep them forever)
+RESOLUTIONS = {
+    "1m": (60, 2 * 86400),
+    "1h": (3600, 90 * 86400),
+    "1d": (86400, None),
+}
+
+
+def bucket_start(timestamp, resolution):
+    seconds = RESOLUTIONS[resolution][0]
+    return int(timestamp) // seconds * seconds
+
+
+class PlayerHistory:
+    """Per-server player counts; methods block on disk I/O, so call them through asyncio.to_thread"""
+
+    def __init__(self, path=HISTORY_FILE):
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.lock = threading.Lock()
+        # Appends from the poller shouldn't wait for a full sync or block readers
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        with self.lock, self.db:
+            for resolution in RESOLUTIONS:
+                # samples/total give the average, low/high the range within the bucket
+                self.db.execute(f"""CREATE TABLE IF NOT EXISTS rollup_{resolution} (
+                    server TEXT NOT NULL, bucket INTEGER NOT NULL, samples INTEGER NOT NULL,
+                    total INTEGER NOT NULL, low INTEGER NOT NULL, high INTEGER NOT NULL,
+                    PRIMARY KEY (server, bucket)) WITHOUT ROWID""")
+        # Server -> [minute, samples, total, low, high] for the minute still being sampled
+        self.current = {}
+        # Hours and days that ended while the bot was down
+        with self.lock, self.db:
+            self.roll_up(time.time())
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+    def record(self, samples, timestamp=None):
+        """Add one {server: players} sample per server"""
+        timestamp = time.time() if timestamp is None else timestamp
+        minute = bucket_start(timestamp, "1m")
+        finished = []
+        for server, players in samples.items():
+            row = self.current.get(server)
+            if row is not None and row[0] != minute:
+                finished.append((server, *row))
+                row = None
+            if row is None:
+                self.current[server] = [minute, 1, players, players, players]
+            else:
+                row[1] += 1
+                row[2] += players
+                row[3] = min(row[3], players)
+                row[4] = max(row[4], players)
+        if not finished:
+            return
+
+        with self.lock, self.db:
+            self.db.executemany("INSERT OR IGNORE INTO rollup_1m VALUES (?, ?, ?, ?, ?, ?)", finished)
+            # Only a new hour can complete an hour or day
+            if any(bucket_start(row[1], "1h") != bucket_start(timestamp, "1h") for row in finished):
+                self.roll_up(timestamp)
+
+    def roll_up(self, timestamp):
+        """Append every finished hour and day that isn't rolled up yet, then drop expired rows"""
+        for finer, coarser in (("1m", "1h"), ("1h", "1d")):
+            seconds = RESOLUTIONS[coarser][0]
+            # Per server, from the bucket after its newest rollup up to the start of the running one
+            self.db.execute(f"""
+                INSERT OR IGNORE INTO rollup_{coarser}
+                SELECT f.server, f.bucket / {seconds} * {seconds} AS coarse, SUM(f.samples), SUM(f.total),
+                       MIN(f.low), MAX(f.high)
+                FROM rollup_{finer} AS f
+                WHERE f.bucket >= COALESCE(
+                          (SELECT MAX(c.bucket) + {seconds} FROM rollup_{coarser} AS c WHERE c.server = f.server), 0)
+                  AND f.bucket < ?
+                GROUP BY f.server, coarse""", (bucket_start(timestamp, coarser),))
+        for resolution, (_, retention) in RESOLUTIONS.items():
+            if retention is not None:
+                self.db.execute(f"DELETE FROM rollup_{resolution} WHERE bucket < ?", (int(timestamp) - retention,))
+
+    def series(self, server, resolution, since):
+        """[(bucket, average, low, high)] for a server from one rollup table, oldest first"""
+        with self.lock:
+            rows = self.db.execute(
+                f"SELECT bucket, CAST(total AS REAL) / samples, low, high FROM rollup_{resolution} "
+                "WHERE server = ? AND bucket >= ? ORDER BY bucket", (server, int(since))).fetchall()
+        return rows
+
+    def peak_hours(self, server, days=14, top=3):
+        """The hours of the day (local time) with the highest average player count over recent days"""
+        by_hour = {}
+        for bucket, average, _, _ in self.series(server, "1h", time.time() - days * 86400):
+            by_hour.setdefault(time.localtime(bucket).tm_hour, []).append(average)
+        averages = {hour: sum(values) / len(values) for hour, values in by_hour.items()}
+        return sorted(averages.items(), key=lambda item: item[1], reverse=True)[:top]
+
+    def average(self, server, resolution, start, end):
+        """Average player count between two times from one rollup table, or None without data"""
+        with self.lock:
+            total, samples = self.db.execute(
+                f"SELECT SUM(total), SUM(samples) FROM rollup_{resolution} WHERE server = ? AND bucket >= ? AND bucket < ?",
+                (server, int(start), int(end))).fetchone()
+        return total / samples if samples else None
+
+    def trend(self, server, days=7):
+        """Average players over the last `days` full (UTC) days and over the `days` before them"""
+        today = bucket_start(time.time(), "1d")
+        span = days * 86400
+        return self.average(server, "1d", today - span, today), self.average(server, "1d", today - 2 * span, today - span)
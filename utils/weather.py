@@ -0,0 +1,222 @@
+# Weather backends shared by the weather cogs
+# Each backend returns one normalized document (current, hourly, daily, alerts) per coordinate,
+# cached here so !weather, !forecast, !friends and subscriptions all reuse the same fetch
+import aiohttp
+import asyncio
+import datetime
+import logging
+import os
+import time
+from utils import metrics, replay
+from utils.breaker import http_breaker
+from utils.cache import LRUCache
+
+
+# onecall fetches everything in one request but needs a One Call 3.0 subscription,
+# classic uses the free 2.5 weather + forecast endpoints, auto tries onecall and falls back
+WEATHER_BACKEND = os.getenv("WEATHER_BACKEND", "auto")
+# Point at a replay server (bench/replay_server.py) to run without the real API
+OPENWEATHER_BASE_URL = os.getenv("OPENWEATHER_BASE_URL", "http://api.openweathermap.org")
+# Seconds a fetched document is served from cache
+CACHE_TTL = float(os.getenv("WEATHER_CACHE_TTL", "600"))
+MAX_CACHED = 1000
+
+log = logging.getLogger(__name__)
+
+
+def local_date(timestamp, offset):
+    return datetime.datetime.utcfromtimestamp(timestamp + offset).strftime("%Y-%m-%d")
+
+
+def condition_fields(entry):
+    condition = entry["weather"][0]
+    return {"id": condition["id"], "description": condition["description"], "icon": condition["icon"]}
+
+
+class WeatherBackend:
+    """Geocoding plus a cached conditions() document for a coordinate"""
+
+    def __init__(self, api_key, base_url=OPENWEATHER_BASE_URL):
+        self.api_key = api_key
+        self.base_url = base_url.rstrip("/")
+        self.session = None
+        # City -> geocoding match; cities don't move, so these are only evicted when full
+        self.geocodes = LRUCache(MAX_CACHED)
+        # Rounded coordinate -> (fetched at, document)
+        self.documents = LRUCache(MAX_CACHED)
+        # Rounded coordinate -> in-flight fetch, so concurrent requests share one call
+        self.pending = {}
+
+    def get_session(self):
+        if self.session is None or self.session.closed:
+            self.session = aiohttp.ClientSession(timeout=aiohttp.ClientTimeout(total=10),
+                                                 trace_configs=[metrics.http_trace, http_breaker])
+        return self.session
+
+    async def close(self):
+        if self.session is not None:
+            await self.session.close()
+
+    async def get_json(self, path, **params):
+        """GET an API path, returning the JSON body or None for non-200 answers"""
+        async with self.get_session().get(f"{self.base_url}{path}", params={**params, "appid": self.api_key}) as response:
+            if response.status != 200:
+                return None
+            data = await response.json()
+        replay.record("openweathermap", path, params, data)
+        return data
+
+    async def geocode(self, city):
+        """Look up a city, returning the first geocoding match or None"""
+        key = city.strip().lower()
+        if key in self.geocodes:
+            return self.geocodes[key]
+        geo_data = await self.get_json("/geo/1.0/direct", q=city, limit=1)
+        if not geo_data:
+            return None
+        self.geocodes.remember(key, geo_data[0])
+        return geo_data[0]
+
+    async def conditions(self, lat, lon):
+        """Current, hourly and daily weather for a coordinate, or None"""
+        key = (round(lat, 2), round(lon, 2))
+        cached = self.documents.get(key)
+        if cached and time.monotonic() - cached[0] < CACHE_TTL:
+            metrics.increment("biobot_weather_cache_total", result="hit")
+            return cached[1]
+
+        metrics.increment("biobot_weather_cache_total", result="miss")
+        if key not in self.pending:
+            self.pending[key] = asyncio.ensure_future(self.fetch_conditions(lat, lon))
+        task = self.pending[key]
+        try:
+            document = await asyncio.shield(task)
+        finally:
+            if task.done() and self.pending.get(key) is task:
+                del self.pending[key]
+        if document:
+            self.documents.remember(key, (time.monotonic(), document))
+        return document
+
+    async def fetch_conditions(self, lat, lon):
+        raise NotImplementedError
+
+
+class ClassicBackend(WeatherBackend):
+    """Free 2.5 endpoints: current weather and 3 hourly forecast, two requests per location"""
+
+    async def fetch_conditions(self, lat, lon):
+        weather_data, forecast_data = await asyncio.gather(
+            self.get_json("/data/2.5/weather", lat=lat, lon=lon, units="metric"),
+            # Forecast for the next 3 days (8 intervals per day)
+            self.get_json("/data/2.5/forecast", lat=lat, lon=lon, units="metric", cnt=24 * 3),
+        )
+        if not weather_data or not forecast_data:
+            return None
+
+        current = {
+            "temp": weather_data["main"]["temp"],
+            "feels_like": weather_data["main"]["feels_like"],
+            "humidity": weather_data["main"]["humidity"],
+            "wind_speed": weather_data["wind"]["speed"],
+            "wind_gust": weather_data["wind"].get("gust"),
+            "pop": None,
+            "precipitating": "rain" in weather_data or "snow" in weather_data,
+            **condition_fields(weather_data),
+        }
+        hourly = [{
+            "dt": entry["dt"],
+            "temp": entry["main"]["temp"],
+            "wind_speed": entry["wind"]["speed"],
+            "wind_gust": entry["wind"].get("gust"),
+            "pop": entry["pop"],
+            **condition_fields(entry),
+        } for entry in forecast_data["list"]]
+
+        # Fold the 3 hourly entries into days, taking the condition from each day's first entry
+        daily = {}
+        for entry in forecast_data["list"]:
+            date = entry["dt_txt"].split(" ")[0]
+            day = daily.get(date)
+            if day is None:
+                daily[date] = {"date": date, "max": entry["main"]["temp_max"], "min": entry["main"]["temp_min"],
+                               "pop": entry["pop"], **condition_fields(entry)}
+            else:
+                day["max"] = max(day["max"], entry["main"]["temp_max"])
+                day["min"] = min(day["min"], entry["main"]["temp_min"])
+                day["pop"] = max(day["pop"], entry["pop"])  # Use max pop for chance of rain
+
+        return {"timezone": weather_data.get("timezone", 0), "current": current, "hourly": hourly,
+                "daily": list(daily.values()), "alerts": []}
+
+
+class OneCallBackend(WeatherBackend):
+    """One Call 3.0: current, hourly, daily and official alerts in a single request"""
+
+    def __init__(self, api_key, base_url=OPENWEATHER_BASE_URL, fallback=None):
+        super().__init__(api_key, base_url)
+        # Used instead once the key turns out not to have One Call access
+        self.fallback = fallback
+        self.use_fallback = False
+
+    async def close(self):
+        await super().close()
+        if self.fallback:
+            await self.fallback.close()
+
+    async def fetch_conditions(self, lat, lon):
+        if self.use_fallback:
+            return await self.fallback.fetch_conditions(lat, lon)
+
+        params = {"lat": lat, "lon": lon, "units": "metric", "exclude": "minutely"}
+        async with self.get_session().get(f"{self.base_url}/data/3.0/onecall",
+                                          params={**params, "appid": self.api_key}) as response:
+            if response.status == 401 and self.fallback:
+                log.warning("API key has no One Call 3.0 access, falling back to the 2.5 endpoints")
+                self.use_fallback = True
+                return await self.fallback.fetch_conditions(lat, lon)
+            if response.status != 200:
+                return None
+            data = await response.json()
+        replay.record("openweathermap", "/data/3.0/onecall", params, data)
+
+        offset = data.get("timezone_offset", 0)
+        hourly = [{
+            "dt": entry["dt"],
+            "temp": entry["temp"],
+            "wind_speed": entry["wind_speed"],
+            "wind_gust": entry.get("wind_gust"),
+            "pop": entry.get("pop", 0),
+            **condition_fields(entry),
+        } for entry in data.get("hourly", [])]
+        current = data["current"]
+        return {
+            "timezone": offset,
+            "current": {
+                "temp": current["temp"],
+                "feels_like": current["feels_like"],
+                "humidity": current["humidity"],
+                "wind_speed": current["wind_speed"],
+                "wind_gust": current.get("wind_gust"),
+                "pop": hourly[0]["pop"] if hourly else None,
+                "precipitating": "rain" in current or "snow" in current,
+                **condition_fields(current),
+            },
+            "hourly": hourly,
+            "daily": [{
+                "date": local_date(entry["dt"], offset),
+                "max": entry["temp"]["max"],
+                "min": entry["temp"]["min"],
+                "pop": entry.get("pop", 0),
+                **condition_fields(entry),
+            } for entry in data.get("daily", [])],
+            "alerts": [alert["event"] for alert in data.get("alerts", [])],
+        }
+
+
+def make_backend(api_key, name=WEATHER_BACKEND, base_url=OPENWEATHER_BASE_URL):
+    if name == "classic":
+        return ClassicBackend(api_key, base_url)
+    if name == "onecall":
+        return OneCallBackend(api_key, base_url=base_url)
+    return OneCallBackend(api_key, base_url=base_url, fallback=ClassicBackend(api_key, base_url))